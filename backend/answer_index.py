@@ -0,0 +1,230 @@
+# answer_index.py
+"""
+채점된 면접 답변의 유사도 인덱스 (프로세스 내).
+
+- 답변 텍스트를 글자 2·3-gram 해싱 벡터(ANSWER_INDEX_DIM 차원, 부호 해싱, L2 정규화)로
+  임베딩합니다. 모델 호출이나 외부 서비스 없이 NumPy만 씁니다.
+- 벡터는 하나의 float32 행렬에 모아 두고 행렬-벡터 곱 한 번으로 코사인 유사도를 구합니다.
+  (10만 건 × 256차원 ≈ 100MB, 검색 수 ms)
+- 처음 검색할 때 DB의 채점된 답변 전체를 스레드에서 읽어 만들고(lazy),
+  이후 채점 결과가 저장될 때마다 add()로 갱신합니다. (만들기 전의 add()는 무시)
+- 가까운 이웃들의 점수를 유사도로 가중 평균해 LLM 평가 전 잠정 점수로 씁니다.
+
+NumPy가 설치되어 있지 않거나 ANSWER_INDEX_ENABLED=0 이면 비활성화됩니다.
+"""
+
+import os
+import re
+import asyncio
+import logging
+import threading
+import unicodedata
+import importlib.util
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from .database import SessionLocal
+from .models import InterviewAnswer
+
+logger = logging.getLogger(__name__)
+
+ANSWER_INDEX_ENABLED = (
+    os.getenv("ANSWER_INDEX_ENABLED", "1") == "1" and importlib.util.find_spec("numpy") is not None
+)
+ANSWER_INDEX_DIM = int(os.getenv("ANSWER_INDEX_DIM", "256"))
+# 검색 결과로 돌려줄 이웃 수
+ANSWER_INDEX_NEIGHBOURS = int(os.getenv("ANSWER_INDEX_NEIGHBOURS", "5"))
+# 이 유사도 미만인 이웃은 잠정 점수 계산에서 뺍니다.
+ANSWER_INDEX_MIN_SIMILARITY = float(os.getenv("ANSWER_INDEX_MIN_SIMILARITY", "0.5"))
+# 처음 만들 때 DB에서 한 번에 읽는 행 수
+ANSWER_INDEX_LOAD_BATCH = int(os.getenv("ANSWER_INDEX_LOAD_BATCH", "5000"))
+
+NGRAM_SIZES = (2, 3)
+_NON_WORD = re.compile(r"[\W_]+")
+# n-gram 해시용 상수 (64비트 곱셈은 넘치면 그대로 감깁니다)
+_HASH_BASE = 0x100000001B3
+_HASH_MIX = 0x9E3779B97F4A7C15
+
+
+# ▶ 임베딩
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", unicodedata.normalize("NFKC", text).lower()).strip()
+
+
+def embed(text: str, dim: int = ANSWER_INDEX_DIM):
+    """글자 n-gram 해싱 벡터 (L2 정규화된 float32 배열). 빈 텍스트는 영벡터."""
+    import numpy as np
+
+    codes = np.frombuffer(_normalize(text).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    vec = np.zeros(dim, dtype=np.float64)
+    base, mix = np.uint64(_HASH_BASE), np.uint64(_HASH_MIX)
+    for n in NGRAM_SIZES:
+        count = len(codes) - n + 1
+        if count <= 0:
+            continue
+        h = np.zeros(count, dtype=np.uint64)
+        for i in range(n):
+            h = h * base + codes[i:i + count]
+        h = (h ^ (h >> np.uint64(29))) * mix
+        # 하위 비트로 차원, 최상위 비트로 부호를 정해 충돌이 한쪽으로 쌓이지 않게 합니다.
+        signs = np.where(h >> np.uint64(63), -1.0, 1.0)
+        vec += np.bincount((h % np.uint64(dim)).astype(np.intp), weights=signs, minlength=dim)
+    norm = np.linalg.norm(vec)
+    return (vec / norm if norm else vec).astype(np.float32)
+
+
+# ▶ 인덱스
+class AnswerIndex:
+    """
+    answer_id → (벡터, 점수). 행렬은 용량을 두 배씩 늘려 추가 비용을 상수 시간으로 유지하고,
+    이미 있는 답변을 다시 add()하면 같은 행을 덮어씁니다.
+    """
+    def __init__(self, dim: int = ANSWER_INDEX_DIM, enabled: bool = ANSWER_INDEX_ENABLED):
+        self.dim = dim
+        self.enabled = enabled
+        self.loaded = False
+        self._size = 0
+        self._matrix = None
+        self._ids = None
+        self._scores = None
+        self._rows: Dict[int, int] = {}
+        # 로딩 중에 들어온 add()는 여기 모았다가 로딩이 끝나면 적용합니다.
+        # 로딩 전의 add()는 버립니다. 채점 결과는 DB에 먼저 저장되므로 로딩 때 함께 읽힙니다.
+        self._loading = False
+        self._pending: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._load_lock: Optional[asyncio.Lock] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int):
+        import numpy as np
+
+        needed = self._size + extra
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        scores = np.zeros(capacity, dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+            ids[:self._size] = self._ids[:self._size]
+            scores[:self._size] = self._scores[:self._size]
+        self._matrix, self._ids, self._scores = matrix, ids, scores
+
+    def _put(self, answer_id: int, vector, score: float):
+        row = self._rows.get(answer_id)
+        if row is None:
+            self._reserve(1)
+            row = self._rows[answer_id] = self._size
+            self._size += 1
+        self._matrix[row] = vector
+        self._ids[row] = answer_id
+        self._scores[row] = score
+
+    def add(self, answer_id: int, text: str, score: Optional[float]):
+        """
+        채점된 답변을 추가/갱신합니다. 점수가 없으면 무시.
+        DB에 커밋한 뒤 호출해야 합니다. (아직 로딩 전이면 아무것도 하지 않음)
+        """
+        if not self.enabled or score is None or not text:
+            return
+        if not (self.loaded or self._loading):
+            return
+        vector = embed(text, self.dim)
+        with self._lock:
+            if self.loaded:
+                self._put(answer_id, vector, score)
+            elif self._loading:
+                self._pending[answer_id] = (vector, score)
+
+    def search(self, text: str, k: int = ANSWER_INDEX_NEIGHBOURS,
+               exclude_id: Optional[int] = None) -> List[dict]:
+        """가장 비슷한 채점 답변 k개 [{answer_id, score, similarity}] (유사도 내림차순)"""
+        import numpy as np
+
+        if not self.enabled or not self.loaded or k <= 0:
+            return []
+        query = embed(text, self.dim)
+        with self._lock:
+            if self._size == 0:
+                return []
+            sims = self._matrix[:self._size] @ query
+            if exclude_id is not None and exclude_id in self._rows:
+                sims[self._rows[exclude_id]] = -np.inf
+            top = min(k, self._size)
+            candidates = np.argpartition(-sims, top - 1)[:top]
+            order = candidates[np.argsort(-sims[candidates])]
+            return [
+                {"answer_id": int(self._ids[i]), "score": float(self._scores[i]),
+                 "similarity": round(float(sims[i]), 4)}
+                for i in order if sims[i] > 0
+            ]
+
+    async def ensure_loaded(self):
+        """DB의 채점된 답변으로 인덱스를 만듭니다. 한 번만 실행되며 이벤트 루프를 막지 않습니다."""
+        if not self.enabled or self.loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if not self.loaded:
+                await asyncio.to_thread(self._load)
+
+    def _load(self):
+        with self._lock:
+            self._loading = True
+        try:
+            self._load_rows()
+        except Exception:
+            # 다음 ensure_loaded()에서 처음부터 다시 읽습니다.
+            with self._lock:
+                self._loading = False
+                self._pending.clear()
+            raise
+        with self._lock:
+            # 로딩 도중 저장된 채점 결과가 DB에서 읽은 값보다 최신입니다.
+            for answer_id, (vector, score) in self._pending.items():
+                self._put(answer_id, vector, score)
+            self._pending.clear()
+            self.loaded = True
+            self._loading = False
+        logger.info("answer index loaded: %d answers", self._size)
+
+    def _load_rows(self):
+        import numpy as np
+
+        last_id = 0
+        with SessionLocal() as db:
+            while True:
+                rows = db.execute(
+                    select(InterviewAnswer.id, InterviewAnswer.answer_text, InterviewAnswer.score)
+                    .where(InterviewAnswer.score.is_not(None), InterviewAnswer.id > last_id)
+                    .order_by(InterviewAnswer.id)
+                    .limit(ANSWER_INDEX_LOAD_BATCH)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                vectors = np.stack([embed(r.answer_text or "", self.dim) for r in rows])
+                with self._lock:
+                    self._reserve(len(rows))
+                    for r, vector in zip(rows, vectors):
+                        self._put(r.id, vector, r.score)
+
+
+def provisional_score(neighbours: List[dict],
+                      min_similarity: float = ANSWER_INDEX_MIN_SIMILARITY) -> Optional[float]:
+    """충분히 비슷한 이웃 점수의 유사도 가중 평균. 그런 이웃이 없으면 None."""
+    close = [n for n in neighbours if n["similarity"] >= min_similarity]
+    if not close:
+        return None
+    weight = sum(n["similarity"] for n in close)
+    return round(sum(n["score"] * n["similarity"] for n in close) / weight, 1)
+
+
+answer_index = AnswerIndex()
@@ -0,0 +1,148 @@
+# artifacts.py
+
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+# 내보내기 파일 보관 한도 (환경변수로 조정 가능)
+EXPORT_MAX_BYTES = int(os.getenv("EXPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+EXPORT_MAX_AGE = float(os.getenv("EXPORT_MAX_AGE", str(7 * 24 * 3600)))
+
+FINGERPRINT_LENGTH = 16
+FINGERPRINTED_NAME = re.compile(r"report_user_\d+_[0-9a-f]{%d}\.\w+" % FINGERPRINT_LENGTH)
+
+
+def report_fingerprint(data: dict) -> str:
+    """리포트 데이터의 해시. 생성 시각은 내용이 아니므로 제외합니다."""
+    content = {k: v for k, v in data.items() if k != "generated_at"}
+    raw = json.dumps(content, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def artifact_filename(user_id: int, fingerprint: str, ext: str) -> str:
+    return f"report_user_{user_id}_{fingerprint}.{ext}"
+
+
+def write_atomic(filepath: str, data: bytes):
+    """
+    같은 디렉터리의 임시 파일에 쓴 뒤 os.replace로 교체합니다.
+    동시에 같은 파일을 만들어도 반쯤 쓰인 파일이 노출되지 않습니다.
+    """
+    directory = os.path.dirname(filepath) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def touch(filepath: str):
+    """
+    캐시 적중 시 마지막 사용 시각(atime)을 갱신합니다.
+    mtime은 ETag/Last-Modified에 쓰이므로 그대로 둡니다.
+    """
+    try:
+        st = os.stat(filepath)
+        os.utime(filepath, (time.time(), st.st_mtime))
+    except FileNotFoundError:
+        pass
+
+
+def _last_used(st: os.stat_result) -> float:
+    return max(st.st_atime, st.st_mtime)
+
+
+def evict(directory: str, keep: str = None,
+          max_bytes: int = EXPORT_MAX_BYTES, max_age: float = EXPORT_MAX_AGE):
+    """
+    오래 쓰이지 않은 파일(max_age 초과)을 지우고, 전체 크기가 max_bytes를 넘으면
+    마지막 사용 시각이 오래된 것부터(LRU) 지웁니다. keep 파일은 지우지 않습니다.
+    """
+    now = time.time()
+    files = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name == keep or not os.path.isfile(path):
+            continue
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if now - _last_used(st) > max_age:
+            _remove(path)
+        else:
+            files.append((_last_used(st), st.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    if keep and os.path.exists(os.path.join(directory, keep)):
+        total += os.path.getsize(os.path.join(directory, keep))
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def file_response(request: Request, directory: str, filename: str, media_type: str,
+                  download_name: str = None):
+    """
+    ETag/Last-Modified를 붙여 파일을 응답합니다.
+    If-None-Match / If-Modified-Since가 맞으면 304를, Range 요청은
+    FileResponse가 206 부분 응답으로 처리합니다.
+    download_name을 주면 그 이름으로 내려받게 하고, URL이 내용마다 바뀌지 않으므로
+    매번 재검증하도록 캐시합니다.
+    """
+    if os.path.basename(filename) != filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    file_path = os.path.join(directory, filename)
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    st = os.stat(file_path)
+    etag = f'"{st.st_size:x}-{int(st.st_mtime * 1000):x}"'
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    # 지문이 붙은 파일은 내용이 바뀌지 않으므로 오래 캐시해도 됩니다.
+    fingerprinted = download_name is None and FINGERPRINTED_NAME.fullmatch(filename) is not None
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": "private, max-age=86400, immutable" if fingerprinted else "private, no-cache",
+    }
+
+    if _not_modified(request, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path=file_path, filename=download_name or filename, media_type=media_type, headers=headers)
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
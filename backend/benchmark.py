@@ -0,0 +1,442 @@
+# benchmark.py
+"""
+라우터 엔드포인트 부하 테스트.
+기본값은 앱을 같은 프로세스에서 띄우고(임시 디렉터리의 SQLite, LLM_PROVIDER=fake)
+네트워크 없이 서비스 자체의 오버헤드만 측정합니다.
+엔드포인트 × 동시성 조합마다 처리량과 p50/p95/p99 지연, 첫 바이트까지의 시간(TTFB)을 출력합니다.
+
+    python -m backend.benchmark
+    python -m backend.benchmark --concurrency 1,16,64 --requests 400 --scenarios resumes.list,dashboard
+    python -m backend.benchmark --latency-ms 800 --tokens-per-second 30 --json result.json
+    python -m backend.benchmark --base-url http://localhost:8000   # 이미 떠 있는 서버
+    python -m backend.benchmark --startup 10   # 새 프로세스 10개로 기동 시간 측정
+    python -m backend.benchmark --routes 5 --small-model gpt-4o-mini --model-speed gpt-4o-mini=120
+        # 고정 정책 vs 라우팅 정책(llm_routing.py)의 작업별 지연·출력 한도 비교
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+RESUME_TEXT = (
+    "저는 사용자 경험을 최우선으로 생각하는 백엔드 개발자입니다. "
+    "대학 시절 동아리 서비스를 운영하며 트래픽이 몰릴 때 응답이 느려지는 문제를 겪었고, "
+    "쿼리를 분석해 인덱스를 추가하고 캐시를 도입해 응답 시간을 절반으로 줄였습니다. "
+) * 3
+# 분할 첨삭(RESUME_CHUNK_TOKENS)이 적용되는 8개 섹션짜리 자기소개서
+LONG_RESUME_TEXT = "\n\n".join(f"[경험 {i}]\n{RESUME_TEXT}" for i in range(1, 9))
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    body: Optional[Callable[[int], dict]] = None
+    # 시드 데이터 중 질문이 필요한 시나리오
+    needs_question: bool = False
+
+
+def _scenarios(ids: Dict[str, int]) -> List[Scenario]:
+    user_id, resume_id = ids["user_id"], ids["resume_id"]
+
+    def generate(i):
+        return {"name": "홍길동", "role": "백엔드 개발자", "experience_years": 3,
+                "experience_list": f"API 서버 개발, 성능 개선 {i}"}
+
+    def question(i):
+        return {"user_id": user_id, "company": f"회사{i % 10}", "role": "백엔드 개발자"}
+
+    return [
+        Scenario("resumes.list", "GET", f"/resumes?user_id={user_id}&limit=50"),
+        Scenario("resumes.list_summary", "GET", f"/resumes?user_id={user_id}&limit=50&view=summary"),
+        Scenario("resumes.get", "GET", f"/resumes/{resume_id}"),
+        Scenario("resumes.upload", "POST", "/resumes",
+                 lambda i: {"user_id": user_id, "text": f"{RESUME_TEXT} ({i})"}),
+        Scenario("resumes.feedback", "POST", f"/resumes/{resume_id}/feedback", lambda i: {}),
+        Scenario("resumes.feedback_long", "POST", f"/resumes/{ids['long_resume_id']}/feedback", lambda i: {}),
+        Scenario("resumes.feedback_structured", "POST", f"/resumes/{resume_id}/feedback",
+                 lambda i: {"mode": "structured"}),
+        Scenario("resumes.feedback_stream", "POST", f"/resumes/{resume_id}/feedback/stream", lambda i: {}),
+        Scenario("resumes.feedback_job", "POST", f"/resumes/{resume_id}/feedback/jobs", lambda i: {}),
+        Scenario("resumes.generate", "POST", "/resumes/generate", generate),
+        Scenario("resumes.generate_stream", "POST", "/resumes/generate/stream", generate),
+        Scenario("interviews.questions", "POST", "/interviews/questions", question),
+        Scenario("interviews.questions_stream", "POST", "/interviews/questions/stream", question),
+        Scenario("interviews.answers", "POST", "/interviews/answers",
+                 lambda i: {"question_id": ids.get("question_id"), "answer_text": f"답변 {i}"},
+                 needs_question=True),
+        Scenario("interviews.evaluate", "POST", f"/interviews/evaluate/{ids.get('answer_id')}",
+                 lambda i: {}, needs_question=True),
+        Scenario("interviews.evaluate_batch", "POST", "/interviews/evaluate/batch",
+                 lambda i: {"answer_ids": [ids.get("answer_id")]}, needs_question=True),
+        Scenario("interviews.evaluate_job", "POST", f"/interviews/evaluate/{ids.get('answer_id')}/jobs",
+                 lambda i: {}, needs_question=True),
+        Scenario("jobs.get", "GET", f"/jobs/{ids['job_id']}"),
+        Scenario("dashboard", "GET", f"/{user_id}"),
+        Scenario("exporter.docx", "GET", f"/exporter/{user_id}/docx"),
+        Scenario("exporter.docx_file", "GET", f"/exporter/{user_id}/docx/file"),
+        Scenario("exporter.pdf", "GET", f"/exporter/{user_id}/pdf"),
+        Scenario("exporter.pdf_file", "GET", f"/exporter/{user_id}/pdf/file"),
+    ]
+
+
+@dataclass
+class Result:
+    scenario: str
+    concurrency: int
+    requests: int
+    errors: int = 0
+    elapsed_s: float = 0.0
+    latencies_ms: List[float] = field(default_factory=list)
+    ttfb_ms: List[float] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            "scenario": self.scenario,
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(self.requests / self.elapsed_s, 1) if self.elapsed_s else 0.0,
+            "p50_ms": percentile(self.latencies_ms, 50),
+            "p95_ms": percentile(self.latencies_ms, 95),
+            "p99_ms": percentile(self.latencies_ms, 99),
+            "ttfb_p50_ms": percentile(self.ttfb_ms, 50),
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return round(ordered[int(rank) - 1], 1)
+
+
+async def _request(client, scenario: Scenario, i: int, result: Result):
+    kwargs = {"json": scenario.body(i)} if scenario.body is not None else {}
+    started = time.perf_counter()
+    first_byte = None
+    try:
+        async with client.stream(scenario.method, scenario.path, **kwargs) as response:
+            async for _ in response.aiter_raw():
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+            ok = response.status_code < 400
+    except Exception:
+        ok = False
+    finished = time.perf_counter()
+    if not ok:
+        result.errors += 1
+    result.latencies_ms.append((finished - started) * 1000)
+    result.ttfb_ms.append(((first_byte or finished) - started) * 1000)
+
+
+async def run_scenario(client, scenario: Scenario, concurrency: int, requests: int) -> Result:
+    """requests개의 요청을 concurrency개의 워커가 나눠서 보냅니다."""
+    result = Result(scenario.name, concurrency, requests)
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            await _request(client, scenario, i, result)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed_s = time.perf_counter() - started
+    return result
+
+
+async def _seed(client, user_id: int, question_id: Optional[int]) -> Dict[str, int]:
+    """
+    벤치마크에 쓸 사용자/자기소개서/질문/답변/작업을 API로 만듭니다.
+    question_id가 없으면 POST /interviews/questions로 질문을 저장해 items[0].id를 씁니다.
+    (원격 서버에서는 LLM 호출이 한 번 일어납니다)
+    """
+    resume = (await client.post("/resumes", json={"user_id": user_id, "text": RESUME_TEXT})).json()
+    for i in range(20):
+        await client.post("/resumes", json={"user_id": user_id, "text": f"{RESUME_TEXT} ({i})"})
+    long_resume = (await client.post("/resumes", json={"user_id": user_id, "text": LONG_RESUME_TEXT})).json()
+    job = (await client.post(f"/resumes/{resume['id']}/feedback/jobs", json={})).json()
+    ids = {"user_id": user_id, "resume_id": resume["id"], "long_resume_id": long_resume["id"], "job_id": job["id"]}
+    if question_id is None:
+        response = await client.post("/interviews/questions",
+                                     json={"user_id": user_id, "company": "회사", "role": "백엔드 개발자"})
+        items = response.json().get("items") if response.status_code < 400 else None
+        if not items:
+            print(f"# 질문 생성 실패({response.status_code}): 질문이 필요한 시나리오는 건너뜁니다.",
+                  file=sys.stderr)
+            return ids
+        question_id = items[0]["id"]
+    answer = (await client.post("/interviews/answers",
+                                json={"question_id": question_id, "answer_text": "답변"})).json()
+    ids.update(question_id=question_id, answer_id=answer["id"])
+    return ids
+
+
+def print_table(summaries: List[dict]):
+    header = f"{'scenario':32} {'conc':>5} {'reqs':>6} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'ttfb50':>8}"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        print(f"{s['scenario']:32} {s['concurrency']:>5} {s['requests']:>6} {s['errors']:>5} "
+              f"{s['throughput_rps']:>8} {s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8} {s['ttfb_p50_ms']:>8}")
+
+
+# ▶ 라우팅 정책 비교
+ANSWER_TEXT = (
+    "팀 프로젝트에서 일정이 밀렸을 때 남은 작업을 다시 나누고 "
+    "매일 진행 상황을 공유해 마감을 지켰습니다. "
+)
+
+
+def _route_cases():
+    """(이름, 코루틴 함수) 목록. 작업 종류·입력 길이가 다른 서비스 호출들"""
+    from . import services
+
+    long_resume = "\n\n".join(f"[경험 {i}]\n{RESUME_TEXT}" for i in range(1, 5))
+    return [
+        ("evaluation.short", lambda: services.evaluate_interview_answer(ANSWER_TEXT)),
+        ("evaluation.long", lambda: services.evaluate_interview_answer(ANSWER_TEXT * 8)),
+        ("questions", lambda: services.generate_interview_questions(
+            1, "회사", "백엔드 개발자", use_cache=False)),
+        ("generate", lambda: services.generate_resume(
+            "홍길동", "백엔드 개발자", 3, "API 서버 개발, 성능 개선")),
+        ("feedback.two_step", lambda: services.give_resume_feedback(RESUME_TEXT, mode="two_step")),
+        ("feedback.structured", lambda: services.give_resume_feedback(RESUME_TEXT, mode="structured")),
+        ("feedback.long", lambda: services.give_resume_feedback(long_resume, mode="two_step")),
+    ]
+
+
+def _saving(before: float, after: float) -> float:
+    return round((before - after) / before * 100, 1) if before else 0.0
+
+
+async def run_routes(repeats: int) -> List[dict]:
+    """
+    같은 작업들을 고정 정책(LLMRouter.fixed)과 환경변수 라우팅 정책(LLMRouter.from_env)으로
+    repeats번씩 실행하고, 작업·step별 평균 지연과 출력 한도(max_tokens), 완료 토큰을 비교합니다.
+    출력 한도는 토큰 버킷(LLM_TOKENS_PER_MINUTE)이 요청마다 예약하는 양이기도 합니다.
+    """
+    from .services import gpt_client
+    from .llm_routing import LLMRouter
+
+    policies = {"fixed": LLMRouter.fixed(), "routed": LLMRouter.from_env()}
+    original = gpt_client.router
+    measured = {}   # (case, step) -> {정책: 경로 통계}
+    try:
+        for case, fn in _route_cases():
+            for name, router in policies.items():
+                gpt_client.router = router
+                router.reset_stats()
+                for _ in range(repeats):
+                    await fn()
+                for row in router.stats():
+                    measured.setdefault((case, row["step"]), {})[name] = row
+    finally:
+        gpt_client.router = original
+        await gpt_client.aclose()
+
+    summaries = []
+    for (case, step), rows in measured.items():
+        fixed, routed = rows["fixed"], rows["routed"]
+        calls = max(routed["calls"], 1)
+        summary = {
+            "case": case, "step": step, "route": routed["route"], "model": routed["model"],
+            "calls": routed["calls"],
+            "fixed_ms": round(fixed["elapsed_ms"] / max(fixed["calls"], 1), 1),
+            "routed_ms": round(routed["elapsed_ms"] / calls, 1),
+            "fixed_max_tokens": round(fixed["budget_tokens"] / max(fixed["calls"], 1)),
+            "routed_max_tokens": round(routed["budget_tokens"] / calls),
+            "fixed_completion": round(fixed["completion_tokens"] / max(fixed["calls"], 1)),
+            "routed_completion": round(routed["completion_tokens"] / calls),
+        }
+        summary["latency_saving_pct"] = _saving(summary["fixed_ms"], summary["routed_ms"])
+        summary["budget_saving_pct"] = _saving(summary["fixed_max_tokens"], summary["routed_max_tokens"])
+        summaries.append(summary)
+    return summaries
+
+
+def print_routes_table(summaries: List[dict]):
+    header = (f"{'case':20} {'step':15} {'route':17} {'model':14} {'calls':>5} {'fixed_ms':>9} {'routed_ms':>9} "
+              f"{'lat%':>6} {'fix_max':>7} {'rt_max':>7} {'budget%':>7} {'fix_out':>7} {'rt_out':>7}")
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        print(f"{s['case']:20} {s['step']:15} {s['route']:17} {s['model'][:14]:14} {s['calls']:>5} "
+              f"{s['fixed_ms']:>9} {s['routed_ms']:>9} {s['latency_saving_pct']:>6} "
+              f"{s['fixed_max_tokens']:>7} {s['routed_max_tokens']:>7} {s['budget_saving_pct']:>7} "
+              f"{s['fixed_completion']:>7} {s['routed_completion']:>7}")
+    total = {k: sum(s[k] * s["calls"] for s in summaries)
+             for k in ("fixed_ms", "routed_ms", "fixed_max_tokens", "routed_max_tokens")}
+    print(f"# 전체: 지연 {_saving(total['fixed_ms'], total['routed_ms'])}% 감소, "
+          f"출력 한도 {_saving(total['fixed_max_tokens'], total['routed_max_tokens'])}% 감소 (음수면 증가)")
+
+
+# 새 인터프리터에서 import → lifespan 시작 → 첫 요청까지 단계별 시간을 잽니다.
+_STARTUP_PROBE = """
+import sys, time, json, asyncio
+t0 = time.perf_counter()
+from backend.main import app
+t1 = time.perf_counter()
+
+async def probe():
+    import httpx
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            await client.get("/resumes", params={"limit": 1})
+        return t2, time.perf_counter()
+
+t2, t3 = asyncio.run(probe())
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "lifespan_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "heavy_modules": [m for m in ("openai", "docx", "reportlab") if m in sys.modules],
+}))
+"""
+
+
+def run_startup(runs: int) -> List[dict]:
+    """워커 하나가 뜨는 비용을 새 프로세스 runs개로 측정합니다."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.getenv("PYTHONPATH")])))
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE], env=env,
+                             capture_output=True, text=True, check=True)
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - started) * 1000
+        samples.append(sample)
+
+    summaries = []
+    for phase in ("import_ms", "lifespan_ms", "first_request_ms", "process_ms"):
+        values = [s[phase] for s in samples]
+        summaries.append({"phase": phase, "median_ms": round(statistics.median(values), 1),
+                          "max_ms": round(max(values), 1)})
+    print(f"{'phase':20} {'median':>8} {'max':>8}")
+    for s in summaries:
+        print(f"{s['phase']:20} {s['median_ms']:>8} {s['max_ms']:>8}")
+    print(f"# 기동 후 로드된 무거운 모듈: {samples[-1]['heavy_modules'] or '없음'}")
+    return summaries
+
+
+async def run(args) -> List[dict]:
+    import httpx
+
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+    selected = set(args.scenarios.split(",")) if args.scenarios else None
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        lifespan = None
+    else:
+        from .main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://benchmark", timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    summaries = []
+    try:
+        ids = await _seed(client, args.user_id, args.question_id)
+        for scenario in _scenarios(ids):
+            if selected is not None and scenario.name not in selected:
+                continue
+            if scenario.needs_question and "question_id" not in ids:
+                continue
+            # 워밍업 (커넥션/캐시/렌더 풀 초기화가 측정에 섞이지 않도록)
+            await run_scenario(client, scenario, 1, min(args.warmup, args.requests))
+            for concurrency in concurrencies:
+                result = await run_scenario(client, scenario, concurrency, args.requests)
+                summaries.append(result.summary())
+                if args.verbose:
+                    print_table(summaries[-1:])
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="엔드포인트 부하 테스트 (p50/p95/p99, 처리량)")
+    parser.add_argument("--concurrency", default="1,8,32", help="쉼표로 구분한 동시성 목록")
+    parser.add_argument("--requests", type=int, default=100, help="시나리오 × 동시성마다 보낼 요청 수")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--scenarios", default=None, help="쉼표로 구분한 시나리오 이름 (기본: 전부)")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--question-id", type=int, default=None,
+                        help="답변·평가 시나리오에 쓸 질문 (기본: POST /interviews/questions로 생성)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--base-url", default=None, help="지정하면 이미 떠 있는 서버를 대상으로 측정")
+    parser.add_argument("--latency-ms", type=float, default=None, help="가짜 LLM 첫 토큰 지연")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="가짜 LLM 생성 속도")
+    parser.add_argument("--cache", action="store_true", help="LLM 응답 캐시를 켠 채로 측정")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장 (회귀 비교용)")
+    parser.add_argument("--verbose", action="store_true", help="측정이 끝날 때마다 한 줄씩 출력")
+    parser.add_argument("--startup", type=int, default=None, metavar="N",
+                        help="부하 테스트 대신 새 프로세스 N개로 기동 시간(import/lifespan/첫 요청)을 측정")
+    parser.add_argument("--routes", type=int, default=None, metavar="N",
+                        help="부하 테스트 대신 고정 정책과 라우팅 정책을 작업마다 N번씩 실행해 비교")
+    parser.add_argument("--small-model", default=None, help="--routes: LLM_SMALL_MODEL 값")
+    parser.add_argument("--model-speed", action="append", default=[], metavar="MODEL=TPS",
+                        help="--routes: 가짜 LLM의 모델별 초당 생성 토큰 수 (여러 번 지정 가능)")
+    parser.add_argument("--provider", default="fake", choices=["fake", "openai"],
+                        help="--routes: 실제 모델로 비교하려면 openai (API 비용 발생)")
+    args = parser.parse_args(argv)
+
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    if not args.base_url:
+        # 설정은 모듈 import 시점에 읽히므로 앱을 import 하기 전에 지정합니다.
+        workdir = tempfile.mkdtemp(prefix="benchmark-")
+        os.chdir(workdir)
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.environ["LLM_PROVIDER"] = args.provider if args.routes else "fake"
+        os.environ["LLM_CACHE_ENABLED"] = "1" if args.cache else "0"
+        # 클라이언트 측 속도 제한이 서비스 오버헤드 측정에 끼어들지 않도록 기본으로 끕니다.
+        # (시드 데이터가 사용자 한 명이므로 사용자별 동시 호출 한도도 풉니다.)
+        os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "0")
+        os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "0")
+        os.environ.setdefault("LLM_USER_MAX_INFLIGHT", "1000000")
+        if args.latency_ms is not None:
+            os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+        if args.tokens_per_second is not None:
+            os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+        if args.small_model:
+            os.environ["LLM_SMALL_MODEL"] = args.small_model
+        if args.model_speed:
+            speeds = dict(item.split("=", 1) for item in args.model_speed)
+            os.environ["FAKE_LLM_MODEL_TOKENS_PER_SECOND"] = json.dumps(
+                {model: float(tps) for model, tps in speeds.items()})
+        print(f"# 작업 디렉터리: {workdir}", file=sys.stderr)
+
+    if args.startup:
+        summaries = run_startup(args.startup)
+    elif args.routes:
+        summaries = asyncio.run(run_routes(args.routes))
+        print_routes_table(summaries)
+    else:
+        summaries = asyncio.run(run(args))
+        print_table(summaries)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# cache.py
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from .database import SessionLocal
+from .models import LLMCacheEntry
+
+# 캐시 설정 (환경변수로 조정 가능)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+LLM_CACHE_DB_SIZE = int(os.getenv("LLM_CACHE_DB_SIZE", "20000"))
+# DB 정리(만료/용량 초과 삭제)는 저장 N번마다 한 번씩만 수행
+LLM_CACHE_PRUNE_EVERY = 100
+
+
+class LLMResponseCache:
+    """
+    GPT 응답 캐시.
+    (model, temperature, max_tokens, json_mode, system_prompt, user_prompt)의 해시를 키로 사용하며
+    1차로 메모리 LRU, 2차로 app.db의 llm_cache 테이블을 조회합니다.
+    """
+    def __init__(
+        self,
+        ttl: float = LLM_CACHE_TTL,
+        memory_size: int = LLM_CACHE_MEMORY_SIZE,
+        db_size: int = LLM_CACHE_DB_SIZE,
+        enabled: bool = LLM_CACHE_ENABLED,
+    ):
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.db_size = db_size
+        self.enabled = enabled
+        # key -> (저장 시각, 응답)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._writes = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, temperature: float, system_prompt: str, user_prompt: str,
+                 max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        # 출력 한도가 다르면 잘린 응답이 섞일 수 있으므로 max_tokens·응답 형식도 키에 넣습니다.
+        raw = json.dumps(
+            [model, temperature, max_tokens, json_mode, system_prompt, user_prompt],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        # 1) 메모리 LRU
+        item = self._memory.get(key)
+        if item is not None:
+            created_at, response = item
+            if time.time() - created_at < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return response
+            del self._memory[key]
+
+        # 2) SQLite (블로킹 I/O는 스레드에서 실행)
+        item = await asyncio.to_thread(self._db_get, key)
+        if item is not None:
+            self._remember(key, *item)
+            self.db_hits += 1
+            return item[1]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, response: str):
+        if not self.enabled:
+            return
+        created_at = time.time()
+        self._remember(key, created_at, response)
+        self._writes += 1
+        prune = self._writes % LLM_CACHE_PRUNE_EVERY == 0
+        await asyncio.to_thread(self._db_set, key, created_at, response, prune)
+
+    def clear(self):
+        self._memory.clear()
+        db = SessionLocal()
+        try:
+            db.query(LLMCacheEntry).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        total = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+    def _remember(self, key: str, created_at: float, response: str):
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[tuple]:
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).first()
+            if entry is None:
+                return None
+            if time.time() - entry.created_at >= self.ttl:
+                db.delete(entry)
+                db.commit()
+                return None
+            return entry.created_at, entry.response
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, created_at: float, response: str, prune: bool):
+        db = SessionLocal()
+        try:
+            try:
+                db.merge(LLMCacheEntry(key=key, response=response, created_at=created_at))
+                db.commit()
+            except IntegrityError:
+                # 같은 키를 다른 호출이 먼저 넣음 (merge는 조회 후 INSERT라 동시 저장에서 충돌)
+                db.rollback()
+                db.execute(update(LLMCacheEntry).where(LLMCacheEntry.key == key)
+                           .values(response=response, created_at=created_at))
+                db.commit()
+            if prune:
+                self._db_prune(db)
+        finally:
+            db.close()
+
+    def _db_prune(self, db):
+        # TTL 만료분 삭제 후, 최대 개수를 넘으면 오래된 것부터 삭제
+        db.query(LLMCacheEntry).filter(
+            LLMCacheEntry.created_at < time.time() - self.ttl
+        ).delete(synchronize_session=False)
+        overflow = db.query(LLMCacheEntry).count() - self.db_size
+        if overflow > 0:
+            oldest = db.query(LLMCacheEntry.key).order_by(
+                LLMCacheEntry.created_at
+            ).limit(overflow).subquery()
+            db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.key.in_(select(oldest.c.key))
+            ).delete(synchronize_session=False)
+        db.commit()
@@ -0,0 +1,120 @@
+# chunking.py
+"""
+긴 자기소개서를 LLM 한 번에 처리할 수 있는 크기의 구간으로 나눕니다.
+
+- 경계 우선순위: 섹션 제목("[성장 과정]", "1. 지원 동기", "■ 입사 후 포부" 등) > 빈 줄(문단) > 문장
+- 토큰 수는 llm_transport.estimate_tokens()로 추정하며, 구간 하나가 max_tokens를 넘지 않도록
+  인접한 문단을 묶습니다. 문단 하나가 너무 길면 문장 단위로 나눕니다.
+- 각 구간은 다음 구간과의 원래 구분자(빈 줄, 줄바꿈, 공백)를 기억하므로,
+  구간별 결과를 join_segments()로 이어 붙이면 원래 문단 구조가 유지됩니다.
+"""
+
+import re
+from typing import List, NamedTuple
+
+from .llm_transport import estimate_tokens
+
+# 짧은 한 줄짜리 제목: [..], <..>, 【..】, 기호로 시작, "1." / "1)" 번호, "성장 과정:" 형태
+_HEADING = re.compile(
+    r"^\s*(?:\[[^\]\n]{1,40}\]|<[^>\n]{1,40}>|【[^】\n]{1,40}】|[■□◆◇●○▶►#]+\s*\S.{0,40}"
+    r"|\d{1,2}[.)]\s*\S.{0,30}|[^\s:.!?][^:.!?\n]{0,25}:)\s*$"
+)
+_BLANK_LINE = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+
+# 경계 세기 (이 단위 앞에서 끊을 때의 선호도)
+SECTION, PARAGRAPH, SENTENCE = 2, 1, 0
+
+
+class Segment(NamedTuple):
+    text: str
+    separator: str      # 다음 구간과의 원래 구분자 (마지막 구간은 "")
+
+
+class _Unit(NamedTuple):
+    text: str
+    separator: str
+    boundary: int
+    tokens: int
+
+
+def is_heading(line: str) -> bool:
+    return bool(_HEADING.match(line))
+
+
+def _split_keep(text: str, pattern) -> List[tuple]:
+    """pattern 기준으로 나눈 (조각, 뒤 구분자) 목록"""
+    pieces, pos = [], 0
+    for m in pattern.finditer(text):
+        pieces.append((text[pos:m.start()], m.group()))
+        pos = m.end()
+    pieces.append((text[pos:], ""))
+    return [(p, sep) for p, sep in pieces if p.strip()]
+
+
+def _paragraph_units(paragraph: str, separator: str) -> List[_Unit]:
+    """문단 안에서 제목 줄 앞을 섹션 경계로 나눕니다. (제목 다음 줄에 바로 본문이 오는 경우)"""
+    groups = [[]]
+    for line in paragraph.split("\n"):
+        if groups[-1] and is_heading(line):
+            groups.append([])
+        groups[-1].append(line)
+    units = []
+    for i, lines in enumerate(groups):
+        text = "\n".join(lines)
+        sep = "\n" if i < len(groups) - 1 else separator
+        boundary = SECTION if is_heading(lines[0]) else PARAGRAPH
+        units.append(_Unit(text, sep, boundary, estimate_tokens(text)))
+    return units
+
+
+def _sentence_units(unit: _Unit) -> List[_Unit]:
+    pieces = _split_keep(unit.text, _SENTENCE_END)
+    units = []
+    for i, (text, sep) in enumerate(pieces):
+        last = i == len(pieces) - 1
+        units.append(_Unit(
+            text, unit.separator if last else sep,
+            unit.boundary if i == 0 else SENTENCE, estimate_tokens(text),
+        ))
+    return units
+
+
+def split_text(text: str, max_tokens: int) -> List[Segment]:
+    """text를 max_tokens 이하(추정치) 구간들로 나눕니다. 충분히 짧으면 구간 하나."""
+    text = text.strip()
+    if not text or estimate_tokens(text) <= max_tokens:
+        return [Segment(text, "")]
+
+    units: List[_Unit] = []
+    for paragraph, separator in _split_keep(text, _BLANK_LINE):
+        for unit in _paragraph_units(paragraph, separator):
+            units.extend(_sentence_units(unit) if unit.tokens > max_tokens else [unit])
+
+    segments: List[Segment] = []
+    current: List[_Unit] = []
+    current_tokens = 0
+
+    def flush():
+        body = "".join(u.text + u.separator for u in current[:-1]) + current[-1].text
+        segments.append(Segment(body, current[-1].separator))
+
+    for unit in units:
+        if current and (
+            current_tokens + unit.tokens > max_tokens
+            # 새 섹션이 시작되면 구간이 절반 이상 찼을 때 미리 끊습니다.
+            or (unit.boundary == SECTION and current_tokens >= max_tokens // 2)
+        ):
+            flush()
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit.tokens
+    if current:
+        flush()
+    segments[-1] = Segment(segments[-1].text, "")
+    return segments
+
+
+def join_segments(segments: List[Segment], texts: List[str]) -> str:
+    """구간별 결과(texts)를 원래 구분자로 이어 붙입니다."""
+    return "".join(t.strip() + s.separator for s, t in zip(segments, texts)).strip()
@@ -1,12 +1,89 @@
 
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from dotenv import load_dotenv
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
+load_dotenv()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# DATABASE_URL 로 서버 DB(postgresql://... 등)를 지정할 수 있습니다. 기본은 로컬 SQLite.
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+
+# 커넥션 풀 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite PRAGMA 설정
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+
+is_sqlite = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+
+# 라우터용 비동기 드라이버. ASYNC_DATABASE_URL 이 없으면 DATABASE_URL 의 드라이버만 바꿔 사용
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+
+
+def _async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    return parsed.set(drivername=ASYNC_DRIVERS.get(backend, parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(SQLALCHEMY_DATABASE_URL))
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: 읽기가 쓰기에 막히지 않음 / NORMAL: WAL에서 안전하면서 fsync 횟수 감소
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+if is_sqlite:
+    sqlite_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args=sqlite_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=sqlite_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+else:
+    pool_args = dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_args)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_args)
+
+# 동기 세션: 마이그레이션, CLI, 스레드에서 도는 작업(캐시 등)용
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 비동기 세션: 라우터와 백그라운드 작업용. 커밋 후에도 속성을 읽을 수 있도록 expire 하지 않음
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
+
+
+async def get_db():
+    """모든 라우터가 공유하는 FastAPI 의존성. 요청마다 AsyncSession 하나를 엽니다."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,161 @@
+# http_cache.py
+"""
+조회 엔드포인트의 HTTP 캐시 / 압축.
+
+- ETag: 사용자 데이터 버전(stats.get_data_version)과 요청 경로·쿼리로 만든 약한 ETag.
+  If-None-Match가 같으면 응답 본문을 만들지 않고 304를 돌려줍니다.
+  버전은 기본키 조회 한 번이라 폴링 비용이 거의 들지 않습니다.
+- Cache-Control: 사용자 데이터이므로 기본값은 "private, no-cache" (항상 재검증)
+- CompressionMiddleware: 큰 JSON/텍스트 응답을 brotli(설치된 경우) 또는 gzip으로 압축.
+  스트리밍 응답(SSE, 파일 다운로드)은 그대로 통과시킵니다.
+"""
+
+import os
+import gzip
+import asyncio
+import hashlib
+import importlib.util
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+HTTP_CACHE_CONTROL = os.getenv("HTTP_CACHE_CONTROL", "private, no-cache")
+
+# 이 크기(바이트)보다 작은 응답은 압축하지 않습니다.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# 이보다 큰 본문은 이벤트 루프를 막지 않도록 스레드에서 압축합니다.
+COMPRESSION_THREAD_MIN_SIZE = 256 * 1024
+
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/csv", "application/xml")
+
+
+# ▶ ETag / 조건부 요청
+def make_etag(request: Request, version: str) -> str:
+    """같은 버전·같은 경로/쿼리면 같은 값. 인코딩(gzip/br)과 무관하게 쓰도록 약한 ETag."""
+    key = f"{version}|{request.url.path}?{request.url.query}"
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # 약한 비교: W/ 접두어는 무시
+    return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+
+def conditional_response(request: Request, response: Response, version: str) -> Optional[Response]:
+    """
+    ETag/Cache-Control을 response에 설정하고, 클라이언트가 같은 ETag를 갖고 있으면
+    304 응답을 돌려줍니다. (None이면 평소처럼 본문을 만들면 됨)
+    """
+    if not HTTP_CACHE_ENABLED:
+        return None
+    etag = make_etag(request, version)
+    headers = {"ETag": etag, "Cache-Control": HTTP_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+# ▶ 압축
+def _accepted(accept_encoding: str, name: str) -> bool:
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip() in (name, "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    if BROTLI_AVAILABLE and _accepted(accept_encoding, "br"):
+        return "br"
+    if _accepted(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+
+def _compressible(headers: MutableHeaders) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES or content_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """
+    순수 ASGI 압축 미들웨어. 본문이 한 번에 오는 응답(JSONResponse 등)만 압축하고,
+    more_body로 나뉘어 오는 스트리밍 응답은 건드리지 않습니다.
+    """
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # SSE 등 압축 대상이 아니면 바로 보내고, 대상이면 본문 첫 조각을 볼 때까지 미룹니다.
+                if _compressible(MutableHeaders(raw=list(message.get("headers", [])))):
+                    start = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            headers = MutableHeaders(raw=list(held.get("headers", [])))
+            body = message.get("body", b"")
+            if message.get("more_body") or len(body) < self.minimum_size:
+                await send(held)
+                await send(message)
+                return
+
+            if len(body) >= COMPRESSION_THREAD_MIN_SIZE:
+                body = await asyncio.to_thread(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(dict(held, headers=headers.raw))
+            await send(dict(message, body=body))
+
+        await self.app(scope, receive, send_wrapper)
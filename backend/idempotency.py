@@ -0,0 +1,260 @@
+# idempotency.py
+"""
+Idempotency-Key 헤더 처리.
+
+모바일 환경 등에서 클라이언트가 같은 요청을 다시 보내도 행이 두 번 생기거나
+LLM을 두 번 호출하지 않도록, IDEMPOTENT_ENDPOINTS에 해당하는 POST 요청에
+Idempotency-Key 헤더가 있으면:
+
+- 처음 보는 키: idempotency_keys 테이블에 in_progress로 선점(기본키 INSERT)한 뒤
+  요청을 처리하고 응답(상태 코드·헤더·본문)을 저장합니다.
+- 완료된 키: 엔드포인트를 실행하지 않고 저장된 응답을 그대로 돌려줍니다.
+  (Idempotent-Replayed: true 헤더)
+- 처리 중인 키: 같은 프로세스면 진행 중인 요청의 완료를 기다리고,
+  다른 프로세스면 DB를 폴링하며 기다린 뒤 저장된 응답을 돌려줍니다.
+- 같은 키를 다른 요청(경로·본문)에 쓰면 422.
+- 5xx·429 등 다시 시도하면 결과가 달라질 수 있는 응답은 저장하지 않고 키를 풀어 줍니다.
+
+저장된 응답은 IDEMPOTENCY_TTL_SECONDS 뒤 만료되어 지워집니다.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from starlette.datastructures import Headers
+
+from .database import AsyncSessionLocal
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# 이 시간 넘게 in_progress로 남은 키는 죽은 워커의 것으로 보고 다시 처리합니다.
+IDEMPOTENCY_LOCK_TIMEOUT = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "300"))
+# 동시에 들어온 중복 요청이 먼저 온 요청을 기다리는 최대 시간
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "120"))
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", "0.25"))
+# 이보다 큰 응답은 저장하지 않습니다.
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", str(1024 * 1024)))
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+# 만료된 키 정리 주기 (초)
+IDEMPOTENCY_SWEEP_INTERVAL = 60
+
+IDEMPOTENT_ENDPOINTS = (
+    "POST /resumes",
+    "POST /resumes/{resume_id}/feedback",
+    "POST /interviews/answers",
+    "POST /interviews/evaluate/{answer_id}",
+)
+
+# 저장하지 않는 상태 코드 (다시 시도하면 성공할 수 있음)
+RETRYABLE_STATUS = {408, 409, 425, 429}
+# 재생 시 다시 계산되어야 하는 헤더
+_SKIP_HEADERS = {b"content-length", b"date", b"server", b"server-timing"}
+
+
+def _compile(endpoint: str):
+    method, template = endpoint.split(" ", 1)
+    pattern = re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(template))
+    return method, re.compile(f"^{pattern}$")
+
+
+async def _send_json(send, status: int, detail: str, headers=()):
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())] + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send, record: IdempotencyKey):
+    body = record.response_body or b""
+    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(record.response_headers or "[]")]
+    headers += [(b"content-length", str(len(body)).encode()), (b"idempotent-replayed", b"true")]
+    await send({"type": "http.response.start", "status": record.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """순수 ASGI 미들웨어. 대상 엔드포인트의 요청 본문·응답을 버퍼링해 지문 계산과 저장에 씁니다."""
+    def __init__(self, app, endpoints=IDEMPOTENT_ENDPOINTS):
+        self.app = app
+        self.routes = [_compile(e) for e in endpoints]
+        # 이 프로세스에서 처리 중인 키 → 완료 시 결과가 채워지는 Future
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._last_sweep = 0.0
+
+    def _applies(self, scope) -> bool:
+        return any(scope["method"] == m and p.match(scope["path"]) for m, p in self.routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get("idempotency-key")
+        if not key:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > IDEMPOTENCY_MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key는 {IDEMPOTENCY_MAX_KEY_LENGTH}자 이하여야 합니다.")
+            return
+
+        # 지문 계산을 위해 본문을 먼저 모두 읽고, 엔드포인트에는 같은 본문을 다시 넘겨줍니다.
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(
+            b"\n".join([scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body])
+        ).hexdigest()
+
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            state, record = await self._claim(key, fingerprint)
+            if state == "claimed":
+                break
+            if state == "mismatch":
+                await _send_json(send, 422, "같은 Idempotency-Key가 다른 요청에 이미 사용되었습니다.")
+                return
+            if state == "completed":
+                await _replay(send, record)
+                return
+            if state == "in_progress":
+                if time.monotonic() >= deadline:
+                    await _send_json(send, 409, "같은 Idempotency-Key의 요청이 아직 처리 중입니다.",
+                                     [(b"retry-after", b"1")])
+                    return
+                await self._wait(key, deadline)
+            # "retry": 만료/포기된 키를 지웠거나 먼저 온 요청이 키를 풀어 줌 → 다시 선점 시도
+
+        sent_body = False
+
+        async def replay_receive():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": None, "headers": [], "body": [], "size": 0}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                piece = message.get("body", b"")
+                response["size"] += len(piece)
+                if response["size"] <= IDEMPOTENCY_MAX_BODY_BYTES:
+                    response["body"].append(piece)
+            await send(message)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            stored = False
+            try:
+                stored = await self._finish(key, response)
+            except Exception:
+                logger.exception("failed to store idempotent response for key %s", key)
+            finally:
+                self._inflight.pop(key, None)
+                future.set_result(stored)
+
+    async def _claim(self, key: str, fingerprint: str):
+        """("claimed" | "completed" | "in_progress" | "mismatch" | "retry", 완료된 레코드)"""
+        now = time.time()
+        async with AsyncSessionLocal() as db:
+            if now - self._last_sweep >= IDEMPOTENCY_SWEEP_INTERVAL:
+                self._last_sweep = now
+                await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+                await db.commit()
+
+            db.add(IdempotencyKey(
+                key=key, fingerprint=fingerprint, status="in_progress",
+                created_at=now, expires_at=now + IDEMPOTENCY_TTL_SECONDS,
+            ))
+            try:
+                await db.commit()
+                return "claimed", None
+            except IntegrityError:
+                await db.rollback()
+
+            record = await db.get(IdempotencyKey, key)
+            if record is None:
+                return "retry", None
+            abandoned = (
+                record.status == "in_progress"
+                and record.created_at < now - IDEMPOTENCY_LOCK_TIMEOUT
+                and key not in self._inflight
+            )
+            if record.expires_at < now or abandoned:
+                await db.delete(record)
+                await db.commit()
+                return "retry", None
+            if record.fingerprint != fingerprint:
+                return "mismatch", None
+            if record.status == "completed":
+                return "completed", record
+            return "in_progress", None
+
+    async def _wait(self, key: str, deadline: float):
+        """먼저 온 요청이 끝날 때까지 대기. 같은 프로세스면 Future, 아니면 DB 폴링 한 번 간격."""
+        future = self._inflight.get(key)
+        remaining = max(deadline - time.monotonic(), 0)
+        if future is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), remaining)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(min(IDEMPOTENCY_POLL_INTERVAL, remaining))
+
+    async def _finish(self, key: str, response: dict) -> bool:
+        """응답을 저장하거나(True), 저장할 수 없는 응답이면 키를 풀어 줍니다(False)."""
+        status = response["status"]
+        storable = (
+            status is not None
+            and status < 500
+            and status not in RETRYABLE_STATUS
+            and response["size"] <= IDEMPOTENCY_MAX_BODY_BYTES
+        )
+        async with AsyncSessionLocal() as db:
+            if not storable:
+                await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+                await db.commit()
+                return False
+            headers = [
+                [k.decode("latin-1"), v.decode("latin-1")]
+                for k, v in response["headers"] if k.lower() not in _SKIP_HEADERS
+            ]
+            await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status="completed",
+                    status_code=status,
+                    response_headers=json.dumps(headers),
+                    response_body=b"".join(response["body"]),
+                )
+            )
+            await db.commit()
+            return True
@@ -0,0 +1,291 @@
+# jobs.py
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal
+from .models import Job, Resume, InterviewAnswer, InterviewQuestion
+from .llm_transport import LLMError
+from .services import give_resume_feedback, evaluate_interview_answer
+from .stats import save_resume_review, save_answer_evaluation
+from .answer_index import answer_index
+from .llm_scheduler import BULK, set_llm_work, llm_work
+
+logger = logging.getLogger(__name__)
+
+# 작업 큐 설정 (환경변수로 조정 가능)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "2"))
+# 이 시간(초) 넘게 running 상태로 남은 작업은 죽은 워커의 작업으로 보고 재시도
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "600"))
+# 오래된 running 작업을 찾는 주기(초). 시작 시 한 번만 보면 재시작 직후 남은 작업이 다음 재시작까지 묶입니다.
+JOB_SWEEP_INTERVAL = float(os.getenv("JOB_SWEEP_INTERVAL", "60"))
+
+
+class PermanentJobError(Exception):
+    """재시도해도 성공할 수 없는 오류 (대상 행 없음 등)"""
+
+
+# ▶ 작업 종류별 핸들러: payload(dict) -> result(dict)
+# 핸들러는 입력을 읽는 세션과 결과를 쓰는 세션을 따로 열어, LLM 호출 동안 커넥션을 쥐고 있지 않습니다.
+async def _run_resume_feedback(payload: dict) -> dict:
+    resume_id = payload["resume_id"]
+    async with AsyncSessionLocal() as db:
+        resume = await db.get(Resume, resume_id)
+        if resume is None:
+            raise PermanentJobError("Resume not found")
+        user_id, original_text = resume.user_id, resume.original_text
+
+    set_llm_work(user_id, BULK)
+    result = await give_resume_feedback(original_text, mode=payload.get("mode"))
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(save_resume_review, resume_id, user_id, result["edited_text"], result["feedback"])
+        await db.commit()
+    return {
+        "resume_id": resume_id,
+        "edited_text": result["edited_text"],
+        "feedback": result["feedback"],
+        "mode": result["mode"],
+        "segments": result["segments"],
+    }
+
+
+async def _run_answer_evaluation(payload: dict) -> dict:
+    answer_id = payload["answer_id"]
+    async with AsyncSessionLocal() as db:
+        answer = await db.get(InterviewAnswer, answer_id)
+        if answer is None:
+            raise PermanentJobError("Answer not found")
+        question_id, answer_text = answer.question_id, answer.answer_text
+        user_id = await db.scalar(select(InterviewQuestion.user_id).where(InterviewQuestion.id == question_id))
+
+    set_llm_work(user_id, BULK)
+    result = await evaluate_interview_answer(answer_text)
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(save_answer_evaluation, answer_id, question_id, result["score"], result["feedback"])
+        await db.commit()
+    answer_index.add(answer_id, answer_text, result["score"])
+    return {
+        "answer_id": answer_id,
+        "score": result["score"],
+        "feedback": result["feedback"],
+    }
+
+
+JOB_HANDLERS = {
+    "resume_feedback": _run_resume_feedback,
+    "answer_evaluation": _run_answer_evaluation,
+}
+
+
+class JobQueue:
+    """
+    jobs 테이블을 영속 저장소로 쓰는 프로세스 내 작업 큐.
+    - enqueue(): 작업 행을 저장하고 워커에게 id를 넘깁니다.
+    - 워커는 queued → running 전이를 원자적으로 선점한 뒤 핸들러를 실행합니다.
+    - 일시적 오류는 지수 백오프로 JOB_MAX_ATTEMPTS 번까지 재시도합니다.
+    - start() 시 끝나지 않은 작업(queued, 오래된 running)을 복구하고,
+      이후에도 JOB_SWEEP_INTERVAL마다 오래된 running 작업을 다시 큐에 넣습니다.
+    """
+    def __init__(self, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue: asyncio.Queue = None
+        self._tasks = []
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        for job_id in await self._recover(include_queued=True):
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, db: AsyncSession, kind: str, payload: dict) -> Job:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"unknown job kind: {kind}")
+        now = time.time()
+        job = Job(
+            kind=kind,
+            payload=json.dumps(payload, ensure_ascii=False),
+            status="queued",
+            attempts=0,
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        if self._queue is not None:
+            self._queue.put_nowait(job.id)
+        return job
+
+    async def enqueue_many(self, db: AsyncSession, kind: str, payloads: list) -> list:
+        """같은 종류의 작업 여러 개를 한 트랜잭션으로 등록합니다. (대량 등록용)"""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"unknown job kind: {kind}")
+        now = time.time()
+        jobs = [
+            Job(
+                kind=kind,
+                payload=json.dumps(payload, ensure_ascii=False),
+                status="queued",
+                attempts=0,
+                created_at=now,
+                updated_at=now,
+            )
+            for payload in payloads
+        ]
+        db.add_all(jobs)
+        await db.commit()
+        if self._queue is not None:
+            for job in jobs:
+                self._queue.put_nowait(job.id)
+        return jobs
+
+    async def _recover(self, include_queued: bool = False) -> list:
+        """
+        JOB_STALE_SECONDS 넘게 running인 작업을 queued로 되돌리고 다시 넣을 id 목록을 리턴합니다.
+        include_queued=True(시작 시)면 queued 작업도 포함합니다. 실행 중에는 재시도 대기 중인
+        queued 작업이 백오프 전에 다시 들어가지 않도록 되돌린 작업만 리턴합니다.
+        """
+        cutoff = time.time() - JOB_STALE_SECONDS
+        async with AsyncSessionLocal() as db:
+            stale = list(await db.scalars(
+                select(Job.id).where(Job.status == "running", Job.updated_at < cutoff)
+            ))
+            if stale:
+                await db.execute(
+                    update(Job)
+                    .where(Job.id.in_(stale), Job.status == "running", Job.updated_at < cutoff)
+                    .values(status="queued")
+                )
+                await db.commit()
+            ids = stale
+            if include_queued:
+                ids = list(await db.scalars(
+                    select(Job.id).where(Job.status == "queued").order_by(Job.id)
+                ))
+        if ids:
+            logger.info("recovered %d unfinished jobs", len(ids))
+        return ids
+
+    async def _sweeper(self):
+        while True:
+            await asyncio.sleep(JOB_SWEEP_INTERVAL)
+            try:
+                for job_id in await self._recover():
+                    self._queue.put_nowait(job_id)
+            except Exception:
+                logger.exception("stale job sweep failed")
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("job %s crashed", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int):
+        job = await self._claim(job_id)
+        if job is None:
+            return
+
+        handler = JOB_HANDLERS.get(job["kind"])
+        try:
+            if handler is None:
+                raise PermanentJobError(f"unknown job kind: {job['kind']}")
+            # 백그라운드 작업의 LLM 호출은 bulk 우선순위 (핸들러가 대상 사용자를 지정)
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                with llm_work(priority=BULK):
+                    result = await handler(json.loads(job["payload"]))
+            finally:
+                heartbeat.cancel()
+        except PermanentJobError as e:
+            await self._finish(job_id, "failed", error=str(e))
+        except Exception as e:
+            # 잘못된 요청 등 일시적이지 않은 LLM 오류는 재시도하지 않습니다.
+            if job["attempts"] >= self.max_attempts or (isinstance(e, LLMError) and not e.transient):
+                await self._finish(job_id, "failed", error=str(e))
+                return
+            delay = JOB_RETRY_BASE_DELAY * 2 ** (job["attempts"] - 1)
+            delay *= random.uniform(0.5, 1.5)
+            if isinstance(e, LLMError) and e.retry_after:
+                delay = max(delay, e.retry_after)
+            logger.warning("job %s attempt %s failed (%s), retrying in %.1fs",
+                           job_id, job["attempts"], e, delay)
+            await self._finish(job_id, "queued", error=str(e))
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job_id)
+        else:
+            await self._finish(job_id, "succeeded", result=result)
+
+    async def _claim(self, job_id: int):
+        """queued 상태인 작업만 running으로 바꿔 선점합니다. 이미 선점됐으면 None."""
+        async with AsyncSessionLocal() as db:
+            claimed = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued")
+                .values(status="running", attempts=Job.attempts + 1, updated_at=time.time())
+            )
+            await db.commit()
+            if not claimed.rowcount:
+                return None
+            job = await db.get(Job, job_id)
+            return {"kind": job.kind, "payload": job.payload, "attempts": job.attempts}
+
+    async def _heartbeat(self, job_id: int):
+        """실행 중인 작업의 updated_at을 갱신해 오래 걸리는 작업이 stale로 다시 잡히지 않게 합니다."""
+        while True:
+            await asyncio.sleep(JOB_STALE_SECONDS / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == "running")
+                        .values(updated_at=time.time())
+                    )
+                    await db.commit()
+            except Exception:
+                logger.exception("job %s heartbeat failed", job_id)
+
+    async def _finish(self, job_id: int, status: str, result: dict = None, error: str = None):
+        async with AsyncSessionLocal() as db:
+            job = await db.get(Job, job_id)
+            job.status = status
+            job.result = json.dumps(result, ensure_ascii=False) if result is not None else None
+            job.error = error
+            job.updated_at = time.time()
+            await db.commit()
+
+
+def job_to_dict(job: Job) -> dict:
+    """JobOut 응답용 dict로 변환 (payload/result는 JSON 문자열로 저장됨)"""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+    }
+
+
+# 전역 인스턴스 (main.py lifespan에서 start/stop)
+job_queue = JobQueue()
@@ -0,0 +1,187 @@
+# llm_providers.py
+"""
+LLMTransport 아래에서 실제 모델을 호출하는 프로바이더.
+- OpenAIProvider: OpenAI ChatCompletion API (기본값)
+- FakeProvider: 네트워크 없이 정해진 지연·토큰 속도로 고정 응답을 돌려주는 로컬 프로바이더.
+  부하 테스트/프로파일링에서 서비스 자체의 오버헤드만 측정할 때 씁니다.
+
+LLM_PROVIDER 환경변수로 선택합니다. ("openai" | "fake")
+"""
+
+import os
+import json
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .llm_transport import LLMError, LLMRequestError, estimate_tokens, to_llm_error
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+
+# FakeProvider 설정
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "200"))
+# 초당 생성 토큰 수. 0 이면 생성 시간 없이 latency만 적용합니다.
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "50"))
+# 모델별 생성 속도 {"gpt-4o-mini": 120} (JSON, 선택). 라우팅 정책 비교(benchmark --routes)용
+FAKE_LLM_MODEL_TOKENS_PER_SECOND = json.loads(os.getenv("FAKE_LLM_MODEL_TOKENS_PER_SECOND") or "{}")
+# {"system 프롬프트에 포함된 문자열": "응답"} 형태의 JSON 파일 (선택)
+FAKE_LLM_RESPONSES_FILE = os.getenv("FAKE_LLM_RESPONSES_FILE")
+
+
+@dataclass
+class LLMResponse:
+    """프로바이더 공통 응답"""
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class OpenAIProvider:
+    """
+    AsyncOpenAI 클라이언트를 감싼 프로바이더. 클라이언트는 처음 호출할 때 만들므로
+    OPENAI_API_KEY가 없어도 앱은 뜨고, 실제 호출 시점에 LLMRequestError가 납니다.
+    재시도는 LLMTransport가 하므로 SDK 재시도는 끕니다.
+    """
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, timeout: float = 60):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.timeout = timeout
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            if not self.api_key:
+                raise LLMRequestError("환경변수에 OPENAI_API_KEY가 설정되어 있지 않습니다. (.env 파일 확인)")
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+        return self._client
+
+    async def complete(self, request: dict) -> LLMResponse:
+        try:
+            response = await self.client.chat.completions.create(**request)
+        except LLMError:
+            raise
+        except Exception as e:
+            raise to_llm_error(e) from e
+        usage = response.usage
+        return LLMResponse(
+            text=response.choices[0].message.content.strip(),
+            prompt_tokens=usage.prompt_tokens if usage is not None else None,
+            completion_tokens=usage.completion_tokens if usage is not None else None,
+        )
+
+    async def stream(self, request: dict):
+        """토큰 조각(문자열)을 yield 합니다."""
+        try:
+            response = await self.client.chat.completions.create(**request, stream=True)
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except LLMError:
+            raise
+        except Exception as e:
+            raise to_llm_error(e) from e
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+
+
+# 서비스의 파서(parse_interview_questions, evaluate_interview_answer,
+# StructuredFeedback)가 그대로 처리할 수 있는 형식의 기본 응답
+FAKE_RESPONSES: Dict[str, str] = {
+    "면접관입니다": "점수: 4.0\n피드백: 질문의 요지를 잘 짚었고 사례가 구체적입니다. 수치 근거를 덧붙이면 더 좋습니다.",
+    "면접 질문": (
+        "1. 지원한 직무에 관심을 갖게 된 계기는 무엇인가요?\n"
+        "2. 가장 어려웠던 프로젝트와 해결 과정을 설명해 주세요.\n"
+        "3. 팀원과 의견이 갈렸을 때 어떻게 조율했나요?\n"
+        "4. 입사 후 3년 안에 이루고 싶은 목표는 무엇인가요?\n"
+        "5. 마지막으로 하고 싶은 말이 있나요?"
+    ),
+    "JSON": json.dumps({
+        "edited_text": "저는 문제를 끝까지 파고드는 개발자입니다. 여러 프로젝트에서 성능 병목을 찾아 개선했습니다.",
+        "feedback": "1) 첫 문장에서 강점을 분명히 드러냈습니다.\n2) 성과를 수치로 보여 주면 설득력이 커집니다.",
+    }, ensure_ascii=False),
+    "비교하여": "1) 문장 길이를 줄여 가독성을 높였습니다.\n2) 경험과 직무의 연결을 강조했습니다.\n3) 마무리 문장을 구체화했습니다.",
+    "부분별로": "1) 전체적으로 문장 길이를 줄여 가독성을 높였습니다.\n2) 섹션마다 경험과 직무의 연결을 강조했습니다.",
+}
+FAKE_DEFAULT_RESPONSE = "저는 문제를 끝까지 파고드는 개발자입니다. 여러 프로젝트에서 성능 병목을 찾아 개선했습니다."
+
+
+class FakeProvider:
+    """
+    네트워크 없이 동작하는 결정적(deterministic) 프로바이더.
+    system 프롬프트에 포함된 키워드로 고정 응답을 고르고,
+    latency_ms + (응답 토큰 수 / tokens_per_second) 만큼 기다린 뒤 돌려줍니다.
+    model_tokens_per_second에 요청 모델이 있으면 그 속도를 씁니다.
+    """
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = FAKE_LLM_LATENCY_MS,
+        tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND,
+        responses: Optional[Dict[str, str]] = None,
+        model_tokens_per_second: Optional[Dict[str, float]] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.model_tokens_per_second = (
+            model_tokens_per_second if model_tokens_per_second is not None
+            else dict(FAKE_LLM_MODEL_TOKENS_PER_SECOND)
+        )
+        if responses is None:
+            responses = dict(FAKE_RESPONSES)
+            if FAKE_LLM_RESPONSES_FILE:
+                with open(FAKE_LLM_RESPONSES_FILE, encoding="utf-8") as f:
+                    responses.update(json.load(f))
+        self.responses = responses
+        self.calls = 0
+
+    def _respond(self, request: dict) -> str:
+        system = request["messages"][0]["content"]
+        for keyword, text in self.responses.items():
+            if keyword in system:
+                return text
+        return FAKE_DEFAULT_RESPONSE
+
+    def _generation_seconds(self, tokens: int, model: Optional[str] = None) -> float:
+        tokens_per_second = self.model_tokens_per_second.get(model, self.tokens_per_second)
+        return tokens / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    async def complete(self, request: dict) -> LLMResponse:
+        self.calls += 1
+        text = self._respond(request)
+        completion_tokens = estimate_tokens(text)
+        await asyncio.sleep(self.latency_ms / 1000 + self._generation_seconds(completion_tokens, request.get("model")))
+        prompt = "".join(m["content"] for m in request["messages"])
+        return LLMResponse(text=text, prompt_tokens=estimate_tokens(prompt),
+                           completion_tokens=completion_tokens)
+
+    async def stream(self, request: dict):
+        """첫 토큰까지 latency_ms, 이후 어절 단위로 tokens_per_second 속도에 맞춰 yield 합니다."""
+        self.calls += 1
+        text = self._respond(request)
+        await asyncio.sleep(self.latency_ms / 1000)
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == len(words) - 1 else word + " "
+            await asyncio.sleep(self._generation_seconds(estimate_tokens(piece), request.get("model")))
+            yield piece
+
+    async def aclose(self):
+        pass
+
+
+def make_provider(name: str = LLM_PROVIDER, timeout: float = 60):
+    """LLM_PROVIDER 값에 맞는 프로바이더를 만듭니다."""
+    if name == "openai":
+        return OpenAIProvider(timeout=timeout)
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"알 수 없는 LLM_PROVIDER: {name}")
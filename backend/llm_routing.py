@@ -0,0 +1,180 @@
+# llm_routing.py
+"""
+작업 종류(step)와 입력 길이에 따라 모델·max_tokens·temperature를 고르는 라우팅 정책.
+
+GPTClient는 호출마다 LLMRouter.route()로 경로(Route)를 고르고, 어느 경로를 골랐는지
+(모델, 출력 한도)를 LLMCallStats·메트릭(llm_route_decisions_total)·router.stats()에 남깁니다.
+
+- 규칙은 위에서부터 검사해 처음 맞는 것을 씁니다. step이 같고 입력(user 프롬프트)
+  토큰 추정치가 max_input_tokens 이하면 맞는 규칙입니다. (생략하면 길이와 무관)
+- 출력 한도는 max(max_tokens, 입력 토큰 × output_ratio + extra_tokens) 입니다.
+  수정본처럼 입력이 길수록 출력도 길어지는 작업은 output_ratio로 한도를 늘립니다.
+- 기본 규칙은 LLM_MODEL / LLM_SMALL_MODEL을 씁니다. 채점·질문 생성처럼 출력이 짧은
+  작업은 작은 모델과 작은 출력 한도로 보냅니다. (LLM_SMALL_MODEL을 지정하지 않으면 같은 모델)
+- LLM_ROUTES_FILE에 JSON 규칙 목록을 두면 기본 규칙보다 먼저 검사합니다.
+    [{"step": "evaluation", "max_input_tokens": 300, "model": "gpt-4o-mini", "max_tokens": 200},
+     {"step": ["edit", "structured"], "model": "gpt-4o", "max_tokens": 512, "output_ratio": 1.5}]
+- LLM_ROUTING_ENABLED=0 이면 모든 작업에 LLM_MODEL, LLM_MAX_TOKENS 하나만 씁니다.
+
+step 이름: edit, feedback, feedback_merge, structured(자소서 첨삭), generate(자소서 생성),
+questions(면접 질문), evaluation(답변 채점)
+"""
+
+import os
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .llm_transport import estimate_tokens
+
+LLM_ROUTING_ENABLED = os.getenv("LLM_ROUTING_ENABLED", "1") == "1"
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+# 짧은 출력 작업(채점·질문 생성)용 모델. 예: "gpt-4o-mini"
+LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", LLM_MODEL)
+# 규칙에 따로 없을 때의 응답 최대 토큰 수
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", os.getenv("OPENAI_MAX_TOKENS", "512")))
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+LLM_ROUTES_FILE = os.getenv("LLM_ROUTES_FILE")
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    model: str
+    max_tokens: int
+    temperature: float = LLM_TEMPERATURE
+    output_ratio: float = 0.0
+    extra_tokens: int = 0
+
+    def budget(self, input_tokens: int) -> int:
+        """이 경로로 보낼 요청의 max_tokens"""
+        return max(self.max_tokens, int(input_tokens * self.output_ratio) + self.extra_tokens)
+
+
+@dataclass(frozen=True)
+class RoutingRule:
+    steps: Tuple[str, ...]
+    route: Route
+    max_input_tokens: Optional[int] = None
+
+    def matches(self, step: str, input_tokens: int) -> bool:
+        return step in self.steps and (self.max_input_tokens is None or input_tokens <= self.max_input_tokens)
+
+
+class RouteDecision(NamedTuple):
+    step: str
+    route: str
+    model: str
+    max_tokens: int
+    temperature: float
+    input_tokens: int
+
+
+def default_rules(model: str = LLM_MODEL, small_model: str = LLM_SMALL_MODEL,
+                  max_tokens: int = LLM_MAX_TOKENS) -> List[RoutingRule]:
+    def rule(steps, name, route_model, route_max_tokens, max_input_tokens=None, **kwargs):
+        route = Route(name, route_model, route_max_tokens, **kwargs)
+        return RoutingRule(tuple(steps), route, max_input_tokens)
+
+    return [
+        # 점수 한 줄 + 짧은 피드백
+        rule(["evaluation"], "evaluation.short", small_model, 320, max_input_tokens=300),
+        rule(["evaluation"], "evaluation", small_model, max_tokens),
+        # 질문 5개
+        rule(["questions"], "questions", small_model, 400),
+        # 수정본은 입력 길이의 1.5배 이상을 출력 한도로 잡아 잘리지 않게 합니다.
+        rule(["edit"], "edit", model, max_tokens, output_ratio=1.5, extra_tokens=32),
+        # 수정본과 피드백을 한 응답에 담습니다.
+        rule(["structured"], "structured", model, max_tokens * 2,
+             output_ratio=1.5, extra_tokens=32 + max_tokens),
+        rule(["feedback", "feedback_merge"], "feedback", model, max_tokens),
+        # 자소서 한 편 전체
+        rule(["generate"], "generate", model, max_tokens * 2),
+    ]
+
+
+def load_rules(path: str) -> List[RoutingRule]:
+    """LLM_ROUTES_FILE 형식의 JSON 규칙 목록을 읽습니다. 빠진 값은 기본값(LLM_MODEL 등)으로 채웁니다."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    rules = []
+    for i, entry in enumerate(entries):
+        steps = entry["step"]
+        steps = (steps,) if isinstance(steps, str) else tuple(steps)
+        route = Route(
+            name=entry.get("name") or f"custom.{i}.{steps[0]}",
+            model=entry.get("model", LLM_MODEL),
+            max_tokens=int(entry.get("max_tokens", LLM_MAX_TOKENS)),
+            temperature=float(entry.get("temperature", LLM_TEMPERATURE)),
+            output_ratio=float(entry.get("output_ratio", 0.0)),
+            extra_tokens=int(entry.get("extra_tokens", 0)),
+        )
+        rules.append(RoutingRule(steps, route, entry.get("max_input_tokens")))
+    return rules
+
+
+@dataclass
+class _RouteStats:
+    model: str = ""
+    calls: int = 0
+    cached: int = 0
+    elapsed_ms: float = 0.0
+    input_tokens: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    budget_tokens: int = 0
+
+
+class LLMRouter:
+    """규칙 목록으로 경로를 고르고, (step, 경로)별 호출 수·지연·토큰을 누적합니다."""
+    def __init__(self, rules: List[RoutingRule], default: Route):
+        self.rules = list(rules)
+        self.default = default
+        self._stats: Dict[Tuple[str, str], _RouteStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMRouter":
+        if not LLM_ROUTING_ENABLED:
+            return cls.fixed()
+        rules = load_rules(LLM_ROUTES_FILE) if LLM_ROUTES_FILE else []
+        return cls(rules + default_rules(), Route("default", LLM_MODEL, LLM_MAX_TOKENS))
+
+    @classmethod
+    def fixed(cls, model: str = LLM_MODEL, max_tokens: int = LLM_MAX_TOKENS,
+              temperature: float = LLM_TEMPERATURE) -> "LLMRouter":
+        """모든 작업에 같은 모델·출력 한도를 쓰는 정책 (라우팅 이전 동작, 비교 기준)"""
+        return cls([], Route("fixed", model, max_tokens, temperature))
+
+    def route(self, step: str, user_prompt: str) -> RouteDecision:
+        input_tokens = estimate_tokens(user_prompt)
+        route = next((r.route for r in self.rules if r.matches(step, input_tokens)), self.default)
+        return RouteDecision(step, route.name, route.model, route.budget(input_tokens),
+                             route.temperature, input_tokens)
+
+    def record(self, decision: RouteDecision, elapsed_ms: float, cached: bool = False,
+               prompt_tokens: int = 0, completion_tokens: int = 0):
+        with self._lock:
+            stats = self._stats.setdefault((decision.step, decision.route), _RouteStats(decision.model))
+            stats.calls += 1
+            stats.cached += int(cached)
+            stats.elapsed_ms += elapsed_ms
+            stats.input_tokens += decision.input_tokens
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            # 캐시 적중은 업스트림 한도를 쓰지 않습니다.
+            if not cached:
+                stats.budget_tokens += decision.max_tokens
+
+    def stats(self) -> List[dict]:
+        """(step, 경로)별 누적치. budget_tokens는 요청에 실은 max_tokens의 합 (속도 제한 예약량)"""
+        with self._lock:
+            return [
+                dict(step=step, route=route, **vars(stats))
+                for (step, route), stats in sorted(self._stats.items())
+            ]
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,245 @@
+# llm_scheduler.py
+"""
+GPTClient 앞단의 LLM 호출 승인(admission) 스케줄러.
+
+모든 LLM 호출이 같은 줄에 서면 한 사용자의 일괄 평가가 다른 사용자의 질문 생성까지
+느리게 만들므로, 호출마다 슬롯을 받아야 업스트림으로 보냅니다.
+
+- 우선순위: interactive(사용자가 응답을 기다리는 요청) > bulk(일괄 평가, 백그라운드 작업)
+  bulk는 슬롯을 최대 LLM_BULK_MAX_SLOTS개까지만 쓰므로 interactive용 여유가 항상 남습니다.
+  interactive가 LLM_INTERACTIVE_BURST번 연속으로 먼저 들어가면 대기 중인 bulk를 한 번 넣어
+  bulk가 굶지 않게 합니다.
+- 사용자별 동시 호출 수: LLM_USER_MAX_INFLIGHT. 같은 우선순위 안에서는 사용자별 대기열을
+  돌아가며(round-robin) 꺼내므로 요청이 많은 사용자가 줄을 독차지하지 못합니다.
+- 대기열이 가득 차거나(LLM_QUEUE_MAX / LLM_BULK_QUEUE_MAX) 대기 시간이 한도를 넘으면
+  기다리게 두지 않고 LLMQueueFullError(429 + Retry-After)로 바로 실패합니다.
+
+호출 주체(사용자·우선순위)는 contextvar로 전달합니다. 라우터는 set_llm_work()를,
+작업 큐처럼 오래 사는 태스크는 with llm_work(...)를 씁니다. 지정하지 않으면
+사용자 없는 interactive 호출로 봅니다.
+"""
+
+import os
+import math
+import time
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, NamedTuple, Optional
+
+from .llm_transport import LLMRateLimitError
+from .metrics import record_llm_queue_wait, record_llm_rejection
+
+INTERACTIVE, BULK = "interactive", "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "1") == "1"
+# 동시에 업스트림으로 보낼 최대 호출 수 (기본: OPENAI_MAX_CONCURRENCY)
+LLM_SCHEDULER_SLOTS = int(os.getenv("LLM_SCHEDULER_SLOTS", os.getenv("OPENAI_MAX_CONCURRENCY", "8")))
+LLM_BULK_MAX_SLOTS = int(os.getenv("LLM_BULK_MAX_SLOTS", str(max(1, LLM_SCHEDULER_SLOTS - 2))))
+# 긴 자소서 분할 첨삭(RESUME_CHUNK_CONCURRENCY)이 한 사용자 안에서 병렬로 돌 수 있는 값
+LLM_USER_MAX_INFLIGHT = int(os.getenv("LLM_USER_MAX_INFLIGHT", "4"))
+LLM_INTERACTIVE_BURST = int(os.getenv("LLM_INTERACTIVE_BURST", "4"))
+# 우선순위별 최대 대기 수 / 최대 대기 시간(초)
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "64"))
+LLM_BULK_QUEUE_MAX = int(os.getenv("LLM_BULK_QUEUE_MAX", "256"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "15"))
+LLM_BULK_QUEUE_TIMEOUT = float(os.getenv("LLM_BULK_QUEUE_TIMEOUT", "300"))
+
+
+class LLMQueueFullError(LLMRateLimitError):
+    """스케줄러 대기열이 가득 찼거나 대기 시간이 한도를 넘음 (업스트림은 호출하지 않음)"""
+
+
+class LLMWork(NamedTuple):
+    user_id: Optional[int] = None
+    priority: str = INTERACTIVE
+
+
+_current_work: contextvars.ContextVar = contextvars.ContextVar("llm_work", default=LLMWork())
+
+
+def set_llm_work(user_id: Optional[int] = None, priority: str = INTERACTIVE):
+    """
+    현재 컨텍스트의 LLM 호출 주체를 지정합니다. 반환값은 reset용 토큰.
+    요청은 각자 새 컨텍스트에서 처리되므로 라우터에서는 되돌리지 않아도 되고,
+    SSE 스트림도 엔드포인트에서 지정한 값을 그대로 이어받습니다.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown priority: {priority}")
+    return _current_work.set(LLMWork(user_id, priority))
+
+
+@contextmanager
+def llm_work(user_id: Optional[int] = None, priority: str = INTERACTIVE):
+    token = set_llm_work(user_id, priority)
+    try:
+        yield
+    finally:
+        _current_work.reset(token)
+
+
+def current_work() -> LLMWork:
+    return _current_work.get()
+
+
+class _Waiter:
+    __slots__ = ("work", "future", "enqueued")
+
+    def __init__(self, work: LLMWork):
+        self.work = work
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued = time.monotonic()
+
+
+class LLMScheduler:
+    """우선순위·사용자별 대기열로 LLM 호출 슬롯을 나눠 주는 스케줄러 (이벤트 루프 하나에서 사용)"""
+    def __init__(
+        self,
+        slots: int = LLM_SCHEDULER_SLOTS,
+        bulk_slots: int = LLM_BULK_MAX_SLOTS,
+        user_limit: int = LLM_USER_MAX_INFLIGHT,
+        interactive_burst: int = LLM_INTERACTIVE_BURST,
+        queue_limits: Optional[Dict[str, int]] = None,
+        queue_timeouts: Optional[Dict[str, float]] = None,
+        enabled: bool = LLM_SCHEDULER_ENABLED,
+    ):
+        self.slots = slots
+        self.class_slots = {INTERACTIVE: slots, BULK: min(bulk_slots, slots)}
+        self.user_limit = user_limit
+        self.interactive_burst = interactive_burst
+        self.queue_limits = queue_limits or {INTERACTIVE: LLM_QUEUE_MAX, BULK: LLM_BULK_QUEUE_MAX}
+        self.queue_timeouts = queue_timeouts or {INTERACTIVE: LLM_QUEUE_TIMEOUT, BULK: LLM_BULK_QUEUE_TIMEOUT}
+        self.enabled = enabled
+
+        # 우선순위 -> {사용자 -> 대기열}. 사용자 순서가 곧 round-robin 순서입니다.
+        self._queues: Dict[str, "OrderedDict[Optional[int], deque]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._queued = {p: 0 for p in PRIORITIES}
+        self._inflight = {p: 0 for p in PRIORITIES}
+        self._user_inflight: Dict[int, int] = {}
+        self._streak = 0
+        # 슬롯 하나를 쥐고 있는 평균 시간 (Retry-After 추정용 지수 이동 평균)
+        self._avg_hold = 1.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """현재 컨텍스트(set_llm_work)의 사용자·우선순위로 슬롯을 받아 호출 동안 쥐고 있습니다."""
+        if not self.enabled:
+            yield
+            return
+        work = current_work()
+        await self._acquire(work)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(work, time.monotonic() - started)
+
+    async def _acquire(self, work: LLMWork):
+        waiter = _Waiter(work)
+        self._queues[work.priority].setdefault(work.user_id, deque()).append(waiter)
+        self._queued[work.priority] += 1
+        self._dispatch()
+        if waiter.future.done():
+            record_llm_queue_wait(work.priority, 0.0)
+            return
+        if self._queued[work.priority] > self.queue_limits[work.priority]:
+            self._remove(waiter)
+            self._reject(work, "queue_full")
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeouts[work.priority])
+        except asyncio.CancelledError:
+            # 슬롯을 받은 직후 취소됐으면 돌려줍니다.
+            if waiter.future.done():
+                self._release(work, 0.0)
+            else:
+                self._remove(waiter)
+            raise
+        if not waiter.future.done():
+            self._remove(waiter)
+            self._reject(work, "timeout")
+        record_llm_queue_wait(work.priority, time.monotonic() - waiter.enqueued)
+
+    def _reject(self, work: LLMWork, reason: str):
+        record_llm_rejection(work.priority, reason)
+        # 앞에 선 요청들이 빠지는 데 걸릴 대략적인 시간
+        ahead = self._queued[work.priority] + 1
+        retry_after = min(60, max(1, math.ceil(self._avg_hold * ahead / self.class_slots[work.priority])))
+        message = "LLM 요청이 많아 잠시 후 다시 시도해 주세요." if reason == "queue_full" else \
+            "LLM 대기 시간이 길어 요청을 처리하지 못했습니다. 잠시 후 다시 시도해 주세요."
+        raise LLMQueueFullError(message, retry_after=retry_after)
+
+    def _remove(self, waiter: _Waiter):
+        queue = self._queues[waiter.work.priority].get(waiter.work.user_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queued[waiter.work.priority] -= 1
+            if not queue:
+                del self._queues[waiter.work.priority][waiter.work.user_id]
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+    def _release(self, work: LLMWork, held: float):
+        self._inflight[work.priority] -= 1
+        if work.user_id is not None:
+            remaining = self._user_inflight[work.user_id] - 1
+            if remaining:
+                self._user_inflight[work.user_id] = remaining
+            else:
+                del self._user_inflight[work.user_id]
+        if held:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held
+        self._dispatch()
+
+    def _dispatch(self):
+        """빈 슬롯이 있는 동안 다음 차례의 대기자에게 슬롯을 줍니다."""
+        while sum(self._inflight.values()) < self.slots:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            work = waiter.work
+            self._inflight[work.priority] += 1
+            if work.user_id is not None:
+                self._user_inflight[work.user_id] = self._user_inflight.get(work.user_id, 0) + 1
+            waiter.future.set_result(None)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        order = PRIORITIES
+        if self._streak >= self.interactive_burst:
+            order = (BULK, INTERACTIVE)
+        for priority in order:
+            if self._inflight[priority] >= self.class_slots[priority]:
+                continue
+            waiter = self._pop(priority)
+            if waiter is None:
+                continue
+            bulk_waiting = self._queued[BULK] > 0
+            self._streak = self._streak + 1 if priority == INTERACTIVE and bulk_waiting else 0
+            return waiter
+        return None
+
+    def _pop(self, priority: str) -> Optional[_Waiter]:
+        """동시 호출 한도에 걸리지 않은 첫 사용자의 맨 앞 대기자. 꺼낸 사용자는 맨 뒤로 보냅니다."""
+        users = self._queues[priority]
+        # 사용자를 모르는 호출(user_id=None)에는 사용자별 한도를 적용하지 않습니다.
+        for user_id, queue in users.items():
+            if user_id is not None and self._user_inflight.get(user_id, 0) >= self.user_limit:
+                continue
+            waiter = queue.popleft()
+            self._queued[priority] -= 1
+            if queue:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            return waiter
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "queued": dict(self._queued),
+            "inflight": dict(self._inflight),
+            "users_inflight": len(self._user_inflight),
+            "avg_hold_seconds": round(self._avg_hold, 3),
+        }
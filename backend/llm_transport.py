@@ -0,0 +1,290 @@
+# llm_transport.py
+"""
+GPTClient와 LLM 프로바이더(llm_providers.py) 사이의 전송 계층.
+- 요청 수 / 토큰 수 기준 토큰 버킷으로 클라이언트 측 속도 제한
+- 429·5xx·타임아웃·연결 오류는 지터가 섞인 지수 백오프로 재시도 (Retry-After 우선)
+- 연속 실패 시 서킷 브레이커를 열어 일정 시간 즉시 실패
+- 동시에 들어온 동일 요청은 업스트림 호출 하나로 합침 (승인 슬롯도 첫 요청만 받음)
+- 오류는 문자열이 아니라 LLMError 계열 예외로 올려 보냄
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from typing import AsyncContextManager, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", os.getenv("OPENAI_MAX_RETRIES", "2")))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+# 0 이면 해당 제한을 끕니다.
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_RESET_TIMEOUT = float(os.getenv("LLM_CIRCUIT_RESET_TIMEOUT", "30"))
+
+
+# ▶ 예외
+class LLMError(Exception):
+    """LLM 호출 실패. transient=True 이면 잠시 후 재시도하면 성공할 수 있는 오류입니다."""
+    status_code = 502
+    transient = False
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMError):
+    status_code = 429
+    transient = True
+
+
+class LLMTimeoutError(LLMError):
+    status_code = 504
+    transient = True
+
+
+class LLMUnavailableError(LLMError):
+    status_code = 503
+    transient = True
+
+
+class LLMCircuitOpenError(LLMUnavailableError):
+    """서킷 브레이커가 열려 있어 호출하지 않고 바로 실패"""
+
+
+class LLMRequestError(LLMError):
+    """잘못된 요청/인증 오류 등 재시도해도 소용없는 오류"""
+    status_code = 502
+
+
+def to_llm_error(e: Exception) -> LLMError:
+    """OpenAI SDK 예외를 LLMError 계열로 변환합니다."""
+    if isinstance(e, LLMError):
+        return e
+    import openai
+    if isinstance(e, openai.APITimeoutError):
+        return LLMTimeoutError(f"LLM 응답 시간 초과: {e}")
+    if isinstance(e, openai.APIConnectionError):
+        return LLMUnavailableError(f"LLM 연결 실패: {e}")
+    if isinstance(e, openai.APIStatusError):
+        retry_after = _retry_after(e)
+        if e.status_code == 429:
+            return LLMRateLimitError(f"LLM 요청 한도 초과: {e}", retry_after)
+        if e.status_code >= 500:
+            return LLMUnavailableError(f"LLM 서버 오류({e.status_code}): {e}", retry_after)
+        return LLMRequestError(f"LLM 요청 오류({e.status_code}): {e}")
+    return LLMRequestError(f"LLM 호출 중 오류 발생: {e}")
+
+
+def _retry_after(e) -> Optional[float]:
+    try:
+        return float(e.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 대략적인 토큰 수 (한글은 글자당 1토큰 안팎, 영문은 4글자당 1토큰)"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii) // 4 + 1
+
+
+# ▶ 속도 제한 / 서킷 브레이커
+class TokenBucket:
+    """분당 per_minute 만큼 채워지는 토큰 버킷. per_minute <= 0 이면 제한 없음."""
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        if self.capacity <= 0:
+            return
+        amount = min(amount, self.capacity)
+        # 락을 쥔 채로 기다리므로 먼저 온 요청이 먼저 통과합니다.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    일시적 오류가 failure_threshold번 연속되면 열림(open) 상태가 되어
+    reset_timeout 동안 호출을 막습니다. 이후 반열림(half_open)에서는 시험 호출(probe)
+    하나만 보내고, 그 결과로 닫힐지 다시 열릴지 정할 때까지 나머지 호출은 바로 거절합니다.
+    시험 호출이 결과를 남기지 못하고 끝나면(취소 등) reset_timeout 뒤에 다음 호출이 시험 호출이 됩니다.
+    """
+    def __init__(self, failure_threshold: int = LLM_CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = LLM_CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = None
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        now = time.monotonic()
+        if self.state == "open":
+            remaining = self.reset_timeout - (now - self.opened_at)
+        elif self.probe_started is not None:
+            remaining = self.reset_timeout - (now - self.probe_started)
+        else:
+            remaining = 0
+        if remaining > 0:
+            raise LLMCircuitOpenError("LLM 서비스가 일시적으로 불안정합니다. 잠시 후 다시 시도해 주세요.",
+                                      retry_after=remaining)
+        self.state = "half_open"
+        self.probe_started = now
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_started = None
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("LLM circuit opened after %d failures", self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """시험 호출이 장애와 무관한 오류로 끝난 경우: 상태는 그대로 두고 다음 호출이 다시 시험하게 합니다."""
+        self.probe_started = None
+
+
+class LLMTransport:
+    """프로바이더 호출에 재시도·속도 제한·서킷 브레이커·중복 요청 합치기를 적용합니다."""
+    def __init__(self, provider, max_concurrency: int, max_retries: int = LLM_MAX_RETRIES):
+        self.provider = provider
+        self.max_retries = max_retries
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.request_bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+        self.token_bucket = TokenBucket(LLM_TOKENS_PER_MINUTE)
+        self.breaker = CircuitBreaker()
+        self._inflight = {}
+        self.coalesced = 0
+
+    async def create(self, request: dict,
+                     admission: Optional[Callable[[], AsyncContextManager]] = None):
+        """
+        ChatCompletion 요청 (반환값: LLMResponse). 완전히 같은 요청이 이미 진행 중이면 그 결과를 함께 기다립니다.
+        호출한 쪽이 취소돼도 다른 대기자를 위해 업스트림 호출은 계속 진행됩니다.
+        admission(예: LLMScheduler.slot)을 주면 업스트림을 실제로 호출하는 첫 요청만 그 안에서
+        실행하고, 합쳐지는 요청은 슬롯·사용자 한도를 쓰지 않고 결과만 기다립니다.
+        """
+        key = hashlib.sha256(
+            json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._create_admitted(request, admission))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    async def stream(self, request: dict):
+        """스트리밍 요청. 첫 토큰을 받기 전에 난 일시적 오류만 재시도합니다. 토큰 문자열을 yield."""
+        attempt = 0
+        while True:
+            await self._admit(request)
+            yielded = False
+            try:
+                async with self.semaphore:
+                    async for delta in self.provider.stream(request):
+                        yielded = True
+                        yield delta
+                self.breaker.record_success()
+                return
+            except Exception as e:
+                error = self._on_failure(e)
+                if yielded or not self._should_retry(error, attempt):
+                    raise error from e
+            await asyncio.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    def _forget(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # 모든 대기자가 취소된 경우 "exception was never retrieved" 경고 방지
+        if not task.cancelled():
+            task.exception()
+
+    async def _create_admitted(self, request: dict, admission):
+        if admission is None:
+            return await self._create_with_retries(request)
+        async with admission():
+            return await self._create_with_retries(request)
+
+    async def _create_with_retries(self, request: dict):
+        attempt = 0
+        while True:
+            await self._admit(request)
+            try:
+                async with self.semaphore:
+                    response = await self.provider.complete(request)
+                self.breaker.record_success()
+                return response
+            except Exception as e:
+                error = self._on_failure(e)
+                if not self._should_retry(error, attempt):
+                    raise error from e
+            await asyncio.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    async def _admit(self, request: dict):
+        self.breaker.before_call()
+        prompt = "".join(m["content"] for m in request["messages"])
+        await self.request_bucket.acquire(1)
+        await self.token_bucket.acquire(estimate_tokens(prompt) + request.get("max_tokens", 0))
+
+    def _on_failure(self, e: Exception) -> LLMError:
+        error = to_llm_error(e)
+        if error.transient and not isinstance(error, LLMCircuitOpenError):
+            self.breaker.record_failure()
+        elif not isinstance(error, LLMCircuitOpenError):
+            self.breaker.release_probe()
+        return error
+
+    def _should_retry(self, error: LLMError, attempt: int) -> bool:
+        return (
+            error.transient
+            and not isinstance(error, LLMCircuitOpenError)
+            and attempt < self.max_retries
+            and self.breaker.state != "open"
+        )
+
+    def _backoff(self, attempt: int, error: LLMError) -> float:
+        if error.retry_after:
+            return min(error.retry_after, LLM_RETRY_MAX_DELAY)
+        delay = min(LLM_RETRY_BASE_DELAY * 2 ** attempt, LLM_RETRY_MAX_DELAY)
+        return random.uniform(0, delay)
+
+    def stats(self) -> dict:
+        return {
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "inflight": len(self._inflight),
+            "coalesced": self.coalesced,
+        }
@@ -1,21 +1,110 @@
-
-from fastapi import FastAPI
-from .database import Base, engine
-from .routers import resume, interview, dashboard, exporter
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from .database import engine, async_engine
+from .migrations import init_db
+from .routers import resume, interview, dashboard, exporter, jobs, metrics
+from .services import gpt_client
+from .jobs import job_queue
+from .answer_index import answer_index
+from .renderers import shutdown_render_pool
+from .llm_transport import LLMError
+from .metrics import MetricsMiddleware, instrument_engine, register_gauge
+from .settings import AppSettings
+from .http_cache import CompressionMiddleware
+from .idempotency import IdempotencyMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
-# 데이터베이스 테이블 생성
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Job Prep Assistant")
-app.add_middleware(
-  CORSMiddleware,
-  allow_origins=["*"],    
-  allow_credentials=True,
-  allow_methods=["*"],
-  allow_headers=["*"],
-)
-app.include_router(resume.router, tags=["Resumes"])
-app.include_router(interview.router,tags=["Interviews"])
-app.include_router(dashboard.router,tags=["Dashboard"])
-app.include_router(exporter.router, prefix="/exporter", tags=["Exporter"])
+
+async def llm_error_handler(request: Request, exc: LLMError):
+    """LLM 호출 실패를 오류 종류에 맞는 상태 코드(429/502/503/504)로 돌려줍니다."""
+    headers = {}
+    if exc.retry_after:
+        headers["Retry-After"] = str(max(1, round(exc.retry_after)))
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=headers)
+
+
+def _register_gauges():
+    register_gauge("llm_circuit_open", "LLM 서킷 브레이커가 열려 있으면 1",
+                   lambda: {(): 1 if gpt_client.transport.breaker.state == "open" else 0})
+    register_gauge("llm_inflight_requests", "진행 중인 LLM 요청 수 (합쳐진 요청은 1건)",
+                   lambda: {(): gpt_client.transport.stats()["inflight"]})
+    register_gauge("llm_cache_hit_ratio", "LLM 응답 캐시 적중률",
+                   lambda: {(): gpt_client.cache.stats()["hit_rate"]})
+    register_gauge("answer_index_size", "유사도 인덱스에 들어 있는 채점 답변 수",
+                   lambda: {(): len(answer_index)})
+    register_gauge("llm_queue_depth", "LLM 스케줄러에서 슬롯을 기다리는 호출 수",
+                   lambda: {(p,): n for p, n in gpt_client.scheduler.stats()["queued"].items()},
+                   labelnames=("priority",))
+    register_gauge("llm_scheduler_inflight", "LLM 스케줄러 슬롯을 쥐고 있는 호출 수",
+                   lambda: {(p,): n for p, n in gpt_client.scheduler.stats()["inflight"].items()},
+                   labelnames=("priority",))
+
+
+def create_app(settings: Optional[AppSettings] = None) -> FastAPI:
+    """
+    앱 팩토리. import 시점에는 DB 접속·무거운 라이브러리 로딩을 하지 않고,
+    스키마 준비와 워커 시작은 lifespan(서버 시작 시)에서 합니다.
+        uvicorn backend.main:app
+        uvicorn backend.main:create_app --factory
+    """
+    settings = settings or AppSettings.from_env()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # 데이터베이스 테이블 생성 및 마이그레이션 (기존 app.db에 인덱스 추가 등)
+        if settings.init_db:
+            await asyncio.to_thread(init_db, engine)
+        # 백그라운드 작업 워커 시작 (미완료 작업 복구 포함)
+        if settings.start_job_workers:
+            await job_queue.start()
+        yield
+        if settings.start_job_workers:
+            await job_queue.stop()
+        shutdown_render_pool()
+        # 종료 시 OpenAI HTTP 커넥션 풀 정리
+        await gpt_client.aclose()
+
+    app = FastAPI(title=settings.title, lifespan=lifespan)
+    app.state.settings = settings
+    app.add_exception_handler(LLMError, llm_error_handler)
+
+    if settings.idempotency_enabled:
+        # 메트릭/압축보다 안쪽: 재생된 응답도 계측되고, 저장은 압축 전 본문으로 합니다.
+        app.add_middleware(IdempotencyMiddleware)
+
+    if settings.metrics_enabled:
+        # SQL 쿼리 수/소요 시간 계측 (동기 엔진: 캐시·CLI, 비동기 엔진: 라우터·작업 큐)
+        instrument_engine(engine)
+        instrument_engine(async_engine.sync_engine)
+        _register_gauges()
+        app.add_middleware(MetricsMiddleware)
+        # /metrics는 대시보드의 /{user_id}보다 먼저 등록해야 합니다.
+        app.include_router(metrics.router)
+
+    if settings.compression_enabled:
+        # CORS 바로 안쪽에서 최종 본문을 압축 (SSE·파일 스트리밍은 통과)
+        app.add_middleware(CompressionMiddleware)
+
+    # CORS는 마지막에 추가해 가장 바깥에 둡니다. 미들웨어가 바로 돌려주는 응답
+    # (Idempotency-Key 재생·409·422 등)에도 Access-Control-Allow-Origin이 붙어야 합니다.
+    app.add_middleware(
+      CORSMiddleware,
+      allow_origins=settings.cors_origins,
+      allow_credentials=True,
+      allow_methods=["*"],
+      allow_headers=["*"],
+      expose_headers=["X-Next-Cursor", "Server-Timing", "ETag", "Idempotent-Replayed"],
+    )
+
+    app.include_router(resume.router, tags=["Resumes"])
+    app.include_router(interview.router,tags=["Interviews"])
+    app.include_router(dashboard.router,tags=["Dashboard"])
+    app.include_router(exporter.router, prefix="/exporter", tags=["Exporter"])
+    app.include_router(jobs.router, tags=["Jobs"])
+    return app
+
+
+app = create_app()
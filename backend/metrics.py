@@ -0,0 +1,317 @@
+# metrics.py
+"""
+요청 / SQL 쿼리 / LLM 호출 계측과 Prometheus 텍스트 포맷 출력.
+- MetricsMiddleware: 라우트별 지연 히스토그램, 요청마다 SQL·LLM 소요 시간을 모아
+  Server-Timing 헤더와 느린 요청 로그(SLOW_REQUEST_MS 초과)에 남깁니다.
+- instrument_engine(): SQLAlchemy 엔진 이벤트로 쿼리 수와 소요 시간을 기록합니다.
+- record_llm_call(): GPTClient 호출마다 지연·토큰·캐시 여부를 기록합니다.
+- record_llm_route(): 라우팅 정책(llm_routing.py)이 고른 경로·모델을 셉니다.
+- record_llm_queue_wait() / record_llm_rejection(): LLM 스케줄러(llm_scheduler.py)의 대기 시간과 429 거절.
+외부 의존성 없이 카운터/히스토그램을 직접 구현하며, 핫패스에서는 dict 조회와
+덧셈 정도만 합니다.
+"""
+
+import os
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# 이 시간(ms)보다 오래 걸린 요청은 SQL/LLM 내역과 함께 경고 로그를 남깁니다.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+# ▶ 메트릭 타입
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        # SQL 이벤트는 스레드(asyncio.to_thread)에서도 호출되므로 잠금을 씁니다.
+        self._lock = threading.Lock()
+
+    def _labels(self, values: Tuple, extra: Optional[str] = None) -> str:
+        if not values:
+            return ""
+        names = self.labelnames + ((extra,) if extra else ())
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in zip(names, values)) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [버킷별 개수..., +Inf 개수, 합계]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def _samples(self):
+        lines = []
+        for labels, row in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), row[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _fmt(bound)
+                lines.append(f"{self.name}_bucket{self._labels(labels + (le,), extra='le')} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_fmt(row[-1])}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """스크레이프할 때 fn()을 호출해 값을 읽는 게이지. fn은 {labels 튜플: 값}을 돌려줍니다."""
+    kind = "gauge"
+
+    def __init__(self, name, help, fn: Callable[[], Dict[Tuple, float]], labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def _samples(self):
+        try:
+            values = self.fn()
+        except Exception:
+            logger.exception("gauge %s failed", self.name)
+            return []
+        return [f"{self.name}{self._labels(k)} {_fmt(v)}" for k, v in sorted(values.items())]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """같은 이름이 이미 있으면 교체합니다. (create_app()을 여러 번 호출하는 경우)"""
+        self.metrics = [m for m in self.metrics if m.name != metric.name]
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (스트리밍은 응답 종료까지)",
+    ("method", "route", "status")))
+HTTP_REQUEST_SQL_QUERIES = registry.register(Histogram(
+    "http_request_sql_queries", "요청 하나가 실행한 SQL 쿼리 수", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)))
+SQL_QUERY_DURATION = registry.register(Histogram(
+    "sql_query_duration_seconds", "SQL 쿼리 실행 시간", ("operation",), buckets=SQL_BUCKETS))
+LLM_CALL_DURATION = registry.register(Histogram(
+    "llm_call_duration_seconds", "LLM 호출 시간 (캐시 조회 포함)", ("step", "cached")))
+LLM_TOKENS = registry.register(Counter(
+    "llm_tokens_total", "LLM 토큰 사용량", ("step", "type")))
+LLM_ERRORS = registry.register(Counter(
+    "llm_errors_total", "LLM 호출 실패 수", ("step", "error")))
+LLM_ROUTE_DECISIONS = registry.register(Counter(
+    "llm_route_decisions_total", "라우팅 정책이 고른 경로 (캐시 적중 포함)", ("step", "route", "model")))
+LLM_QUEUE_WAIT = registry.register(Histogram(
+    "llm_queue_wait_seconds", "LLM 스케줄러에서 슬롯을 받기까지 기다린 시간", ("priority",)))
+LLM_ADMISSION_REJECTED = registry.register(Counter(
+    "llm_admission_rejected_total", "LLM 스케줄러가 429로 돌려보낸 호출 수", ("priority", "reason")))
+
+
+# ▶ 요청 단위 추적
+class RequestTrace:
+    """요청 하나 동안의 SQL/LLM 누적치. contextvar로 요청 처리 흐름 전체에 전달됩니다."""
+    __slots__ = ("sql_count", "sql_seconds", "llm_calls", "llm_seconds", "llm_tokens")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.llm_tokens = 0
+
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("request_trace", default=None)
+
+
+class MetricsMiddleware:
+    """
+    순수 ASGI 미들웨어 (SSE 스트리밍 응답을 버퍼링하지 않도록 BaseHTTPMiddleware를 쓰지 않습니다).
+    라우트 라벨은 경로 템플릿(/resumes/{resume_id})을 써서 라벨 수가 늘어나지 않게 합니다.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # 일반 응답은 이 시점에 처리가 끝났으므로 내역을 헤더로 알려 줍니다.
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", (
+                    f"app;dur={elapsed_ms:.1f}, db;dur={trace.sql_seconds * 1000:.1f}, "
+                    f"llm;dur={trace.llm_seconds * 1000:.1f}"
+                ).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            elapsed = time.perf_counter() - started
+            route_path = _route_template(scope)
+            HTTP_REQUEST_DURATION.observe(elapsed, scope["method"], route_path, str(status))
+            HTTP_REQUEST_SQL_QUERIES.observe(trace.sql_count, route_path)
+            if elapsed * 1000 >= SLOW_REQUEST_MS:
+                logger.warning(
+                    "slow request %s %s status=%s total=%.0fms sql=%d/%.0fms llm=%d/%.0fms tokens=%d",
+                    scope["method"], scope["path"], status, elapsed * 1000,
+                    trace.sql_count, trace.sql_seconds * 1000,
+                    trace.llm_calls, trace.llm_seconds * 1000, trace.llm_tokens,
+                )
+
+
+def _route_template(scope) -> str:
+    """/resumes/3 → /resumes/{resume_id}. 매칭된 라우트가 없으면 'unmatched'."""
+    if "endpoint" not in scope:
+        return "unmatched"
+    params = {str(v): k for k, v in scope.get("path_params", {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join("{%s}" % params[seg] if seg in params else seg for seg in scope["path"].split("/"))
+
+
+# ▶ SQL
+# 시작 시각은 실행 컨텍스트(쿼리 하나)에 둡니다. 쿼리가 실패하면 컨텍스트와 함께 버려지므로
+# 커넥션에 값이 쌓이거나 다음 쿼리 시간에 섞이지 않습니다.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    operation = statement.split(None, 1)[0].upper() if statement else ""
+    SQL_QUERY_DURATION.observe(elapsed, operation)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.sql_count += 1
+        trace.sql_seconds += elapsed
+
+
+def instrument_engine(engine):
+    """동기 Engine(AsyncEngine이면 .sync_engine)에 쿼리 계측 이벤트를 등록합니다. 중복 등록은 무시."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ▶ LLM
+def record_llm_call(step: str, elapsed_ms: float, cached: bool,
+                    prompt_tokens: int = 0, completion_tokens: int = 0):
+    if not METRICS_ENABLED:
+        return
+    LLM_CALL_DURATION.observe(elapsed_ms / 1000, step, "true" if cached else "false")
+    if prompt_tokens:
+        LLM_TOKENS.inc(step, "prompt", amount=prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.inc(step, "completion", amount=completion_tokens)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.llm_calls += 1
+        trace.llm_seconds += elapsed_ms / 1000
+        trace.llm_tokens += prompt_tokens + completion_tokens
+
+
+def record_llm_error(step: str, error: Exception):
+    if METRICS_ENABLED:
+        LLM_ERRORS.inc(step, type(error).__name__)
+
+
+def record_llm_route(step: str, route: str, model: str):
+    if METRICS_ENABLED:
+        LLM_ROUTE_DECISIONS.inc(step, route, model)
+
+
+def record_llm_queue_wait(priority: str, seconds: float):
+    if METRICS_ENABLED:
+        LLM_QUEUE_WAIT.observe(seconds, priority)
+
+
+def record_llm_rejection(priority: str, reason: str):
+    if METRICS_ENABLED:
+        LLM_ADMISSION_REJECTED.inc(priority, reason)
+
+
+def register_gauge(name: str, help: str, fn: Callable[[], Dict[Tuple, float]], labelnames=()):
+    """스크레이프 시점에 값을 읽는 게이지 등록 (큐 길이, 서킷 상태 등)"""
+    return registry.register(Gauge(name, help, fn, labelnames))
+
+
+def render_metrics() -> str:
+    return registry.render()
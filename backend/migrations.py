@@ -0,0 +1,74 @@
+# migrations.py
+"""
+버전 관리되는 스키마 마이그레이션.
+create_all()은 새 테이블만 만들고 기존 테이블에 인덱스를 추가하지 않으므로,
+기존 app.db에 필요한 변경은 여기에 순서대로 추가합니다.
+적용된 버전은 schema_migrations 테이블에 기록됩니다.
+
+    python -m backend.migrations          # 미적용 마이그레이션 실행
+"""
+
+import time
+
+from sqlalchemy import Column, Integer, String, Float, Table, MetaData, select
+from sqlalchemy.engine import Engine
+
+from .models import Resume, InterviewQuestion, InterviewAnswer
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String),
+    Column("applied_at", Float),
+)
+
+
+def _create_indexes(*names):
+    """모델에 선언된(index=True) 인덱스 중 이름이 일치하는 것을 없을 때만 생성합니다."""
+    def apply(conn):
+        for model in (Resume, InterviewQuestion, InterviewAnswer):
+            for index in model.__table__.indexes:
+                if index.name in names:
+                    index.create(bind=conn, checkfirst=True)
+    return apply
+
+
+# (버전, 설명, 적용 함수) — 한 번 배포된 항목은 수정하지 말고 새 버전을 추가합니다.
+MIGRATIONS = [
+    (1, "add foreign-key indexes on resumes.user_id, questions.user_id, answers.question_id",
+     _create_indexes("ix_resumes_user_id", "ix_questions_user_id", "ix_answers_question_id")),
+]
+
+
+def run_migrations(engine: Engine) -> list:
+    """미적용 마이그레이션을 버전 순으로 각각 한 트랜잭션에서 실행합니다. 적용한 버전 목록을 리턴."""
+    _metadata.create_all(bind=engine)
+    applied = []
+    with engine.connect() as conn:
+        done = {row.version for row in conn.execute(select(schema_migrations.c.version))}
+    for version, description, apply in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            apply(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, description=description, applied_at=time.time()
+            ))
+        applied.append(version)
+    return applied
+
+
+def init_db(engine: Engine) -> list:
+    """테이블 생성 + 미적용 마이그레이션 실행. 앱 시작 시(APP_INIT_DB=1) 또는 CLI에서 호출합니다."""
+    from .database import Base
+
+    Base.metadata.create_all(bind=engine)
+    return run_migrations(engine)
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    versions = init_db(engine)
+    print(f"적용된 마이그레이션: {versions or '없음'}")
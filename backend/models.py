@@ -1,5 +1,6 @@
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, Index, UniqueConstraint, LargeBinary
+from sqlalchemy.orm import relationship
 from .database import Base
 
 class User(Base):
@@ -10,7 +11,7 @@ class User(Base):
 class Resume(Base):
     __tablename__ = "resumes"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     original_text = Column(Text)
     edited_text = Column(Text, nullable=True)
     feedback = Column(Text, nullable=True)
@@ -18,7 +19,7 @@ class Resume(Base):
 class InterviewQuestion(Base):
     __tablename__ = "questions"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     company = Column(String)
     role = Column(String)
     question_text = Column(Text)
@@ -26,7 +27,71 @@ class InterviewQuestion(Base):
 class InterviewAnswer(Base):
     __tablename__ = "answers"
     id = Column(Integer, primary_key=True, index=True)
-    question_id = Column(Integer, ForeignKey("questions.id"))
+    question_id = Column(Integer, ForeignKey("questions.id"), index=True)
     answer_text = Column(Text)
     score = Column(Float, nullable=True)
     feedback = Column(Text, nullable=True)
+
+    question = relationship("InterviewQuestion", lazy="select")
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+    key = Column(String, primary_key=True)
+    response = Column(Text)
+    created_at = Column(Float, index=True)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, index=True)
+    payload = Column(Text)                      # JSON 문자열
+    status = Column(String, index=True, default="queued")  # queued / running / succeeded / failed
+    result = Column(Text, nullable=True)        # JSON 문자열
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(Float)
+    updated_at = Column(Float)
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_resumes = Column(Integer, default=0)
+    reviewed_resumes = Column(Integer, default=0)
+    total_questions = Column(Integer, default=0)
+    total_answers = Column(Integer, default=0)
+    total_evaluated_answers = Column(Integer, default=0)
+
+class UserDataVersion(Base):
+    """사용자 데이터가 바뀔 때마다 1씩 오르는 버전. 조회 응답의 ETag 계산에 씁니다."""
+    __tablename__ = "user_data_versions"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class QuestionBankEntry(Base):
+    """회사·직무(정규화 키)별로 모아 둔 생성 질문. 같은 조합 요청은 여기서 먼저 꺼내 씁니다."""
+    __tablename__ = "question_bank"
+    id = Column(Integer, primary_key=True, index=True)
+    company_key = Column(String)
+    role_key = Column(String)
+    question_text = Column(Text)
+    normalized_text = Column(Text)              # 중복 판별용 (공백·문장부호 제거)
+    times_served = Column(Integer, default=0)
+    created_at = Column(Float)
+
+    __table_args__ = (
+        Index("ix_question_bank_company_role", "company_key", "role_key"),
+        UniqueConstraint("company_key", "role_key", "normalized_text", name="uq_question_bank_text"),
+    )
+
+class IdempotencyKey(Base):
+    """Idempotency-Key 헤더로 받은 요청의 지문과 저장된 응답 (expires_at 이후 삭제)"""
+    __tablename__ = "idempotency_keys"
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String)                 # 메서드·경로·본문 해시
+    status = Column(String)                      # in_progress | completed
+    status_code = Column(Integer, nullable=True)
+    response_headers = Column(Text, nullable=True)   # JSON [[name, value], ...]
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(Float)
+    expires_at = Column(Float, index=True)
+
@@ -0,0 +1,176 @@
+# question_bank.py
+"""
+회사·직무별 면접 질문 은행.
+
+- 회사/직무 이름은 정규화 키로 묶습니다. 예) "(주)카카오 " / "카카오" → "카카오"
+- 한 조합에 QUESTION_BANK_MIN_SIZE개 이상 쌓여 있고 사용자가 아직 받지 않은 질문이
+  충분하면 LLM을 호출하지 않고 은행에서 골라 줍니다. (덜 쓰인 질문 우선)
+- 새로 생성한 질문은 글자 bigram 자카드 유사도로 기존 질문과 비교해
+  거의 같은 질문(QUESTION_DEDUP_THRESHOLD 이상)은 은행에 넣지 않습니다.
+- 사용자에게 준 질문은 InterviewQuestion 행으로 저장되어 답변 등록에 바로 쓸 수 있습니다.
+
+DB 함수는 동기 Session용이며 라우터에서 AsyncSession.run_sync()로 호출합니다.
+"""
+
+import os
+import re
+import time
+import random
+import unicodedata
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from .models import User, InterviewQuestion, QuestionBankEntry
+from .stats import bump_user_stats
+
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "1") == "1"
+# 한 번에 돌려줄 질문 수 (생성 프롬프트도 5개를 요청합니다)
+QUESTIONS_PER_REQUEST = int(os.getenv("QUESTIONS_PER_REQUEST", "5"))
+# 이 개수 이상 쌓인 조합부터 은행에서 꺼내 씁니다.
+QUESTION_BANK_MIN_SIZE = int(os.getenv("QUESTION_BANK_MIN_SIZE", "15"))
+# 조합당 최대 보관 개수
+QUESTION_BANK_MAX_SIZE = int(os.getenv("QUESTION_BANK_MAX_SIZE", "200"))
+QUESTION_DEDUP_THRESHOLD = float(os.getenv("QUESTION_DEDUP_THRESHOLD", "0.8"))
+# 생성 프롬프트에 "겹치지 않게" 예시로 넣을 기존 질문 수
+QUESTION_AVOID_EXAMPLES = int(os.getenv("QUESTION_AVOID_EXAMPLES", "10"))
+
+_COMPANY_AFFIXES = re.compile(r"\(주\)|주식회사|\b(?:co\.?,?\s*ltd|inc|corp)\b\.?", re.IGNORECASE)
+_NUMBERING = re.compile(r"^\s*(?:\d+[.)]|[-•*])\s*")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+# ▶ 정규화 / 유사도
+def normalize_key(name: str, company: bool = False) -> str:
+    text = unicodedata.normalize("NFKC", name).lower()
+    if company:
+        text = _COMPANY_AFFIXES.sub(" ", text)
+    return _NON_WORD.sub("", text)
+
+
+def normalize_question(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD.sub("", _NUMBERING.sub("", text))
+
+
+def _bigrams(normalized: str) -> Set[str]:
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)} or {normalized}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def similarity(a: str, b: str) -> float:
+    """두 질문의 글자 bigram 자카드 유사도 (0~1)"""
+    return _jaccard(_bigrams(normalize_question(a)), _bigrams(normalize_question(b)))
+
+
+def _is_near_duplicate(grams: Set[str], existing: List[Set[str]]) -> bool:
+    return any(_jaccard(grams, other) >= QUESTION_DEDUP_THRESHOLD for other in existing)
+
+
+# ▶ DB
+def bank_keys(company: str, role: str) -> Tuple[str, str]:
+    return normalize_key(company, company=True), normalize_key(role)
+
+
+def bank_questions(db: Session, company: str, role: str) -> List[str]:
+    """은행에 있는 해당 조합의 질문 전체 (오래된 순)"""
+    company_key, role_key = bank_keys(company, role)
+    return list(db.execute(
+        select(QuestionBankEntry.question_text)
+        .where(QuestionBankEntry.company_key == company_key, QuestionBankEntry.role_key == role_key)
+        .order_by(QuestionBankEntry.id)
+    ).scalars())
+
+
+def pick_from_bank(db: Session, user_id: int, company: str, role: str,
+                   limit: int = QUESTIONS_PER_REQUEST) -> Tuple[Optional[List[str]], List[str]]:
+    """
+    (은행에서 고른 질문 목록 또는 None, 은행에 있는 질문 전체)를 돌려줍니다.
+    질문 수가 QUESTION_BANK_MIN_SIZE 미만이거나 사용자가 아직 받지 않은 질문이
+    limit개보다 적으면 None (새로 생성해야 함).
+    """
+    company_key, role_key = bank_keys(company, role)
+    entries = db.execute(
+        select(QuestionBankEntry.id, QuestionBankEntry.question_text, QuestionBankEntry.times_served)
+        .where(QuestionBankEntry.company_key == company_key, QuestionBankEntry.role_key == role_key)
+        .order_by(QuestionBankEntry.id)
+    ).all()
+    known = [e.question_text for e in entries]
+    if len(entries) < QUESTION_BANK_MIN_SIZE:
+        return None, known
+
+    seen = set(db.execute(
+        select(InterviewQuestion.question_text).where(
+            InterviewQuestion.user_id == user_id,
+            InterviewQuestion.question_text.in_(known),
+        )
+    ).scalars())
+    unseen = [e for e in entries if e.question_text not in seen]
+    if len(unseen) < limit:
+        return None, known
+
+    # 덜 쓰인 질문부터, 같은 횟수끼리는 무작위
+    picked = sorted(unseen, key=lambda e: (e.times_served, random.random()))[:limit]
+    db.execute(
+        update(QuestionBankEntry)
+        .where(QuestionBankEntry.id.in_([e.id for e in picked]))
+        .values(times_served=QuestionBankEntry.times_served + 1)
+    )
+    return [e.question_text for e in picked], known
+
+
+def add_to_bank(db: Session, company: str, role: str, questions: List[str],
+                known: Optional[List[str]] = None) -> List[str]:
+    """
+    생성된 질문 중 기존 질문·서로 간에 거의 같은 것을 빼고 은행에 추가합니다.
+    known(은행의 기존 질문)을 넘기면 다시 조회하지 않습니다. 추가된 질문 목록을 리턴.
+    """
+    company_key, role_key = bank_keys(company, role)
+    if known is None:
+        known = bank_questions(db, company, role)
+
+    existing = [_bigrams(normalize_question(q)) for q in known]
+    room = QUESTION_BANK_MAX_SIZE - len(known)
+    added = []
+    now = time.time()
+    for question in questions:
+        if len(added) >= room:
+            break
+        normalized = normalize_question(question)
+        if not normalized:
+            continue
+        grams = _bigrams(normalized)
+        if _is_near_duplicate(grams, existing):
+            continue
+        existing.append(grams)
+        db.add(QuestionBankEntry(
+            company_key=company_key, role_key=role_key,
+            question_text=question, normalized_text=normalized,
+            times_served=1, created_at=now,
+        ))
+        added.append(question)
+    return added
+
+
+def save_user_questions(db: Session, user_id: int, company: str, role: str,
+                        questions: List[str]) -> List[InterviewQuestion]:
+    """사용자에게 준 질문을 InterviewQuestion 행으로 저장합니다. (커밋은 호출자가)"""
+    if db.get(User, user_id) is None:
+        db.add(User(id=user_id, name=f"User{user_id}"))
+    rows = [
+        InterviewQuestion(user_id=user_id, company=company, role=role, question_text=q)
+        for q in questions
+    ]
+    db.add_all(rows)
+    db.flush()
+    bump_user_stats(db, user_id, total_questions=len(rows))
+    return rows
+
+
+def avoid_examples(known: List[str]) -> List[str]:
+    """생성 프롬프트에 넣을 기존 질문 예시 (최근 것 위주)"""
+    return known[-QUESTION_AVOID_EXAMPLES:] if QUESTION_AVOID_EXAMPLES > 0 else []
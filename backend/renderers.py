@@ -0,0 +1,195 @@
+# renderers.py
+"""
+리포트 렌더러. load_report_data()가 만든 dict만 받아 파일 바이트를 돌려주므로
+프로세스 풀 워커에서도 그대로 실행할 수 있습니다 (DB·OpenAI 의존성 없음).
+python-docx / reportlab은 import 비용이 커서 실제로 렌더링할 때 불러옵니다.
+"""
+
+import io
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# 렌더링 전용 프로세스 수. 0이면 프로세스 풀 없이 스레드에서 렌더링합니다.
+EXPORT_RENDER_PROCESSES = int(os.getenv("EXPORT_RENDER_PROCESSES", "2"))
+
+_pool = None
+
+
+async def render_off_loop(render, data: dict) -> bytes:
+    """
+    CPU 작업인 렌더링을 이벤트 루프 밖(프로세스 풀)에서 실행합니다.
+    render는 피클 가능한 모듈 수준 함수(render_docx / render_pdf)여야 합니다.
+    """
+    global _pool
+    if EXPORT_RENDER_PROCESSES <= 0:
+        return await asyncio.to_thread(render, data)
+    if _pool is None:
+        # 이벤트 루프·DB 커넥션·스레드를 가진 서버 프로세스를 fork하지 않도록 spawn으로 띄웁니다.
+        _pool = ProcessPoolExecutor(max_workers=EXPORT_RENDER_PROCESSES,
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return await asyncio.get_running_loop().run_in_executor(_pool, render, data)
+
+
+def shutdown_render_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_docx(data: dict) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading(f"{data['user_name']}님의 Job Prep Report", level=0)
+    doc.add_paragraph(f"생성 일시: {data['generated_at']}")
+    doc.add_paragraph(" ")
+
+    # 1) 자기소개서
+    doc.add_heading("1. 자기소개서", level=1)
+    if not data["resumes"]:
+        doc.add_paragraph("등록된 자기소개서가 없습니다.")
+    for r in data["resumes"]:
+        doc.add_paragraph(f"• Original:\n{r['original_text']}")
+        if r["edited_text"]:
+            doc.add_paragraph(f"• Edited:\n{r['edited_text']}")
+            doc.add_paragraph(f"• Feedback:\n{r['feedback']}")
+        doc.add_paragraph("---")
+
+    # 2) 면접 질문
+    doc.add_heading("2. 면접 질문", level=1)
+    if not data["questions"]:
+        doc.add_paragraph("생성된 면접 질문이 없습니다.")
+    for idx, question_text in enumerate(data["questions"], start=1):
+        doc.add_paragraph(f"{idx}. {question_text}")
+    doc.add_paragraph("---")
+
+    # 3) 답변 및 평가
+    doc.add_heading("3. 면접 답변 및 평가", level=1)
+    if not data["answers"]:
+        doc.add_paragraph("등록된 답변이 없습니다.")
+    for idx, a in enumerate(data["answers"], start=1):
+        doc.add_paragraph(f"{idx}. Q: {a['question_text']}")
+        doc.add_paragraph(f"   A: {a['answer_text']}")
+        if a["score"] is not None:
+            doc.add_paragraph(f"   - Score: {a['score']}")
+            doc.add_paragraph(f"   - Feedback: {a['feedback']}")
+        doc.add_paragraph("---")
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def render_pdf(data: dict) -> bytes:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    y = height - 40
+
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(40, y, f"{data['user_name']}님의 Job Prep Report")
+    y -= 30
+    p.setFont("Helvetica", 10)
+    p.drawString(40, y, f"생성 일시: {data['generated_at']}")
+    y -= 30
+
+    # 1) 자기소개서
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(40, y, "1. 자기소개서")
+    y -= 20
+    if not data["resumes"]:
+        p.setFont("Helvetica", 10)
+        p.drawString(40, y, "등록된 자기소개서가 없습니다.")
+        y -= 20
+    for r in data["resumes"]:
+        p.setFont("Helvetica-Bold", 10)
+        p.drawString(40, y, "Original:")
+        y -= 15
+        p.setFont("Helvetica", 10)
+        for line in r["original_text"].split("\n"):
+            p.drawString(60, y, line)
+            y -= 12
+            if y < 50:
+                p.showPage()
+                y = height - 40
+        if r["edited_text"]:
+            p.setFont("Helvetica-Bold", 10)
+            p.drawString(40, y, "Edited:")
+            y -= 15
+            p.setFont("Helvetica", 10)
+            for line in r["edited_text"].split("\n"):
+                p.drawString(60, y, line)
+                y -= 12
+                if y < 50:
+                    p.showPage()
+                    y = height - 40
+            p.setFont("Helvetica-Bold", 10)
+            p.drawString(40, y, "Feedback:")
+            y -= 15
+            p.setFont("Helvetica", 10)
+            for line in r["feedback"].split("\n"):
+                p.drawString(60, y, line)
+                y -= 12
+                if y < 50:
+                    p.showPage()
+                    y = height - 40
+        y -= 20
+
+    # 2) 면접 질문
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(40, y, "2. 면접 질문")
+    y -= 20
+    if not data["questions"]:
+        p.setFont("Helvetica", 10)
+        p.drawString(40, y, "생성된 면접 질문이 없습니다.")
+        y -= 20
+    for idx, question_text in enumerate(data["questions"], start=1):
+        p.setFont("Helvetica", 10)
+        p.drawString(60, y, f"{idx}. {question_text}")
+        y -= 15
+        if y < 50:
+            p.showPage()
+            y = height - 40
+    y -= 20
+
+    # 3) 답변 및 평가
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(40, y, "3. 면접 답변 및 평가")
+    y -= 20
+    if not data["answers"]:
+        p.setFont("Helvetica", 10)
+        p.drawString(40, y, "등록된 답변이 없습니다.")
+        y -= 20
+    for idx, a in enumerate(data["answers"], start=1):
+        p.setFont("Helvetica-Bold", 10)
+        p.drawString(40, y, f"{idx}. Q: {a['question_text']}")
+        y -= 15
+        p.setFont("Helvetica", 10)
+        for line in a["answer_text"].split("\n"):
+            p.drawString(60, y, line)
+            y -= 12
+            if y < 50:
+                p.showPage()
+                y = height - 40
+        if a["score"] is not None:
+            p.setFont("Helvetica-Bold", 10)
+            p.drawString(40, y, f"   - Score: {a['score']}")
+            y -= 15
+            p.setFont("Helvetica", 10)
+            for line in a["feedback"].split("\n"):
+                p.drawString(60, y, line)
+                y -= 12
+                if y < 50:
+                    p.showPage()
+                    y = height - 40
+        y -= 20
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
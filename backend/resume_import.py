@@ -0,0 +1,136 @@
+# resume_import.py
+"""
+자기소개서 대량 등록.
+
+- 입력: JSON Lines ({"user_id": 1, "text": "..."} 한 줄에 하나) 또는
+  multipart 업로드(.jsonl 파일, 혹은 파일 하나 = 자기소개서 하나)
+- 행 단위로 검증해 잘못된 행은 오류로 돌려주고 나머지는 계속 처리합니다.
+- RESUME_IMPORT_BATCH_SIZE 행마다 한 트랜잭션: 없는 사용자를 upsert 한 번으로 만들고,
+  자기소개서를 한 번에 INSERT, 사용자별 total_resumes를 한 번씩 증가시킵니다.
+
+DB 함수는 동기 Session용이며 라우터에서 AsyncSession.run_sync()로 호출합니다.
+"""
+
+import os
+import json
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .models import Resume, User
+from .schemas import ResumeCreate
+from .stats import bump_user_stats
+
+RESUME_IMPORT_BATCH_SIZE = int(os.getenv("RESUME_IMPORT_BATCH_SIZE", "500"))
+# 요청 하나에 담을 수 있는 최대 행 수
+RESUME_IMPORT_MAX_ROWS = int(os.getenv("RESUME_IMPORT_MAX_ROWS", "10000"))
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+
+class ImportRow:
+    """
+    입력 행 하나와 처리 결과. line은 오류 보고용 위치 ("3", "cohort.jsonl:3", "kim.txt").
+    검증에 실패한 행은 error만 채워집니다.
+    """
+    __slots__ = ("line", "user_id", "text", "error", "resume_id", "job_id")
+
+    def __init__(self, line: str, user_id: Optional[int] = None, text: Optional[str] = None,
+                 error: Optional[str] = None):
+        self.line = line
+        self.user_id = user_id
+        self.text = text
+        self.error = error
+        self.resume_id = None
+        self.job_id = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {"line": self.line, "resume_id": self.resume_id, "job_id": self.job_id, "error": self.error}
+
+
+# ▶ 파싱 / 검증
+def validate_row(line: str, data) -> ImportRow:
+    if not isinstance(data, dict):
+        return ImportRow(line, error="JSON 객체가 아닙니다.")
+    try:
+        item = ResumeCreate(**data)
+    except ValidationError as e:
+        return ImportRow(line, error="; ".join(
+            f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+        ))
+    if not item.text.strip():
+        return ImportRow(line, error="text가 비어 있습니다.")
+    return ImportRow(line, item.user_id, item.text)
+
+
+def parse_jsonl(data: bytes, source: str = "") -> List[ImportRow]:
+    """JSON Lines 본문을 행 목록으로 바꿉니다. 빈 줄은 건너뜁니다."""
+    prefix = f"{source}:" if source else ""
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return [ImportRow(source or "body", error="UTF-8로 읽을 수 없습니다.")]
+    rows = []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        if not raw.strip():
+            continue
+        line = f"{prefix}{number}"
+        try:
+            rows.append(validate_row(line, json.loads(raw)))
+        except json.JSONDecodeError as e:
+            rows.append(ImportRow(line, error=f"JSON 파싱 실패: {e.msg}"))
+    return rows
+
+
+def parse_upload(filename: str, data: bytes, user_id: Optional[int]) -> List[ImportRow]:
+    """multipart 파일 하나. .jsonl/.ndjson 이면 여러 행, 아니면 파일 전체가 user_id의 자기소개서 하나."""
+    if filename.lower().endswith(JSONL_SUFFIXES):
+        return parse_jsonl(data, filename)
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return [ImportRow(filename, error="UTF-8로 읽을 수 없습니다.")]
+    return [validate_row(filename, {"user_id": user_id, "text": text})]
+
+
+def batches(rows: List[ImportRow], size: int = RESUME_IMPORT_BATCH_SIZE) -> Iterable[List[ImportRow]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+# ▶ DB
+def upsert_users(db: Session, user_ids: Iterable[int]):
+    """없는 사용자를 한 번의 INSERT로 만듭니다. (SQLite/PostgreSQL은 ON CONFLICT DO NOTHING)"""
+    values = [{"id": uid, "name": f"User{uid}"} for uid in sorted(set(user_ids))]
+    if not values:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        db.execute(dialect_insert(User).on_conflict_do_nothing(index_elements=[User.id]), values)
+        return
+    existing = set(db.execute(select(User.id).where(User.id.in_([v["id"] for v in values]))).scalars())
+    missing = [v for v in values if v["id"] not in existing]
+    if missing:
+        db.execute(insert(User), missing)
+
+
+def insert_batch(db: Session, rows: List[ImportRow]) -> List[int]:
+    """유효한 행 한 배치를 저장하고 입력 순서대로 resume id를 돌려줍니다. (커밋은 호출자가)"""
+    upsert_users(db, (r.user_id for r in rows))
+    resumes = [Resume(user_id=r.user_id, original_text=r.text) for r in rows]
+    db.add_all(resumes)
+    db.flush()
+    for user_id, count in Counter(r.user_id for r in rows).items():
+        bump_user_stats(db, user_id, total_resumes=count)
+    return [resume.id for resume in resumes]
@@ -1,45 +1,22 @@
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import SessionLocal
-from ..models import User, Resume, InterviewQuestion, InterviewAnswer
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
 from ..schemas import DashboardOut
+from ..stats import get_user_stats, get_data_version
+from ..http_cache import conditional_response
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/{user_id}", response_model=DashboardOut)
-def get_dashboard(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def get_dashboard(user_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    # 데이터 버전이 그대로면 집계 없이 304 (If-None-Match)
+    not_modified = conditional_response(request, response, await db.run_sync(get_data_version, user_id))
+    if not_modified is not None:
+        return not_modified
 
-    total_resumes = db.query(Resume).filter(Resume.user_id == user_id).count()
-    reviewed_resumes = db.query(Resume).filter(
-        Resume.user_id == user_id, Resume.edited_text.isnot(None)
-    ).count()
-    total_questions = db.query(InterviewQuestion).filter(InterviewQuestion.user_id == user_id).count()
-    total_answers = db.query(InterviewAnswer).join(
-        InterviewQuestion, InterviewQuestion.id == InterviewAnswer.question_id
-    ).filter(InterviewQuestion.user_id == user_id).count()
-    total_evaluated_answers = db.query(InterviewAnswer).join(
-        InterviewQuestion, InterviewQuestion.id == InterviewAnswer.question_id
-    ).filter(
-        InterviewQuestion.user_id == user_id, InterviewAnswer.score.isnot(None)
-    ).count()
+    # user_stats 테이블 기본키 조회 한 번 (없으면 집계 쿼리 한 번으로 계산)
+    stats = await db.run_sync(get_user_stats, user_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    return {
-        "user_id": user_id,
-        "user_name": user.name,
-        "total_resumes": total_resumes,
-        "reviewed_resumes": reviewed_resumes,
-        "total_questions": total_questions,
-        "total_answers": total_answers,
-        "total_evaluated_answers": total_evaluated_answers
-    }
+    return {"user_id": user_id, **stats}
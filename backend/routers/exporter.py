@@ -1,25 +1,21 @@
 
 import os
-import io
+import asyncio
 import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from ..database import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
+from ..database import get_db
 from ..models import Resume, InterviewQuestion, InterviewAnswer, User
-from docx import Document
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 from ..schemas import ExportResponse
+from ..artifacts import report_fingerprint, artifact_filename, write_atomic, evict, touch, file_response
+from ..renderers import render_docx, render_pdf, render_off_loop
 
-router = APIRouter()
+DOCX_DIR = "exported_docs"
+PDF_DIR = "exported_pdfs"
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter()
 
 def _get_user(db: Session, user_id: int):
     user = db.query(User).filter(User.id == user_id).first()
@@ -27,195 +23,97 @@ def _get_user(db: Session, user_id: int):
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@router.get("/{user_id}/docx", response_model=ExportResponse)
-def export_docx(user_id: int, db: Session = Depends(get_db)):
+def load_report_data(db: Session, user_id: int) -> dict:
+    """
+    리포트에 필요한 데이터를 사용자 이력 크기와 무관하게 4번의 쿼리로 읽어
+    DOCX/PDF 렌더러가 공통으로 쓰는 dict로 만듭니다.
+    (사용자 1 + 자소서 1 + 질문 1 + 답변·질문 JOIN 1)
+    """
     user = _get_user(db, user_id)
 
-    doc = Document()
-    doc.add_heading(f"{user.name}님의 Job Prep Report", level=0)
-    doc.add_paragraph(f"생성 일시: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    doc.add_paragraph(" ")
-
-    # 1) 자기소개서
-    doc.add_heading("1. 자기소개서", level=1)
-    resumes = db.query(Resume).filter(Resume.user_id == user_id).all()
-    if not resumes:
-        doc.add_paragraph("등록된 자기소개서가 없습니다.")
-    for r in resumes:
-        doc.add_paragraph(f"• Original:\n{r.original_text}")
-        if r.edited_text:
-            doc.add_paragraph(f"• Edited:\n{r.edited_text}")
-            doc.add_paragraph(f"• Feedback:\n{r.feedback}")
-        doc.add_paragraph("---")
-
-    # 2) 면접 질문
-    doc.add_heading("2. 면접 질문", level=1)
-    questions = db.query(InterviewQuestion).filter(InterviewQuestion.user_id == user_id).all()
-    if not questions:
-        doc.add_paragraph("생성된 면접 질문이 없습니다.")
-    for idx, q in enumerate(questions, start=1):
-        doc.add_paragraph(f"{idx}. {q.question_text}")
-    doc.add_paragraph("---")
-
-    # 3) 답변 및 평가
-    doc.add_heading("3. 면접 답변 및 평가", level=1)
+    resumes = db.query(Resume).filter(Resume.user_id == user_id).order_by(Resume.id).all()
+    questions = db.query(InterviewQuestion).filter(
+        InterviewQuestion.user_id == user_id
+    ).order_by(InterviewQuestion.id).all()
     answers = db.query(InterviewAnswer).join(
-        InterviewQuestion, InterviewQuestion.id == InterviewAnswer.question_id
-    ).filter(InterviewQuestion.user_id == user_id).all()
-    if not answers:
-        doc.add_paragraph("등록된 답변이 없습니다.")
-    for idx, a in enumerate(answers, start=1):
-        question = db.query(InterviewQuestion).filter(InterviewQuestion.id == a.question_id).first()
-        doc.add_paragraph(f"{idx}. Q: {question.question_text}")
-        doc.add_paragraph(f"   A: {a.answer_text}")
-        if a.score is not None:
-            doc.add_paragraph(f"   - Score: {a.score}")
-            doc.add_paragraph(f"   - Feedback: {a.feedback}")
-        doc.add_paragraph("---")
-
-    os.makedirs("exported_docs", exist_ok=True)
-    filename = f"report_user_{user_id}.docx"
-    filepath = os.path.join("exported_docs", filename)
-    doc.save(filepath)
-
-    return {"filename": filename, "download_url": f"/exporter/download/docx/{filename}"}
+        InterviewAnswer.question
+    ).options(
+        contains_eager(InterviewAnswer.question)
+    ).filter(InterviewQuestion.user_id == user_id).order_by(InterviewAnswer.id).all()
+
+    return {
+        "user_name": user.name,
+        "generated_at": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "resumes": [
+            {"original_text": r.original_text, "edited_text": r.edited_text, "feedback": r.feedback}
+            for r in resumes
+        ],
+        "questions": [q.question_text for q in questions],
+        "answers": [
+            {
+                "question_text": a.question.question_text,
+                "answer_text": a.answer_text,
+                "score": a.score,
+                "feedback": a.feedback,
+            }
+            for a in answers
+        ],
+    }
+
+async def _ensure_artifact(user_id: int, db: AsyncSession, directory: str, ext: str, render) -> str:
+    """
+    사용자 데이터의 지문으로 파일 이름을 정하고, 같은 지문의 파일이 이미 있으면
+    다시 렌더링하지 않고 재사용합니다(사용 시각만 갱신). 새로 만든 경우에만 용량/기간 정리를 합니다.
+    """
+    data = await db.run_sync(load_report_data, user_id)
+    filename = artifact_filename(user_id, report_fingerprint(data), ext)
+    filepath = os.path.join(directory, filename)
+
+    if not os.path.exists(filepath):
+        content = await render_off_loop(render, data)
+        os.makedirs(directory, exist_ok=True)
+        await asyncio.to_thread(write_atomic, filepath, content)
+        await asyncio.to_thread(evict, directory, filename)
+    else:
+        touch(filepath)
+    return filename
+
+async def _export(user_id: int, db: AsyncSession, directory: str, ext: str, render) -> dict:
+    filename = await _ensure_artifact(user_id, db, directory, ext, render)
+    return {"filename": filename, "download_url": f"/exporter/download/{ext}/{filename}"}
+
+async def _export_file(user_id: int, db: AsyncSession, request: Request, directory: str, ext: str,
+                       media_type: str, render):
+    """
+    다운로드 URL을 거치지 않고 지문 파일을 바로 응답합니다.
+    지문이 같으면 디스크의 파일을 그대로 보내고, 바뀐 경우에만 렌더링합니다.
+    """
+    filename = await _ensure_artifact(user_id, db, directory, ext, render)
+    return file_response(request, directory, filename, media_type,
+                         download_name=f"report_user_{user_id}.{ext}")
+
+@router.get("/{user_id}/docx", response_model=ExportResponse)
+async def export_docx(user_id: int, db: AsyncSession = Depends(get_db)):
+    return await _export(user_id, db, DOCX_DIR, "docx", render_docx)
+
+@router.get("/{user_id}/docx/file")
+async def export_docx_file(user_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """다운로드 URL을 거치지 않고 DOCX 파일을 바로 응답"""
+    return await _export_file(user_id, db, request, DOCX_DIR, "docx", DOCX_MEDIA_TYPE, render_docx)
 
 @router.get("/download/docx/{filename}")
-def download_docx(filename: str):
-    file_path = os.path.join("exported_docs", filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(path=file_path, filename=filename,
-                        media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+def download_docx(filename: str, request: Request):
+    return file_response(request, DOCX_DIR, filename, DOCX_MEDIA_TYPE)
 
 @router.get("/{user_id}/pdf", response_model=ExportResponse)
-def export_pdf(user_id: int, db: Session = Depends(get_db)):
-    user = _get_user(db, user_id)
+async def export_pdf(user_id: int, db: AsyncSession = Depends(get_db)):
+    return await _export(user_id, db, PDF_DIR, "pdf", render_pdf)
 
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    y = height - 40
-
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(40, y, f"{user.name}님의 Job Prep Report")
-    y -= 30
-    p.setFont("Helvetica", 10)
-    p.drawString(40, y, f"생성 일시: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    y -= 30
-
-    # 1) 자기소개서
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(40, y, "1. 자기소개서")
-    y -= 20
-    resumes = db.query(Resume).filter(Resume.user_id == user_id).all()
-    if not resumes:
-        p.setFont("Helvetica", 10)
-        p.drawString(40, y, "등록된 자기소개서가 없습니다.")
-        y -= 20
-    for r in resumes:
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(40, y, "Original:")
-        y -= 15
-        p.setFont("Helvetica", 10)
-        for line in r.original_text.split("\n"):
-            p.drawString(60, y, line)
-            y -= 12
-            if y < 50:
-                p.showPage()
-                y = height - 40
-        if r.edited_text:
-            p.setFont("Helvetica-Bold", 10)
-            p.drawString(40, y, "Edited:")
-            y -= 15
-            p.setFont("Helvetica", 10)
-            for line in r.edited_text.split("\n"):
-                p.drawString(60, y, line)
-                y -= 12
-                if y < 50:
-                    p.showPage()
-                    y = height - 40
-            p.setFont("Helvetica-Bold", 10)
-            p.drawString(40, y, "Feedback:")
-            y -= 15
-            p.setFont("Helvetica", 10)
-            for line in r.feedback.split("\n"):
-                p.drawString(60, y, line)
-                y -= 12
-                if y < 50:
-                    p.showPage()
-                    y = height - 40
-        y -= 20
-
-    # 2) 면접 질문
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(40, y, "2. 면접 질문")
-    y -= 20
-    questions = db.query(InterviewQuestion).filter(InterviewQuestion.user_id == user_id).all()
-    if not questions:
-        p.setFont("Helvetica", 10)
-        p.drawString(40, y, "생성된 면접 질문이 없습니다.")
-        y -= 20
-    for idx, q in enumerate(questions, start=1):
-        p.setFont("Helvetica", 10)
-        p.drawString(60, y, f"{idx}. {q.question_text}")
-        y -= 15
-        if y < 50:
-            p.showPage()
-            y = height - 40
-    y -= 20
-
-    # 3) 답변 및 평가
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(40, y, "3. 면접 답변 및 평가")
-    y -= 20
-    answers = db.query(InterviewAnswer).join(
-        InterviewQuestion, InterviewQuestion.id == InterviewAnswer.question_id
-    ).filter(InterviewQuestion.user_id == user_id).all()
-    if not answers:
-        p.setFont("Helvetica", 10)
-        p.drawString(40, y, "등록된 답변이 없습니다.")
-        y -= 20
-    for idx, a in enumerate(answers, start=1):
-        question = db.query(InterviewQuestion).filter(InterviewQuestion.id == a.question_id).first()
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(40, y, f"{idx}. Q: {question.question_text}")
-        y -= 15
-        p.setFont("Helvetica", 10)
-        for line in a.answer_text.split("\n"):
-            p.drawString(60, y, line)
-            y -= 12
-            if y < 50:
-                p.showPage()
-                y = height - 40
-        if a.score is not None:
-            p.setFont("Helvetica-Bold", 10)
-            p.drawString(40, y, f"   - Score: {a.score}")
-            y -= 15
-            p.setFont("Helvetica", 10)
-            for line in a.feedback.split("\n"):
-                p.drawString(60, y, line)
-                y -= 12
-                if y < 50:
-                    p.showPage()
-                    y = height - 40
-        y -= 20
-
-    p.showPage()
-    p.save()
-
-    buffer.seek(0)
-    os.makedirs("exported_pdfs", exist_ok=True)
-    filename = f"report_user_{user_id}.pdf"
-    filepath = os.path.join("exported_pdfs", filename)
-    with open(filepath, "wb") as f:
-        f.write(buffer.getvalue())
-
-    return {"filename": filename, "download_url": f"/exporter/download/pdf/{filename}"}
+@router.get("/{user_id}/pdf/file")
+async def export_pdf_file(user_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """다운로드 URL을 거치지 않고 PDF 파일을 바로 응답"""
+    return await _export_file(user_id, db, request, PDF_DIR, "pdf", "application/pdf", render_pdf)
 
 @router.get("/download/pdf/{filename}")
-def download_pdf(filename: str):
-    file_path = os.path.join("exported_pdfs", filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(path=file_path, filename=filename, media_type='application/pdf')
+def download_pdf(filename: str, request: Request):
+    return file_response(request, PDF_DIR, filename, "application/pdf")
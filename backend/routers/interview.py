@@ -1,42 +1,137 @@
 # backend/routers/interview.py
 
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import AsyncSessionLocal, get_db
 from ..models import InterviewQuestion, InterviewAnswer
 from ..schemas import (
     QuestionRequest, QuestionResponse,
     AnswerCreateRequest, AnswerCreateOut,
-    AnswerEvaluationRequest, AnswerEvaluation
+    AnswerEvaluationRequest, AnswerEvaluation,
+    BatchEvaluationRequest, BatchEvaluationOut,
+    JobOut, ProvisionalEvaluationOut
+)
+from ..services import (
+    generate_interview_questions, stream_interview_questions,
+    evaluate_interview_answer, evaluate_interview_answers
 )
-from ..services import generate_interview_questions, evaluate_interview_answer
+from ..sse import sse_response
+from ..jobs import job_queue, job_to_dict
+from ..llm_transport import LLMError
+from ..llm_scheduler import set_llm_work
+from ..stats import bump_user_stats, save_answer_evaluation
+from ..answer_index import answer_index, provisional_score
+from ..question_bank import (
+    QUESTION_BANK_ENABLED, bank_questions, pick_from_bank, add_to_bank, save_user_questions, avoid_examples
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/interviews", tags=["interviews"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+async def _lookup_bank(db: AsyncSession, req: QuestionRequest):
+    """(은행에서 고른 질문 또는 None, 은행의 기존 질문). 은행을 끄거나 fresh 요청이면 항상 생성."""
+    if not QUESTION_BANK_ENABLED:
+        return None, []
+    if req.fresh:
+        return None, await db.run_sync(bank_questions, req.company, req.role)
+    picked, known = await db.run_sync(pick_from_bank, req.user_id, req.company, req.role)
+    # 스트리밍 응답에서는 이 세션이 먼저 닫히므로 사용 횟수 갱신을 여기서 커밋합니다.
+    await db.commit()
+    return picked, known
+
+
+async def _store_questions(db: AsyncSession, req: QuestionRequest, questions: list,
+                           source: str, known: list) -> dict:
+    """생성분은 은행에 추가하고, 사용자 질문(InterviewQuestion)으로 저장해 응답 dict를 만듭니다."""
+    if source == "generated" and QUESTION_BANK_ENABLED:
+        try:
+            await db.run_sync(add_to_bank, req.company, req.role, questions, known)
+            await db.flush()
+        except IntegrityError:
+            # 같은 조합을 동시에 생성한 다른 요청이 먼저 넣은 경우: 은행 추가만 건너뜁니다.
+            await db.rollback()
+    rows = await db.run_sync(save_user_questions, req.user_id, req.company, req.role, questions)
+    await db.commit()
+    return {
+        "questions": questions,
+        "items": [{"id": r.id, "question_text": r.question_text} for r in rows],
+        "source": source,
+    }
+
+
+async def _save_evaluations(evaluations: list):
+    """
+    (answer_id, question_id, 평가 결과) 목록을 짧은 새 세션에서 한 트랜잭션으로 저장합니다.
+    LLM 호출 동안에는 세션을 열어 두지 않습니다. 카운터는 처음 채점한 요청만 올립니다.
+    """
+    async with AsyncSessionLocal() as db:
+        for answer_id, question_id, result in evaluations:
+            await db.run_sync(save_answer_evaluation, answer_id, question_id, result["score"], result["feedback"])
+        await db.commit()
 
 
 @router.post("/questions", response_model=QuestionResponse)
-async def generate_questions(req: QuestionRequest):
-    """GPT 호출로 질문 생성"""
+async def generate_questions(req: QuestionRequest, db: AsyncSession = Depends(get_db)):
+    """
+    면접 질문 조회/생성. 같은 회사·직무의 질문 은행에 충분히 쌓여 있으면 LLM 호출 없이
+    돌려주고(source="bank"), 아니면 새로 생성해 은행에 추가합니다(source="generated").
+    돌려준 질문은 사용자 질문으로 저장되어 items[].id로 답변을 등록할 수 있습니다.
+    """
+    picked, known = await _lookup_bank(db, req)
+    if picked is not None:
+        return await _store_questions(db, req, picked, "bank", known)
+    set_llm_work(req.user_id)
     try:
-        questions = generate_interview_questions(req.user_id, req.company, req.role)
+        questions = await generate_interview_questions(
+            req.user_id, req.company, req.role,
+            avoid=avoid_examples(known), use_cache=not QUESTION_BANK_ENABLED,
+        )
+    except LLMError:
+        # 상태 코드/Retry-After는 앱 전역 핸들러가 채웁니다.
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"질문 생성 실패: {e}")
-    return {"questions": questions}
+    return await _store_questions(db, req, questions, "generated", known)
+
+
+@router.post("/questions/stream")
+async def generate_questions_stream(req: QuestionRequest, db: AsyncSession = Depends(get_db)):
+    """
+    질문 생성을 SSE로 스트리밍. 이벤트: token → done({"questions": [...], "items": [...], "source": ...})
+    질문 은행에서 꺼내 줄 수 있으면 token 없이 done만 보냅니다.
+    """
+    picked, known = await _lookup_bank(db, req)
+    set_llm_work(req.user_id)
+
+    async def events():
+        # 스트림은 요청 의존성(db)이 정리된 뒤에도 이어지므로 세션을 따로 엽니다.
+        async with AsyncSessionLocal() as session:
+            if picked is not None:
+                yield "done", await _store_questions(session, req, picked, "bank", known)
+                return
+            async for event, data in stream_interview_questions(
+                req.user_id, req.company, req.role,
+                avoid=avoid_examples(known), use_cache=not QUESTION_BANK_ENABLED,
+            ):
+                if event == "done":
+                    data = await _store_questions(session, req, data, "generated", known)
+                yield event, data
+
+    return sse_response(events())
 
 
 @router.post("/answers", response_model=AnswerCreateOut)
-async def create_answer(info: AnswerCreateRequest, db: Session = Depends(get_db)):
-    print("🔔 create_answer hit! payload:", info)
+async def create_answer(info: AnswerCreateRequest, db: AsyncSession = Depends(get_db)):
     """DB에 답변 저장 후, answer.id 리턴"""
+    logger.debug("create_answer question_id=%s", info.question_id)
     # 1) 질문 존재 확인
-    question = db.query(InterviewQuestion).filter_by(id=info.question_id).first()
+    question = await db.get(InterviewQuestion, info.question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
@@ -48,31 +143,116 @@ async def create_answer(info: AnswerCreateRequest, db: Session = Depends(get_db)
         feedback=None
     )
     db.add(ans)
-    db.commit()
-    db.refresh(ans)
+    await db.run_sync(bump_user_stats, question.user_id, total_answers=1)
+    await db.commit()
+    await db.refresh(ans)
+
+    # 3) 저장된 답변 리턴 (id 포함)
+    return ans
+
 
-    # 3) 생성된 answer ID 리턴
-    return {"id": ans.id}
+@router.post("/evaluate/batch", response_model=BatchEvaluationOut)
+async def evaluate_answers_batch(req: BatchEvaluationRequest, db: AsyncSession = Depends(get_db)):
+    """
+    아직 점수가 없는 답변들을 동시에 평가(최대 EVALUATION_BATCH_CONCURRENCY개)하고,
+    결과를 한 트랜잭션으로 저장합니다. 일부 실패는 error 필드로 돌려줍니다.
+    /evaluate/{answer_id} 보다 먼저 등록되어야 "batch"가 id로 해석되지 않습니다.
+    """
+    if req.user_id is None and not req.answer_ids:
+        raise HTTPException(status_code=400, detail="user_id 또는 answer_ids가 필요합니다.")
+    # 일괄 평가는 bulk 우선순위로 실행됩니다. (evaluate_interview_answers)
+    set_llm_work(req.user_id)
+
+    # 1) 평가 대상(미채점 답변) 조회
+    query = select(InterviewAnswer).where(InterviewAnswer.score.is_(None))
+    if req.user_id is not None:
+        query = query.join(
+            InterviewQuestion, InterviewQuestion.id == InterviewAnswer.question_id
+        ).where(InterviewQuestion.user_id == req.user_id)
+    if req.answer_ids:
+        query = query.where(InterviewAnswer.id.in_(req.answer_ids))
+    answers = {a.id: a for a in await db.scalars(query.order_by(InterviewAnswer.id))}
+    # 읽은 답변은 세션을 닫아도 그대로 쓸 수 있습니다. LLM 호출 동안 커넥션을 돌려줍니다.
+    await db.close()
+
+    # 2) 동시 GPT 평가
+    results = await evaluate_interview_answers(
+        {answer_id: a.answer_text for answer_id, a in answers.items()}
+    )
+
+    # 3) 성공한 결과만 한 번에 커밋
+    items = []
+    evaluations = []
+    for answer_id, result in results.items():
+        if isinstance(result, Exception):
+            items.append({"answer_id": answer_id, "error": str(result)})
+            continue
+        evaluations.append((answer_id, answers[answer_id].question_id, result))
+        items.append({"answer_id": answer_id, **result})
+    await _save_evaluations(evaluations)
+    for answer_id, _, result in evaluations:
+        answer_index.add(answer_id, answers[answer_id].answer_text, result["score"])
+
+    failed = sum(1 for item in items if "error" in item)
+    return {"evaluated": len(items) - failed, "failed": failed, "results": items}
 
 
 @router.post("/evaluate/{answer_id}", response_model=AnswerEvaluation)
-async def evaluate_answer(answer_id: int, req: AnswerEvaluationRequest, db: Session = Depends(get_db)):
+async def evaluate_answer(answer_id: int, req: AnswerEvaluationRequest, db: AsyncSession = Depends(get_db)):
     """DB에서 답변 불러와 GPT 평가, 점수·피드백 저장 후 리턴"""
     # 1) 저장된 답변 가져오기
-    answer = db.query(InterviewAnswer).filter_by(id=answer_id).first()
+    answer = await db.get(InterviewAnswer, answer_id)
     if not answer:
         raise HTTPException(status_code=404, detail="Answer not found")
+    question = await db.get(InterviewQuestion, answer.question_id)
+    question_id, answer_text = answer.question_id, answer.answer_text
+    set_llm_work(question.user_id if question is not None else None)
+    # LLM 응답을 기다리는 동안 DB 커넥션을 쥐고 있지 않도록 세션을 먼저 닫습니다.
+    await db.close()
 
     # 2) GPT 평가
     try:
-        result = evaluate_interview_answer(answer.answer_text)
+        result = await evaluate_interview_answer(answer_text)
+    except LLMError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"평가 실패: {e}")
 
     # 3) DB에 결과 기록
-    answer.score = result["score"]
-    answer.feedback = result["feedback"]
-    db.commit()
+    await _save_evaluations([(answer_id, question_id, result)])
+    answer_index.add(answer_id, answer_text, result["score"])
 
     # 4) 클라이언트에 결과 반환
-    return {"score": answer.score, "feedback": answer.feedback}
\ No newline at end of file
+    return {"score": result["score"], "feedback": result["feedback"]}
+
+
+@router.post("/evaluate/{answer_id}/jobs", response_model=JobOut, status_code=202)
+async def enqueue_evaluation(answer_id: int, req: AnswerEvaluationRequest, db: AsyncSession = Depends(get_db)):
+    """평가를 백그라운드 작업으로 등록하고 job id를 바로 리턴 (GET /jobs/{id}로 결과 조회)"""
+    answer = await db.get(InterviewAnswer, answer_id)
+    if not answer:
+        raise HTTPException(status_code=404, detail="Answer not found")
+
+    job = await job_queue.enqueue(db, "answer_evaluation", {"answer_id": answer_id})
+    return job_to_dict(job)
+
+
+@router.post("/evaluate/{answer_id}/provisional", response_model=ProvisionalEvaluationOut, status_code=202)
+async def provisional_evaluation(answer_id: int, req: AnswerEvaluationRequest, db: AsyncSession = Depends(get_db)):
+    """
+    비슷한 채점 답변들의 점수로 잠정 점수를 바로 돌려주고, LLM 평가는 백그라운드 작업으로 등록합니다.
+    최종 점수·피드백은 GET /jobs/{job.id}로 조회합니다.
+    """
+    answer = await db.get(InterviewAnswer, answer_id)
+    if not answer:
+        raise HTTPException(status_code=404, detail="Answer not found")
+
+    await answer_index.ensure_loaded()
+    neighbours = answer_index.search(answer.answer_text or "", exclude_id=answer.id)
+    job = await job_queue.enqueue(db, "answer_evaluation", {"answer_id": answer_id})
+    return {
+        "answer_id": answer_id,
+        "provisional_score": provisional_score(neighbours),
+        "neighbours": neighbours,
+        "job": job_to_dict(job),
+    }
@@ -0,0 +1,19 @@
+# backend/routers/jobs.py
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..models import Job
+from ..schemas import JobOut
+from ..jobs import job_to_dict
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """작업 상태 조회. status가 succeeded이면 result에 결과가 담깁니다."""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
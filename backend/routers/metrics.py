@@ -0,0 +1,13 @@
+# backend/routers/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus 텍스트 포맷으로 요청/SQL/LLM 지표를 돌려줍니다."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,80 +1,243 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 
-from ..database import SessionLocal
+from ..database import AsyncSessionLocal, get_db
 from ..models import Resume, User
 from ..schemas import (
-    ResumeCreate, ResumeOut,
+    ResumeCreate, ResumeOut, ResumeSummaryOut, ResumeDetailOut,
     ResumeFeedbackRequest, ResumeFeedbackOut,
-    ResumeGenerateRequest, ResumeGenerateOut
+    ResumeGenerateRequest, ResumeGenerateOut,
+    ResumeImportOut, JobOut
 )
-from ..services import give_resume_feedback, gpt_client
+from ..services import give_resume_feedback, stream_resume_feedback, gpt_client
+from ..sse import sse_response
+from ..jobs import job_queue, job_to_dict
+from ..stats import bump_user_stats, save_resume_review, get_data_version
+from ..http_cache import conditional_response
+from ..llm_scheduler import set_llm_work
+from ..resume_import import RESUME_IMPORT_MAX_ROWS, parse_jsonl, parse_upload, batches, insert_batch
 
 # prefix를 라우터에만 지정하여 중복 제거
 router = APIRouter(prefix="/resumes", tags=["resumes"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+RESUME_PREVIEW_LENGTH = 200
 
-# ▶ 업로드된 자기소개서 전체 목록 조회
-@router.get("", response_model=List[ResumeOut])
-def list_resumes(db: Session = Depends(get_db)):
+# ▶ 업로드된 자기소개서 목록 조회 (키셋 페이지네이션)
+@router.get("", response_model=List[Union[ResumeOut, ResumeSummaryOut]])
+async def list_resumes(
+    request: Request,
+    response: Response,
+    user_id: Optional[int] = None,
+    cursor: Optional[int] = Query(None, description="이전 페이지의 X-Next-Cursor 값"),
+    limit: int = Query(100, ge=1, le=500),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    db: AsyncSession = Depends(get_db)
+):
     """
     React 쪽 getResumeList() 호출용 GET 엔드포인트
+    - id 오름차순, cursor 이후의 최대 limit개를 돌려줍니다.
+      다음 페이지가 있으면 X-Next-Cursor 헤더에 다음 cursor가 담깁니다.
+    - view=summary: 본문 대신 앞부분 미리보기만 돌려줍니다.
+    - edited_text/feedback 같은 큰 컬럼은 읽지 않으며 GET /resumes/{id}에서 조회합니다.
+    - ETag(사용자 데이터 버전 기준)가 같으면 304를 돌려줍니다.
     """
-    return db.query(Resume).all()
+    not_modified = conditional_response(request, response, await db.run_sync(get_data_version, user_id))
+    if not_modified is not None:
+        return not_modified
+
+    if view == "summary":
+        columns = (
+            Resume.id, Resume.user_id,
+            func.substr(Resume.original_text, 1, RESUME_PREVIEW_LENGTH).label("preview"),
+            Resume.edited_text.isnot(None).label("reviewed"),
+        )
+    else:
+        columns = (Resume.id, Resume.user_id, Resume.original_text)
+
+    query = select(*columns)
+    if user_id is not None:
+        query = query.where(Resume.user_id == user_id)
+    if cursor is not None:
+        query = query.where(Resume.id > cursor)
+    # 한 건 더 읽어서 다음 페이지 존재 여부 판단
+    rows = (await db.execute(query.order_by(Resume.id).limit(limit + 1))).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+    return [row._asdict() for row in rows]
+
+# ▶ 자기소개서 상세 조회 (첨삭 결과 포함)
+@router.get("/{resume_id}", response_model=ResumeDetailOut)
+async def get_resume(resume_id: int, db: AsyncSession = Depends(get_db)):
+    resume = await db.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
 
 # ▶ 자기소개서 업로드
 @router.post("", response_model=ResumeOut)
-def upload_resume(
+async def upload_resume(
     payload: ResumeCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.id == payload.user_id).first()
+    user = await db.get(User, payload.user_id)
     if user is None:
         user = User(id=payload.user_id, name=f"User{payload.user_id}")
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     resume = Resume(user_id=payload.user_id, original_text=payload.text)
     db.add(resume)
-    db.commit()
-    db.refresh(resume)
+    await db.run_sync(bump_user_stats, payload.user_id, total_resumes=1)
+    await db.commit()
+    await db.refresh(resume)
     return resume
 
+# ▶ 자기소개서 대량 등록
+@router.post("/import", response_model=ResumeImportOut)
+async def import_resumes(
+    request: Request,
+    user_id: Optional[int] = Query(None, description="multipart의 일반 파일(.jsonl 제외)을 등록할 사용자"),
+    queue_feedback: bool = Query(False, description="등록된 자기소개서마다 첨삭 작업을 큐에 넣음"),
+    mode: Optional[str] = Query(None, description="queue_feedback 시 첨삭 모드"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    여러 자기소개서를 한 번에 등록합니다.
+    - 본문이 JSON Lines: 한 줄에 {"user_id": 1, "text": "..."}
+    - multipart/form-data: .jsonl/.ndjson 파일은 위와 같이, 그 외 파일은 파일 하나가
+      user_id(쿼리 또는 폼 필드)의 자기소개서 하나
+    없는 사용자는 자동으로 만들고, 배치 단위로 커밋합니다. 잘못된 행은 results[].error로 알려 줍니다.
+    """
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        owner = form.get("user_id") or user_id
+        try:
+            owner = int(owner) if owner is not None else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="user_id는 정수여야 합니다.")
+        rows = []
+        for key, value in form.multi_items():
+            if hasattr(value, "read"):
+                rows.extend(parse_upload(value.filename or key, await value.read(), owner))
+    else:
+        rows = parse_jsonl(await request.body())
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="등록할 자기소개서가 없습니다.")
+    if len(rows) > RESUME_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {RESUME_IMPORT_MAX_ROWS}건까지 등록할 수 있습니다.")
+
+    # 배치마다 한 트랜잭션. 실패한 배치만 오류로 표시하고 나머지는 계속합니다.
+    for batch in batches([r for r in rows if r.ok]):
+        try:
+            resume_ids = await db.run_sync(insert_batch, batch)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            for row in batch:
+                row.error = f"저장 실패: {e.__class__.__name__}"
+            continue
+        for row, resume_id in zip(batch, resume_ids):
+            row.resume_id = resume_id
+
+    imported = [r for r in rows if r.resume_id is not None]
+    if queue_feedback and imported:
+        jobs = await job_queue.enqueue_many(
+            db, "resume_feedback", [{"resume_id": r.resume_id, "mode": mode} for r in imported]
+        )
+        for row, job in zip(imported, jobs):
+            row.job_id = job.id
+
+    return {
+        "imported": len(imported),
+        "failed": len(rows) - len(imported),
+        "results": [r.to_dict() for r in rows],
+    }
+
 # ▶ 자기소개서 첨삭 요청
 @router.post("/{resume_id}/feedback", response_model=ResumeFeedbackOut)
-def give_feedback(
+async def give_feedback(
     resume_id: int,
-    _: ResumeFeedbackRequest,
-    db: Session = Depends(get_db)
+    req: ResumeFeedbackRequest,
+    db: AsyncSession = Depends(get_db)
 ):
-    resume = db.query(Resume).filter(Resume.id == resume_id).first()
+    resume = await db.get(Resume, resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
+    user_id, original_text = resume.user_id, resume.original_text
+    # LLM 응답을 기다리는 동안 DB 커넥션을 쥐고 있지 않도록 세션을 먼저 닫습니다.
+    await db.close()
 
-    result = give_resume_feedback(resume.original_text)
-    resume.edited_text = result["edited_text"]
-    resume.feedback = result["feedback"]
-    db.commit()
-    db.refresh(resume)
+    set_llm_work(user_id)
+    result = await give_resume_feedback(original_text, mode=req.mode)
+    await _save_feedback(resume_id, user_id, result)
 
     return ResumeFeedbackOut(
-        edited_text=resume.edited_text,
-        feedback=resume.feedback
+        edited_text=result["edited_text"],
+        feedback=result["feedback"],
+        mode=result["mode"],
+        segments=result["segments"],
+        calls=result["calls"]
     )
 
-# ▶ 새 자기소개서 생성
-@router.post("/generate", response_model=ResumeGenerateOut)
-def generate_resume(
-    r: ResumeGenerateRequest
+# ▶ 자기소개서 첨삭 요청 (백그라운드 작업, GET /jobs/{id}로 결과 조회)
+@router.post("/{resume_id}/feedback/jobs", response_model=JobOut, status_code=202)
+async def enqueue_feedback(
+    resume_id: int,
+    req: ResumeFeedbackRequest,
+    db: AsyncSession = Depends(get_db)
 ):
+    resume = await db.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    job = await job_queue.enqueue(db, "resume_feedback", {"resume_id": resume_id, "mode": req.mode})
+    return job_to_dict(job)
+
+# ▶ 자기소개서 첨삭 요청 (SSE 스트리밍)
+@router.post("/{resume_id}/feedback/stream")
+async def give_feedback_stream(
+    resume_id: int,
+    _: ResumeFeedbackRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    첨삭 결과를 토큰 단위로 전송합니다.
+    이벤트: edited(수정본 토큰) → feedback(피드백 토큰) → done(최종 결과)
+    스트림이 끝나면 최종 결과를 Resume에 저장합니다.
+    """
+    resume = await db.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    user_id, original_text = resume.user_id, resume.original_text
+    set_llm_work(user_id)
+
+    async def events():
+        async for event, data in stream_resume_feedback(original_text):
+            if event == "done":
+                # 요청 스코프의 세션은 스트리밍 중 닫힐 수 있으므로 새 세션으로 저장
+                await _save_feedback(resume_id, user_id, data)
+            yield event, data
+
+    return sse_response(events())
+
+async def _save_feedback(resume_id: int, user_id: int, result: dict):
+    """
+    LLM 호출이 끝난 뒤 짧은 새 세션으로 첨삭 결과를 저장합니다.
+    동시에 같은 자기소개서를 첨삭해도 카운터는 처음 저장한 요청만 올립니다. (save_resume_review)
+    """
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(save_resume_review, resume_id, user_id, result["edited_text"], result["feedback"])
+        await db.commit()
+
+# ▶ 새 자기소개서 생성
+def _generate_prompts(r: ResumeGenerateRequest) -> tuple:
     system_prompt = (
         "당신은 커리어 코치입니다. 지원자의 정보를 바탕으로 매력적인 자기소개서를 작성해 주세요."
     )
@@ -85,5 +248,28 @@ def generate_resume(
         f"경험 요약: {r.experience_list}\n"
         "위 정보를 바탕으로 400자 분량의 자기소개서를 작성해 주세요."
     )
-    generated_text = gpt_client.chat(system_prompt, user_prompt)
+    return system_prompt, user_prompt
+
+@router.post("/generate", response_model=ResumeGenerateOut)
+async def generate_resume(
+    r: ResumeGenerateRequest
+):
+    generated_text = await gpt_client.chat(*_generate_prompts(r), step="generate")
     return {"generated_text": generated_text}
+
+# ▶ 새 자기소개서 생성 (SSE 스트리밍)
+@router.post("/generate/stream")
+async def generate_resume_stream(
+    r: ResumeGenerateRequest
+):
+    """
+    이벤트: token(생성 중인 토큰) → done({"generated_text": str})
+    """
+    async def events():
+        parts = []
+        async for delta in gpt_client.chat_stream(*_generate_prompts(r), step="generate"):
+            parts.append(delta)
+            yield "token", delta
+        yield "done", {"generated_text": "".join(parts).strip()}
+
+    return sse_response(events())
@@ -1,7 +1,7 @@
 # schemas.py
 
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
 
 # ▶ Resume 쪽 스키마
 class ResumeCreate(BaseModel):
@@ -16,16 +16,67 @@ class ResumeOut(BaseModel):
     class Config:
         orm_mode = True
 
+# 목록 조회 view=summary 용 경량 응답 (본문 대신 앞부분 미리보기)
+class ResumeSummaryOut(BaseModel):
+    id: int
+    user_id: int
+    preview: str
+    reviewed: bool
+
+class ResumeDetailOut(BaseModel):
+    id: int
+    user_id: int
+    original_text: str
+    edited_text: Optional[str] = None
+    feedback: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+# GPT 호출 통계 (첨삭 방식·경로별 소요 시간·토큰 사용량 비교용)
+class LLMCallStats(BaseModel):
+    step: str
+    elapsed_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached: bool = False
+    # 라우팅 정책이 고른 경로·모델·출력 한도 (llm_routing.py)
+    route: Optional[str] = None
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+
 class ResumeFeedbackRequest(BaseModel):
-    pass
+    # "two_step" | "structured", 생략하면 서버 설정(RESUME_FEEDBACK_MODE)을 따름
+    mode: Optional[str] = None
 
 class ResumeFeedbackOut(BaseModel):
     edited_text: str
     feedback: str
+    mode: Optional[str] = None
+    # 긴 자소서를 나눠 첨삭한 구간 수 (1이면 한 번에 처리)
+    segments: int = 1
+    calls: List[LLMCallStats] = []
 
     class Config:
         orm_mode = True
 
+# structured 모드에서 GPT가 돌려줘야 하는 JSON 형식
+class StructuredFeedback(BaseModel):
+    edited_text: str
+    feedback: str
+
+# 대량 등록(POST /resumes/import) 결과. line은 "줄 번호" 또는 "파일명:줄 번호"
+class ResumeImportItem(BaseModel):
+    line: str
+    resume_id: Optional[int] = None
+    job_id: Optional[int] = None
+    error: Optional[str] = None
+
+class ResumeImportOut(BaseModel):
+    imported: int
+    failed: int
+    results: List[ResumeImportItem]
+
 # ▶ Resume 새 생성 기능 스키마
 class ResumeGenerateRequest(BaseModel):
     name: str
@@ -45,9 +96,18 @@ class QuestionRequest(BaseModel):
     user_id: int
     company: str
     role: str
+    # True 이면 질문 은행에 충분히 쌓여 있어도 새로 생성 (중복 질문은 은행에 추가되지 않음)
+    fresh: bool = False
+
+class QuestionItem(BaseModel):
+    id: int
+    question_text: str
 
 class QuestionResponse(BaseModel):
     questions: List[str]
+    # 저장된 InterviewQuestion 행 (답변 등록 시 question_id로 사용)
+    items: List[QuestionItem] = []
+    source: str = "generated"   # "bank" | "generated"
 
 class AnswerCreateRequest(BaseModel):
     question_id: int
@@ -69,6 +129,22 @@ class AnswerEvaluation(BaseModel):
     score: float
     feedback: str
 
+class BatchEvaluationRequest(BaseModel):
+    # user_id 또는 answer_ids 중 하나 이상 지정 (둘 다 주면 교집합)
+    user_id: Optional[int] = None
+    answer_ids: Optional[List[int]] = None
+
+class BatchEvaluationItem(BaseModel):
+    answer_id: int
+    score: Optional[float] = None
+    feedback: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchEvaluationOut(BaseModel):
+    evaluated: int
+    failed: int
+    results: List[BatchEvaluationItem]
+
 
 # ▶ Dashboard 쪽 스키마
 class DashboardOut(BaseModel):
@@ -92,3 +168,25 @@ class ExportResponse(BaseModel):
     class Config:
         orm_mode = True
 
+
+# ▶ Job(백그라운드 작업) 쪽 스키마
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class AnswerNeighbour(BaseModel):
+    answer_id: int
+    score: float
+    similarity: float
+
+class ProvisionalEvaluationOut(BaseModel):
+    # 비슷한 채점 답변들로 낸 잠정 점수 (비슷한 답변이 없으면 None). 최종 결과는 job으로 조회
+    answer_id: int
+    provisional_score: Optional[float] = None
+    neighbours: List[AnswerNeighbour] = []
+    job: JobOut
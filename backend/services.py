@@ -1,93 +1,469 @@
 # services.py
 
 import os
-import openai
+import json
+import time
+import asyncio
+import logging
+from typing import Optional
 from dotenv import load_dotenv
 
-# 1) .env 파일에서 OPENAI_API_KEY 읽기
+from .cache import LLMResponseCache
+from .llm_providers import make_provider
+from .llm_transport import LLMTransport
+from .llm_routing import LLMRouter, RouteDecision
+from .llm_scheduler import LLMScheduler, BULK, llm_work, current_work
+from .chunking import Segment, split_text, join_segments
+from .metrics import record_llm_call, record_llm_error, record_llm_route
+from .schemas import LLMCallStats, StructuredFeedback
+
+logger = logging.getLogger(__name__)
+
+# 1) .env 파일에서 OPENAI_API_KEY / LLM_PROVIDER 읽기
+#    키가 없으면 앱은 뜨고, OpenAI를 실제로 호출하는 시점에 LLMRequestError가 납니다.
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY is None:
-    raise RuntimeError("환경변수에 OPENAI_API_KEY가 설정되어 있지 않습니다. (.env 파일 확인)")
 
-openai.api_key = OPENAI_API_KEY
+# 2) 동시 호출 수 / 타임아웃 설정 (환경변수로 조정 가능)
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# 모델·max_tokens·temperature는 작업별 라우팅 정책(llm_routing.py, LLM_MODEL 등)으로 정합니다.
+
+# 3) 답변 일괄 평가 시 동시에 진행할 최대 평가 수
+EVALUATION_BATCH_CONCURRENCY = int(os.getenv("EVALUATION_BATCH_CONCURRENCY", "5"))
+
+# 4) 자소서 첨삭 방식: "two_step"(수정 → 피드백 2회 호출) 또는 "structured"(JSON 1회 호출)
+RESUME_FEEDBACK_MODE = os.getenv("RESUME_FEEDBACK_MODE", "two_step")
+
+# 5) 긴 자소서 분할 첨삭: 추정 토큰 수가 이보다 크면 섹션/문단 단위 구간으로 나눠
+#    구간별로 동시에 첨삭하고, 구간 피드백을 하나로 합칩니다.
+RESUME_CHUNK_TOKENS = int(os.getenv("RESUME_CHUNK_TOKENS", "400"))
+# 자소서 하나에서 동시에 처리할 최대 구간 수
+RESUME_CHUNK_CONCURRENCY = int(os.getenv("RESUME_CHUNK_CONCURRENCY", "4"))
+
 
 class GPTClient:
     """
-    OpenAI v1.0+ 인터페이스용 GPT 클라이언트.
-    openai.chat.completions.create(...) 로 요청
+    LLM 프로바이더(기본 OpenAI, LLM_PROVIDER=fake 이면 로컬 가짜 응답) 위의 GPT 클라이언트.
+    프로바이더 인스턴스 하나를 재사용하므로 HTTP 커넥션 풀이 요청 간에 공유됩니다.
+    동시 호출 수 제한, 재시도, 속도 제한, 서킷 브레이커는 LLMTransport가 담당하며
+    실패하면 오류 문자열 대신 LLMError 계열 예외가 발생합니다.
+    모델·max_tokens·temperature는 호출마다 router(LLMRouter)가 step과 입력 길이로 고르고,
+    캐시에 없는 호출은 scheduler(LLMScheduler)에서 우선순위·사용자별 슬롯을 받은 뒤 보냅니다.
+    (진행 중인 같은 요청에 합쳐지는 호출은 슬롯 없이 그 결과를 기다립니다.)
     """
-    def __init__(self):
-        # 원하시는 모델로 바꿔도 됩니다. (예: "gpt-4o-mini" 등)
-        # 처음 테스트할 땐 "gpt-3.5-turbo"가 더 무난합니다.
-        self.model_name = "gpt-3.5-turbo"
-        self.max_tokens = 512
-        self.temperature = 0.7
+    def __init__(
+        self,
+        max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+        timeout: float = OPENAI_TIMEOUT,
+        max_retries: int = OPENAI_MAX_RETRIES,
+        provider=None,
+        router: Optional[LLMRouter] = None,
+        scheduler: Optional[LLMScheduler] = None,
+    ):
+        # 모델은 LLM_MODEL / LLM_SMALL_MODEL / LLM_ROUTES_FILE 환경변수로 바꿉니다.
+        # (예: LLM_SMALL_MODEL=gpt-4o-mini 이면 채점·질문 생성만 작은 모델로)
+        self.router = router if router is not None else LLMRouter.from_env()
+        self.scheduler = scheduler if scheduler is not None else LLMScheduler()
 
-    def chat(self, system_prompt: str, user_prompt: str) -> str:
+        self.provider = provider if provider is not None else make_provider(timeout=timeout)
+        self.transport = LLMTransport(self.provider, max_concurrency, max_retries=max_retries)
+        self.cache = LLMResponseCache()
+
+    async def chat(self, system_prompt: str, user_prompt: str, use_cache: bool = True,
+                   step: str = "chat") -> str:
         """
         system_prompt와 user_prompt를 합쳐서 ChatCompletion 요청.
-        v1.0 이상부터는 openai.chat.completions.create를 사용해야 합니다.
+        await 하는 동안 이벤트 루프는 다른 요청을 처리할 수 있습니다.
+        같은 프롬프트는 캐시에서 바로 돌려주며, 매번 다른 결과가 필요하면
+        use_cache=False 로 호출합니다.
         반환값: GPT 응답 텍스트(문자열).
         """
+        text, _ = await self.complete(system_prompt, user_prompt, use_cache=use_cache, step=step)
+        return text
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        use_cache: bool = True,
+        json_mode: bool = False,
+        max_tokens: Optional[int] = None,
+        step: str = "chat",
+    ) -> tuple:
+        """
+        chat()과 같지만 호출 통계(소요 시간, 토큰 사용량, 캐시 여부, 라우팅 결정)를 함께 돌려줍니다.
+        json_mode=True 이면 JSON 객체 형식의 응답을 요청합니다.
+        max_tokens를 주면 라우팅 정책이 고른 출력 한도 대신 그 값을 씁니다.
+        반환값: (응답 텍스트, LLMCallStats)
+        """
+        started = time.perf_counter()
+        decision = self._route(step, user_prompt, max_tokens)
+        stats = LLMCallStats(step=step, route=decision.route, model=decision.model,
+                             max_tokens=decision.max_tokens)
+        key = None
+        if use_cache:
+            key = self.cache.make_key(self._cache_model(decision.model), decision.temperature,
+                                      system_prompt, user_prompt,
+                                      max_tokens=decision.max_tokens, json_mode=json_mode)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                stats.elapsed_ms = (time.perf_counter() - started) * 1000
+                stats.cached = True
+                record_llm_call(step, stats.elapsed_ms, cached=True)
+                self.router.record(decision, stats.elapsed_ms, cached=True)
+                return cached, stats
+
+        request = self._request(system_prompt, user_prompt, decision)
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+
+        # 실패 시 LLMError가 그대로 올라가므로 오류는 캐시되지 않습니다.
         try:
-            response = openai.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user",   "content": user_prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-            )
-            return response.choices[0].message.content.strip()
+            # 진행 중인 같은 요청에 합쳐지면 슬롯을 받지 않습니다 (업스트림 호출은 하나뿐).
+            response = await self.transport.create(request, admission=self.scheduler.slot)
         except Exception as e:
-            return f"GPT 호출 중 오류 발생: {str(e)}"
+            record_llm_error(step, e)
+            raise
+        text = response.text
+        stats.prompt_tokens = response.prompt_tokens or 0
+        stats.completion_tokens = response.completion_tokens or 0
+
+        if key is not None:
+            await self.cache.set(key, text)
+        stats.elapsed_ms = (time.perf_counter() - started) * 1000
+        record_llm_call(step, stats.elapsed_ms, cached=False,
+                        prompt_tokens=stats.prompt_tokens, completion_tokens=stats.completion_tokens)
+        self.router.record(decision, stats.elapsed_ms, prompt_tokens=stats.prompt_tokens,
+                           completion_tokens=stats.completion_tokens)
+        return text, stats
+
+    async def chat_stream(self, system_prompt: str, user_prompt: str, use_cache: bool = True,
+                          step: str = "stream"):
+        """
+        chat()의 스트리밍 버전. 생성되는 토큰 조각(문자열)을 순서대로 yield 합니다.
+        캐시에 있으면 전체 응답을 한 번에 yield 하고, 스트림이 끝나면 완성된
+        응답을 캐시에 저장합니다. 실패하면 LLMError가 발생합니다.
+        스트리밍 응답에는 토큰 사용량이 오지 않으므로 지연 시간만 기록합니다.
+        """
+        started = time.perf_counter()
+        decision = self._route(step, user_prompt)
+        key = None
+        if use_cache:
+            key = self.cache.make_key(self._cache_model(decision.model), decision.temperature,
+                                      system_prompt, user_prompt, max_tokens=decision.max_tokens)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                record_llm_call(step, elapsed_ms, cached=True)
+                self.router.record(decision, elapsed_ms, cached=True)
+                yield cached
+                return
+
+        parts = []
+        try:
+            async with self.scheduler.slot():
+                async for delta in self.transport.stream(self._request(system_prompt, user_prompt, decision)):
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            record_llm_error(step, e)
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        record_llm_call(step, elapsed_ms, cached=False)
+        self.router.record(decision, elapsed_ms)
+
+        if key is not None:
+            await self.cache.set(key, "".join(parts).strip())
+
+    def _route(self, step: str, user_prompt: str, max_tokens: Optional[int] = None) -> RouteDecision:
+        decision = self.router.route(step, user_prompt)
+        if max_tokens is not None:
+            decision = decision._replace(max_tokens=max_tokens)
+        record_llm_route(step, decision.route, decision.model)
+        return decision
+
+    def _cache_model(self, model: str) -> str:
+        # 가짜 프로바이더의 응답이 실제 모델 응답 캐시와 섞이지 않도록 구분합니다.
+        if self.provider.name == "openai":
+            return model
+        return f"{self.provider.name}/{model}"
+
+    def _request(self, system_prompt: str, user_prompt: str, decision: RouteDecision) -> dict:
+        return dict(
+            model=decision.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user",   "content": user_prompt}
+            ],
+            max_tokens=decision.max_tokens,
+            temperature=decision.temperature,
+        )
+
+    async def aclose(self):
+        """앱 종료 시 커넥션 풀을 정리합니다."""
+        await self.provider.aclose()
 
 # 전역 인스턴스
 gpt_client = GPTClient()
 
 
-def give_resume_feedback(original_text: str) -> dict:
+RESUME_EDIT_SYSTEM_PROMPT = (
+    "당신은 뛰어난 글쓰기 전문가입니다. "
+    "사용자가 올린 자기소개서를 더 자연스럽고 매끄럽게 고쳐 주십시오. "
+    "불필요한 중복을 제거하고, 표현을 풍부하게 만들어 주세요."
+)
+
+RESUME_FEEDBACK_SYSTEM_PROMPT = (
+    "당신은 뛰어난 글쓰기 전문가입니다. "
+    "아래의 “원본”과 “수정된 문장”을 비교하여, "
+    "무엇을 어떻게 고쳤는지 간략하지만 구체적으로 설명해 주세요.\n"
+    "예시 형식:\n"
+    "1) “~한 부분”을 “~로” 바꾸어 …\n"
+    "2) “~”를 삭제하고 …\n"
+    "3) “~”라는 표현을 추가해 …"
+)
+
+
+def _resume_feedback_user_prompt(original_text: str, edited_text: str) -> str:
+    return (
+        f"원본:\n{original_text}\n\n"
+        f"수정된 문장:\n{edited_text}"
+    )
+
+
+RESUME_STRUCTURED_FEEDBACK_SYSTEM_PROMPT = (
+    "당신은 뛰어난 글쓰기 전문가입니다. "
+    "사용자가 올린 자기소개서를 더 자연스럽고 매끄럽게 고치고, "
+    "불필요한 중복을 제거하고, 표현을 풍부하게 만들어 주세요. "
+    "그리고 무엇을 어떻게 고쳤는지 간략하지만 구체적으로 설명해 주세요.\n"
+    "반드시 다음 형식의 JSON 객체 하나만 출력하십시오:\n"
+    '{"edited_text": "수정된 자기소개서 전문", '
+    '"feedback": "1) “~한 부분”을 “~로” 바꾸어 …\\n2) “~”를 삭제하고 …"}'
+)
+
+
+RESUME_FEEDBACK_MERGE_SYSTEM_PROMPT = (
+    "당신은 뛰어난 글쓰기 전문가입니다. "
+    "아래는 한 자기소개서를 여러 부분으로 나누어 첨삭한 뒤 부분별로 작성한 피드백입니다. "
+    "중복되는 내용은 합치고 중요한 것부터, 전체 글에 대한 하나의 피드백으로 정리해 주세요.\n"
+    "예시 형식:\n"
+    "1) “~한 부분”을 “~로” 바꾸어 …\n"
+    "2) “~”를 삭제하고 …"
+)
+
+
+def _resume_feedback_merge_user_prompt(feedbacks: list) -> str:
+    return "\n\n".join(f"[부분 {i}]\n{feedback}" for i, feedback in enumerate(feedbacks, start=1))
+
+
+async def give_resume_feedback(original_text: str, mode: Optional[str] = None) -> dict:
     """
-    두 단계 GPT 호출을 통해:
-    1) 자소서를 매끄럽게 고친 'edited_text' 생성
-    2) 원본과 수정본을 비교한 'feedback' 생성
+    자소서 첨삭 결과를 생성합니다.
+    - mode="two_step": 수정본 생성 후, 원본과 비교한 피드백을 한 번 더 요청 (2회 호출)
+    - mode="structured": 수정본과 피드백을 JSON 한 번의 호출로 생성 (1회 호출)
+      응답이 형식에 맞지 않으면 two_step 방식으로 다시 처리합니다.
+    mode를 생략하면 RESUME_FEEDBACK_MODE 설정을 따릅니다.
+    RESUME_CHUNK_TOKENS보다 긴 자소서는 구간별로 동시에 첨삭한 뒤 이어 붙이고,
+    구간 피드백을 한 번 더 호출해 하나로 합칩니다. (지연 시간이 길이에 비례하지 않음)
 
-    반환값: { "edited_text": str, "feedback": str }
+    반환값: { "edited_text": str, "feedback": str, "mode": str, "segments": int, "calls": [LLMCallStats] }
     """
-    # 1) edited_text 생성
-    system_prompt_edit = (
-        "당신은 뛰어난 글쓰기 전문가입니다. "
-        "사용자가 올린 자기소개서를 더 자연스럽고 매끄럽게 고쳐 주십시오. "
-        "불필요한 중복을 제거하고, 표현을 풍부하게 만들어 주세요."
+    mode = "structured" if (mode or RESUME_FEEDBACK_MODE) == "structured" else "two_step"
+    calls = []
+
+    segments = split_text(original_text, RESUME_CHUNK_TOKENS)
+    if len(segments) > 1:
+        result, mode = await _chunked_resume_feedback(segments, mode, calls)
+    else:
+        result, mode = await _resume_feedback(original_text, mode, calls)
+
+    logger.info(
+        "resume feedback mode=%s segments=%d calls=%s",
+        mode,
+        len(segments),
+        [(c.step, round(c.elapsed_ms), c.prompt_tokens, c.completion_tokens, c.cached) for c in calls],
+    )
+    result["mode"] = mode
+    result["segments"] = len(segments)
+    result["calls"] = calls
+    return result
+
+
+async def _resume_feedback(original_text: str, mode: str, calls: list) -> tuple:
+    """글 하나(또는 구간 하나)를 첨삭합니다. 반환값: (결과 dict, 실제로 쓴 mode)"""
+    if mode == "structured":
+        result = await _structured_resume_feedback(original_text, calls)
+        if result is not None:
+            return result, mode
+    return await _two_step_resume_feedback(original_text, calls), "two_step"
+
+
+async def _chunked_resume_feedback(segments: list, mode: str, calls: list) -> tuple:
+    """구간별 첨삭을 최대 RESUME_CHUNK_CONCURRENCY개씩 동시에 실행하고 결과를 합칩니다."""
+    semaphore = asyncio.Semaphore(RESUME_CHUNK_CONCURRENCY)
+
+    async def process(segment: Segment):
+        segment_calls = []
+        async with semaphore:
+            result, used_mode = await _resume_feedback(segment.text, mode, segment_calls)
+        return result, used_mode, segment_calls
+
+    processed = await asyncio.gather(*(process(segment) for segment in segments))
+    for _, _, segment_calls in processed:
+        calls.extend(segment_calls)
+
+    feedback = await _merge_segment_feedback([r["feedback"] for r, _, _ in processed], calls)
+    # 일부 구간이 two_step으로 대체되었으면 two_step으로 기록합니다.
+    used_mode = mode if all(m == mode for _, m, _ in processed) else "two_step"
+    return {
+        "edited_text": join_segments(segments, [r["edited_text"] for r, _, _ in processed]),
+        "feedback": feedback,
+    }, used_mode
+
+
+async def _merge_segment_feedback(feedbacks: list, calls: list) -> str:
+    feedback, stats = await gpt_client.complete(
+        RESUME_FEEDBACK_MERGE_SYSTEM_PROMPT,
+        _resume_feedback_merge_user_prompt(feedbacks),
+        step="feedback_merge",
     )
-    user_prompt_edit = original_text
-    edited_text = gpt_client.chat(system_prompt_edit, user_prompt_edit)
-
-    # 2) feedback 생성
-    system_prompt_feedback = (
-        "당신은 뛰어난 글쓰기 전문가입니다. "
-        "아래의 “원본”과 “수정된 문장”을 비교하여, "
-        "무엇을 어떻게 고쳤는지 간략하지만 구체적으로 설명해 주세요.\n"
-        "예시 형식:\n"
-        "1) “~한 부분”을 “~로” 바꾸어 …\n"
-        "2) “~”를 삭제하고 …\n"
-        "3) “~”라는 표현을 추가해 …"
+    calls.append(stats)
+    return feedback
+
+
+async def _edit_resume(original_text: str, calls: list) -> str:
+    edited_text, stats = await gpt_client.complete(
+        RESUME_EDIT_SYSTEM_PROMPT, original_text, step="edit",
     )
-    user_prompt_feedback = (
-        f"원본:\n{original_text}\n\n"
-        f"수정된 문장:\n{edited_text}"
+    calls.append(stats)
+    return edited_text
+
+
+async def _compare_feedback(original_text: str, edited_text: str, calls: list) -> str:
+    feedback, stats = await gpt_client.complete(
+        RESUME_FEEDBACK_SYSTEM_PROMPT,
+        _resume_feedback_user_prompt(original_text, edited_text),
+        step="feedback",
     )
-    feedback = gpt_client.chat(system_prompt_feedback, user_prompt_feedback)
+    calls.append(stats)
+    return feedback
+
 
+async def _two_step_resume_feedback(original_text: str, calls: list) -> dict:
+    """
+    두 단계 GPT 호출을 통해:
+    1) 자소서를 매끄럽게 고친 'edited_text' 생성
+    2) 원본과 수정본을 비교한 'feedback' 생성
+    """
+    edited_text = await _edit_resume(original_text, calls)
+    feedback = await _compare_feedback(original_text, edited_text, calls)
     return {
         "edited_text": edited_text,
         "feedback": feedback
     }
 
 
-def generate_resume(name: str, role: str, experience_years: int, experience_list: str) -> str:
+async def _structured_resume_feedback(original_text: str, calls: list) -> Optional[dict]:
+    """수정본과 피드백을 JSON 한 번으로 받습니다. 형식 오류 시 None."""
+    response, stats = await gpt_client.complete(
+        RESUME_STRUCTURED_FEEDBACK_SYSTEM_PROMPT,
+        original_text,
+        json_mode=True,
+        step="structured",
+    )
+    calls.append(stats)
+    try:
+        parsed = StructuredFeedback(**json.loads(response))
+    except (ValueError, TypeError) as e:
+        logger.warning("structured feedback malformed, falling back to two_step: %s", e)
+        return None
+    if not parsed.edited_text.strip() or not parsed.feedback.strip():
+        logger.warning("structured feedback has empty fields, falling back to two_step")
+        return None
+    return {
+        "edited_text": parsed.edited_text.strip(),
+        "feedback": parsed.feedback.strip()
+    }
+
+
+async def stream_resume_feedback(original_text: str):
+    """
+    give_resume_feedback()의 스트리밍 버전.
+    ("edited", 토큰) → ("feedback", 토큰) 순으로 yield 하고,
+    마지막에 ("done", { "edited_text": str, "feedback": str })를 yield 합니다.
+    긴 자소서는 구간별 수정본을 앞 구간부터 완성되는 대로 yield 합니다.
+    """
+    segments = split_text(original_text, RESUME_CHUNK_TOKENS)
+    if len(segments) > 1:
+        async for item in _stream_chunked_resume_feedback(segments):
+            yield item
+        return
+
+    edited_parts = []
+    async for delta in gpt_client.chat_stream(RESUME_EDIT_SYSTEM_PROMPT, original_text, step="edit"):
+        edited_parts.append(delta)
+        yield "edited", delta
+    edited_text = "".join(edited_parts).strip()
+
+    feedback_parts = []
+    async for delta in gpt_client.chat_stream(
+        RESUME_FEEDBACK_SYSTEM_PROMPT,
+        _resume_feedback_user_prompt(original_text, edited_text),
+        step="feedback",
+    ):
+        feedback_parts.append(delta)
+        yield "feedback", delta
+
+    yield "done", {
+        "edited_text": edited_text,
+        "feedback": "".join(feedback_parts).strip()
+    }
+
+
+async def _stream_chunked_resume_feedback(segments: list):
+    """모든 구간의 수정·비교를 동시에 시작하고, 수정본은 원래 순서대로 내보냅니다."""
+    semaphore = asyncio.Semaphore(RESUME_CHUNK_CONCURRENCY)
+    calls = []
+
+    async def edit(segment: Segment) -> str:
+        async with semaphore:
+            return await _edit_resume(segment.text, calls)
+
+    async def compare(segment: Segment, edit_task) -> str:
+        edited_text = await edit_task
+        async with semaphore:
+            return await _compare_feedback(segment.text, edited_text, calls)
+
+    edit_tasks = [asyncio.ensure_future(edit(segment)) for segment in segments]
+    compare_tasks = [asyncio.ensure_future(compare(s, t)) for s, t in zip(segments, edit_tasks)]
+    try:
+        edited_texts = []
+        for segment, task in zip(segments, edit_tasks):
+            edited_texts.append(await task)
+            yield "edited", edited_texts[-1].strip() + segment.separator
+        feedbacks = await asyncio.gather(*compare_tasks)
+    finally:
+        # 클라이언트가 끊으면 남은 구간 호출을 취소합니다.
+        for task in edit_tasks + compare_tasks:
+            task.cancel()
+
+    feedback_parts = []
+    async for delta in gpt_client.chat_stream(
+        RESUME_FEEDBACK_MERGE_SYSTEM_PROMPT,
+        _resume_feedback_merge_user_prompt(feedbacks),
+        step="feedback_merge",
+    ):
+        feedback_parts.append(delta)
+        yield "feedback", delta
+
+    yield "done", {
+        "edited_text": join_segments(segments, edited_texts),
+        "feedback": "".join(feedback_parts).strip()
+    }
+
+
+async def generate_resume(name: str, role: str, experience_years: int, experience_list: str) -> str:
     """
     GPT를 이용해 새 자기소개서를 생성합니다.
     입력:
@@ -108,31 +484,32 @@ def generate_resume(name: str, role: str, experience_years: int, experience_list
         f"경력 요약: {experience_list}\n\n"
         "위 정보를 토대로 한 편의 완성된 자기소개서를 작성해 주세요."
     )
-    generated_text = gpt_client.chat(system_prompt, user_prompt)
+    generated_text = await gpt_client.chat(system_prompt, user_prompt, step="generate")
     return generated_text
 
 
-def generate_interview_questions(user_id: int, company: str, role: str) -> list:
-    """
-    GPT를 이용해 면접 질문 리스트를 생성합니다.
-    입력:
-      - company (지원 회사)
-      - role (지원 직무)
-    반환값: 질문 문자열 리스트
-    """
-    system_prompt = (
-        "당신은 기업 면접관 교육을 담당하는 전문가입니다.  "
-        "면접 질문은 행동 기반이어야 하며, 지원자가 직접 경험한 상황을 이끌어내는 데 초점을 맞춥니다.  " 
-        "각 질문은 반드시 어떤 상황이었나요? 또는 어떻게 대응했나요? 처럼 구체적인 행동을 유도하는 형식이어야 합니다.  질문은 모호하지 않고, 지원 직무의 실제 상황을 반영해야 합니다."
-    )
-    user_prompt = (
+INTERVIEW_QUESTION_SYSTEM_PROMPT = (
+    "당신은 기업 면접관 교육을 담당하는 전문가입니다.  "
+    "면접 질문은 행동 기반이어야 하며, 지원자가 직접 경험한 상황을 이끌어내는 데 초점을 맞춥니다.  " 
+    "각 질문은 반드시 어떤 상황이었나요? 또는 어떻게 대응했나요? 처럼 구체적인 행동을 유도하는 형식이어야 합니다.  질문은 모호하지 않고, 지원 직무의 실제 상황을 반영해야 합니다."
+)
+
+
+def _interview_question_user_prompt(company: str, role: str, avoid: Optional[list] = None) -> str:
+    prompt = (
         f"지원 직무: {role}\n"
         f"회사명: {company}\n\n"
         "위 직무와 회사에 적합한 행동면접 질문 5개를 만들어 주세요."
         "각 질문은 지원자가 실제 경험을 바탕으로 답할 수 있도록 구체적이고 직무 연관성이 있어야 합니다."
     )
-    response = gpt_client.chat(system_prompt, user_prompt)
+    if avoid:
+        # 질문 은행에 이미 있는 질문과 겹치지 않도록 예시를 보여 줍니다.
+        prompt += "\n\n다음 질문들과 내용이 겹치지 않는 새로운 질문이어야 합니다:\n"
+        prompt += "\n".join(f"- {q}" for q in avoid)
+    return prompt
+
 
+def parse_interview_questions(response: str) -> list:
     # GPT가 “1. 질문… 2. 질문…” 형태로 반환해 줄 것이므로,
     # 줄바꿈('\n')을 기준으로 분리하거나, 간단히 콤마로 분할할 수도 있습니다.
     # 여기서는 줄바꿈을 기준으로 리스트화하는 예시:
@@ -150,7 +527,48 @@ def generate_interview_questions(user_id: int, company: str, role: str) -> list:
     return questions
 
 
-def evaluate_interview_answer(answer_text: str) -> dict:
+async def generate_interview_questions(
+    user_id: int, company: str, role: str,
+    avoid: Optional[list] = None, use_cache: bool = True,
+) -> list:
+    """
+    GPT를 이용해 면접 질문 리스트를 생성합니다.
+    입력:
+      - company (지원 회사)
+      - role (지원 직무)
+      - avoid (겹치지 않아야 할 기존 질문들, 선택)
+    반환값: 질문 문자열 리스트
+    """
+    response = await gpt_client.chat(
+        INTERVIEW_QUESTION_SYSTEM_PROMPT,
+        _interview_question_user_prompt(company, role, avoid),
+        use_cache=use_cache,
+        step="questions",
+    )
+    return parse_interview_questions(response)
+
+
+async def stream_interview_questions(
+    user_id: int, company: str, role: str,
+    avoid: Optional[list] = None, use_cache: bool = True,
+):
+    """
+    generate_interview_questions()의 스트리밍 버전.
+    ("token", 토큰)을 yield 하고, 마지막에 ("done", 질문 리스트)를 yield 합니다.
+    """
+    parts = []
+    async for delta in gpt_client.chat_stream(
+        INTERVIEW_QUESTION_SYSTEM_PROMPT,
+        _interview_question_user_prompt(company, role, avoid),
+        use_cache=use_cache,
+        step="questions",
+    ):
+        parts.append(delta)
+        yield "token", delta
+    yield "done", parse_interview_questions("".join(parts))
+
+
+async def evaluate_interview_answer(answer_text: str) -> dict:
     """
     GPT를 이용해 사용자 답변을 채점하고 피드백을 생성합니다.
     입력:
@@ -162,7 +580,7 @@ def evaluate_interview_answer(answer_text: str) -> dict:
         "왜 그 점수를 주었는지 구체적인 피드백을 작성해 주세요."
     )
     user_prompt = f"면접 답변: {answer_text}"
-    response = gpt_client.chat(system_prompt, user_prompt)
+    response = await gpt_client.chat(system_prompt, user_prompt, step="evaluation")
 
     # 예시로 응답이 "점수: 4.0\n피드백: ~~~" 형태로 온다고 가정하고 파싱합니다.
     # 실제 응답 형식에 맞춰 아래 파싱 로직을 조정해야 할 수 있습니다.
@@ -187,3 +605,26 @@ def evaluate_interview_answer(answer_text: str) -> dict:
         "feedback": feedback
     }
 
+
+async def evaluate_interview_answers(answer_texts: dict, concurrency: int = EVALUATION_BATCH_CONCURRENCY) -> dict:
+    """
+    여러 답변을 최대 concurrency개씩 동시에 평가합니다.
+    입력:
+      - answer_texts ({ answer_id: answer_text })
+    반환값: { answer_id: { "score": float, "feedback": str } 또는 Exception }
+    한 답변의 실패가 나머지 평가를 막지 않도록 예외도 결과로 돌려줍니다.
+    일괄 평가는 bulk 우선순위로 실행되어 다른 사용자의 대화형 요청보다 뒤로 밀립니다.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def evaluate_one(answer_text: str):
+        async with semaphore:
+            return await evaluate_interview_answer(answer_text)
+
+    answer_ids = list(answer_texts)
+    with llm_work(current_work().user_id, BULK):
+        results = await asyncio.gather(
+            *(evaluate_one(answer_texts[answer_id]) for answer_id in answer_ids),
+            return_exceptions=True,
+        )
+    return dict(zip(answer_ids, results))
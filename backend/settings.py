@@ -0,0 +1,42 @@
+# settings.py
+"""
+create_app()에 넘기는 앱 조립 설정.
+각 모듈의 세부 튜닝 값(OPENAI_*, DB_*, LLM_CACHE_* 등)은 지금처럼 해당 모듈의
+환경변수 상수로 두고, 여기에는 앱을 어떻게 띄울지에 관한 값만 모읍니다.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import List
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default) == "1"
+
+
+@dataclass
+class AppSettings:
+    title: str = "Job Prep Assistant"
+    # 시작 시 테이블 생성 + 마이그레이션. 워커가 여러 개면 0으로 두고
+    # 배포 시 `python -m backend.migrations`를 한 번 실행하는 편이 빠릅니다.
+    init_db: bool = True
+    # 백그라운드 작업 워커(jobs.py)를 이 프로세스에서 돌릴지 여부
+    start_job_workers: bool = True
+    # /metrics 엔드포인트와 요청 계측 미들웨어
+    metrics_enabled: bool = True
+    # 큰 JSON/텍스트 응답 gzip(brotli 설치 시 br) 압축
+    compression_enabled: bool = True
+    # Idempotency-Key 헤더 처리 (idempotency.py)
+    idempotency_enabled: bool = True
+    cors_origins: List[str] = field(default_factory=lambda: ["*"])
+
+    @classmethod
+    def from_env(cls) -> "AppSettings":
+        return cls(
+            init_db=_env_flag("APP_INIT_DB", "1"),
+            start_job_workers=_env_flag("APP_START_JOB_WORKERS", "1"),
+            metrics_enabled=_env_flag("METRICS_ENABLED", "1"),
+            compression_enabled=_env_flag("HTTP_COMPRESSION_ENABLED", "1"),
+            idempotency_enabled=_env_flag("IDEMPOTENCY_ENABLED", "1"),
+            cors_origins=[o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "*").split(",") if o.strip()],
+        )
@@ -0,0 +1,36 @@
+# sse.py
+
+import json
+from fastapi.responses import StreamingResponse
+
+from .llm_transport import LLMError
+
+
+def sse_event(event: str, data) -> str:
+    """Server-Sent Events 한 건을 직렬화합니다. data는 JSON으로 인코딩됩니다."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(events) -> StreamingResponse:
+    """
+    (event, data) 튜플을 yield 하는 async generator를 SSE 응답으로 감쌉니다.
+    프록시 버퍼링을 끄도록 헤더를 지정합니다.
+    스트림 도중 LLM 호출이 실패하면 error 이벤트를 보내고 스트림을 닫습니다.
+    """
+    async def body():
+        try:
+            async for event, data in events:
+                yield sse_event(event, data)
+        except LLMError as e:
+            yield sse_event("error", {
+                "detail": str(e),
+                "status_code": e.status_code,
+                "retry_after": e.retry_after,
+            })
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,233 @@
+# stats.py
+"""
+대시보드용 사용자별 집계.
+
+- compute_user_counts(): 원본 테이블에서 한 번의 쿼리로 모든 카운트를 계산
+- user_stats 테이블(USER_STATS_ENABLED=1): 업로드/첨삭/답변/평가 시점에
+  bump_*()로 증분 갱신되어, 대시보드는 기본키 조회 한 번으로 끝납니다.
+  행이 없는 사용자는 첫 조회 때 원본에서 계산해 채웁니다.
+- 첨삭/평가 결과는 save_resume_review() / save_answer_evaluation()으로 저장합니다.
+  조건부 UPDATE로 처음 저장한 요청만 카운터를 올리므로, 같은 행을 동시에 처리해도 한 번만 셉니다.
+- 카운터가 어긋났을 때: python -m backend.stats rebuild [--user-id N]
+- user_data_versions: 카운터가 바뀌는 쓰기마다 사용자 버전을 올립니다.
+  대시보드/자기소개서 목록의 ETag가 이 값으로 계산됩니다. (http_cache.py)
+"""
+
+import os
+import argparse
+
+from sqlalchemy import select, func, update
+from sqlalchemy.orm import Session
+
+from .models import User, Resume, InterviewQuestion, InterviewAnswer, UserStats, UserDataVersion
+
+USER_STATS_ENABLED = os.getenv("USER_STATS_ENABLED", "1") == "1"
+
+STAT_FIELDS = (
+    "total_resumes",
+    "reviewed_resumes",
+    "total_questions",
+    "total_answers",
+    "total_evaluated_answers",
+)
+
+
+def compute_user_counts(db: Session, user_id: int):
+    """
+    사용자 이름과 5개 카운트를 스칼라 서브쿼리로 묶어 한 번에 조회합니다.
+    사용자가 없으면 None.
+    """
+    user_answers = select(InterviewAnswer.id).join(
+        InterviewQuestion, InterviewQuestion.id == InterviewAnswer.question_id
+    ).where(InterviewQuestion.user_id == user_id)
+
+    row = db.execute(
+        select(
+            User.name,
+            select(func.count(Resume.id))
+            .where(Resume.user_id == user_id).scalar_subquery(),
+            select(func.count(Resume.edited_text))
+            .where(Resume.user_id == user_id).scalar_subquery(),
+            select(func.count(InterviewQuestion.id))
+            .where(InterviewQuestion.user_id == user_id).scalar_subquery(),
+            select(func.count()).select_from(user_answers.subquery()).scalar_subquery(),
+            select(func.count()).select_from(
+                user_answers.where(InterviewAnswer.score.isnot(None)).subquery()
+            ).scalar_subquery(),
+        ).where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+
+    name, *counts = row
+    return {"user_name": name, **dict(zip(STAT_FIELDS, counts))}
+
+
+def get_user_stats(db: Session, user_id: int):
+    """대시보드 데이터. user_stats 행이 있으면 그대로, 없으면 계산 후 저장합니다."""
+    if not USER_STATS_ENABLED:
+        return compute_user_counts(db, user_id)
+
+    row = db.execute(
+        select(User.name, UserStats)
+        .join(UserStats, UserStats.user_id == User.id)
+        .where(User.id == user_id)
+    ).first()
+    if row is not None:
+        name, stats = row
+        return {"user_name": name, **{f: getattr(stats, f) for f in STAT_FIELDS}}
+
+    counts = rebuild_user_stats(db, user_id)
+    db.commit()
+    return counts
+
+
+def rebuild_user_stats(db: Session, user_id: int):
+    """원본 테이블 기준으로 user_stats 행을 다시 계산합니다. (커밋은 호출자가)"""
+    counts = compute_user_counts(db, user_id)
+    if counts is None:
+        return None
+    db.merge(UserStats(user_id=user_id, **{f: counts[f] for f in STAT_FIELDS}))
+    return counts
+
+
+def bump_user_stats(db: Session, user_id: int, **deltas):
+    """
+    user_stats 카운터를 증감합니다. 예) bump_user_stats(db, 1, total_resumes=1)
+    행이 아직 없으면 아무것도 하지 않습니다 (첫 조회 때 원본에서 계산됨).
+    사용자 데이터 버전도 함께 올립니다. (USER_STATS_ENABLED=0 이어도)
+    호출자의 트랜잭션 안에서 실행되며, 커밋은 호출자가 합니다.
+    """
+    if not deltas:
+        return
+    bump_data_version(db, user_id)
+    if not USER_STATS_ENABLED:
+        return
+    db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values({f: getattr(UserStats, f) + d for f, d in deltas.items()})
+    )
+
+
+def bump_answer_stats(db: Session, question_id: int, **deltas):
+    """답변 관련 카운터 증감. question_id로 질문 주인을 찾아 bump_user_stats()와 같이 처리합니다."""
+    if not deltas:
+        return
+    owner = db.execute(
+        select(InterviewQuestion.user_id).where(InterviewQuestion.id == question_id)
+    ).scalar()
+    if owner is not None:
+        bump_user_stats(db, owner, **deltas)
+
+
+# ▶ 첨삭/평가 결과 저장
+def save_resume_review(db: Session, resume_id: int, user_id: int, edited_text: str, feedback: str) -> bool:
+    """
+    첨삭 결과를 저장합니다. 아직 첨삭되지 않은 행(edited_text IS NULL)을 이 UPDATE가
+    채운 경우에만 reviewed_resumes를 올리고 True를 리턴합니다. 커밋은 호출자가 합니다.
+    """
+    values = {"edited_text": edited_text, "feedback": feedback}
+    first = db.execute(
+        update(Resume)
+        .where(Resume.id == resume_id, Resume.edited_text.is_(None))
+        .values(values)
+    ).rowcount == 1
+    if first:
+        bump_user_stats(db, user_id, reviewed_resumes=1)
+    else:
+        db.execute(update(Resume).where(Resume.id == resume_id).values(values))
+    return first
+
+
+def save_answer_evaluation(db: Session, answer_id: int, question_id: int, score: float, feedback: str) -> bool:
+    """
+    평가 결과를 저장합니다. 미채점 행(score IS NULL)을 이 UPDATE가 채운 경우에만
+    total_evaluated_answers를 올리고 True를 리턴합니다. 커밋은 호출자가 합니다.
+    """
+    values = {"score": score, "feedback": feedback}
+    first = db.execute(
+        update(InterviewAnswer)
+        .where(InterviewAnswer.id == answer_id, InterviewAnswer.score.is_(None))
+        .values(values)
+    ).rowcount == 1
+    if first:
+        bump_answer_stats(db, question_id, total_evaluated_answers=1)
+    else:
+        db.execute(update(InterviewAnswer).where(InterviewAnswer.id == answer_id).values(values))
+    return first
+
+
+# ▶ 데이터 버전 (ETag)
+def bump_data_version(db: Session, user_id: int):
+    """사용자 데이터 버전 +1 (행이 없으면 1로 생성). 커밋은 호출자가 합니다."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        db.execute(
+            dialect_insert(UserDataVersion)
+            .values(user_id=user_id, version=1)
+            .on_conflict_do_update(
+                index_elements=[UserDataVersion.user_id],
+                set_={"version": UserDataVersion.version + 1},
+            )
+        )
+        return
+    updated = db.execute(
+        update(UserDataVersion)
+        .where(UserDataVersion.user_id == user_id)
+        .values(version=UserDataVersion.version + 1)
+    )
+    if updated.rowcount == 0:
+        db.add(UserDataVersion(user_id=user_id, version=1))
+        db.flush()
+
+
+def get_data_version(db: Session, user_id: int = None) -> str:
+    """
+    사용자 데이터 버전 토큰. user_id가 없으면 전체 사용자 기준으로,
+    버전 합계와 행 수를 씁니다. (어느 사용자든 버전이 오르면 합계가 바뀜)
+    """
+    if user_id is not None:
+        version = db.execute(
+            select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+        ).scalar()
+        return f"u{user_id}.{version or 0}"
+    total, count = db.execute(
+        select(func.coalesce(func.sum(UserDataVersion.version), 0), func.count())
+    ).one()
+    return f"all.{total}.{count}"
+
+
+def rebuild_all(db: Session, user_id: int = None) -> int:
+    """모든(또는 지정한) 사용자의 카운터를 재계산합니다. 처리한 사용자 수를 리턴."""
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [row.id for row in db.query(User.id)]
+    for uid in user_ids:
+        # 값이 바뀌었을 수 있으므로 캐시된 응답(ETag)도 무효화합니다.
+        if rebuild_user_stats(db, uid) is not None:
+            bump_data_version(db, uid)
+    db.commit()
+    return len(user_ids)
+
+
+if __name__ == "__main__":
+    from .database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="user_stats 카운터 관리")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        count = rebuild_all(session, args.user_id)
+        print(f"user_stats 재계산 완료: {count}명")
+    finally:
+        session.close()
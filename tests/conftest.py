@@ -0,0 +1,94 @@
+# tests/conftest.py
+"""
+라우터 테스트 공통 설정.
+
+backend 모듈은 import 시점에 환경변수를 읽으므로, 임시 디렉터리의 SQLite(DATABASE_URL)와
+가짜 LLM 프로바이더(LLM_PROVIDER=fake)를 지정한 뒤에 import 합니다.
+요청은 httpx.ASGITransport로 create_app()에 바로 보내고, 테스트마다 테이블을 새로 만듭니다.
+
+    pip install -r backend/requirements-dev.txt
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="backend-tests-")
+
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(WORKDIR, 'test.db')}",
+    LLM_PROVIDER="fake",
+    # 가짜 LLM 지연 없음, 응답 캐시·클라이언트 측 속도 제한 끔 (테스트끼리 결과가 섞이지 않도록)
+    FAKE_LLM_LATENCY_MS="0",
+    FAKE_LLM_TOKENS_PER_SECOND="0",
+    LLM_CACHE_ENABLED="0",
+    LLM_REQUESTS_PER_MINUTE="0",
+    LLM_TOKENS_PER_MINUTE="0",
+)
+os.environ.pop("ASYNC_DATABASE_URL", None)
+sys.path.insert(0, ROOT)
+
+import httpx  # noqa: E402
+
+from backend.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from backend.main import create_app  # noqa: E402
+from backend.services import gpt_client  # noqa: E402
+from backend.settings import AppSettings  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def workdir():
+    # 내보내기 파일(exported_docs/, exported_pdfs/)은 현재 디렉터리 기준으로 저장됩니다.
+    cwd = os.getcwd()
+    os.chdir(WORKDIR)
+    yield WORKDIR
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope="session")
+def app():
+    # 작업 큐 워커는 띄우지 않습니다. (/jobs 등록 응답만 확인)
+    return create_app(AppSettings(start_job_workers=False))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client(app):
+    Base.metadata.drop_all(bind=engine)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+
+
+@pytest.fixture
+def db():
+    """응답 후 DB에 남은 결과를 확인하는 동기 세션"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def pool_during_llm(monkeypatch):
+    """LLM 프로바이더가 호출될 때마다 그 시점에 사용 중인 비동기 DB 커넥션 수를 기록합니다."""
+    provider = gpt_client.transport.provider
+    complete = provider.complete
+    checked_out = []
+
+    async def recording(request):
+        checked_out.append(async_engine.pool.checkedout())
+        return await complete(request)
+
+    monkeypatch.setattr(provider, "complete", recording)
+    return checked_out
@@ -0,0 +1,40 @@
+# tests/test_artifacts.py
+
+import os
+import time
+
+from backend.artifacts import evict, touch
+
+
+def make_file(directory, name, age):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * 10)
+    past = time.time() - age
+    os.utime(path, (past, past))
+    return path
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    old = make_file(tmp_path, "old.pdf", age=300)
+    new = make_file(tmp_path, "new.pdf", age=100)
+    mtime = os.stat(old).st_mtime
+
+    # 오래 전에 만들었어도 최근에 재사용한 파일은 남습니다.
+    touch(old)
+    assert os.stat(old).st_mtime == mtime
+    evict(str(tmp_path), max_bytes=10, max_age=3600)
+
+    assert os.path.exists(old)
+    assert not os.path.exists(new)
+
+
+def test_evict_expires_by_last_use(tmp_path):
+    used = make_file(tmp_path, "used.docx", age=7200)
+    stale = make_file(tmp_path, "stale.docx", age=7200)
+    touch(used)
+
+    evict(str(tmp_path), max_age=3600)
+
+    assert os.path.exists(used)
+    assert not os.path.exists(stale)
@@ -0,0 +1,79 @@
+# tests/test_dashboard_router.py
+
+import asyncio
+
+import pytest
+
+from backend.models import UserStats
+from backend.services import gpt_client
+from backend.stats import STAT_FIELDS
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_unknown_user(client):
+    response = await client.get("/1")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "User not found"}
+
+
+async def test_counts_follow_activity(client, db):
+    await client.post("/resumes", json={"user_id": 1, "text": "첫 번째"})
+    await client.post("/resumes", json={"user_id": 1, "text": "두 번째"})
+    await client.post("/resumes", json={"user_id": 2, "text": "다른 사용자"})
+
+    response = await client.get("/1")
+    assert response.status_code == 200
+    assert response.json() == {"user_id": 1, "user_name": "User1", "total_resumes": 2, "reviewed_resumes": 0,
+                               "total_questions": 0, "total_answers": 0, "total_evaluated_answers": 0}
+
+    # 첫 조회 이후에는 user_stats 행이 쓰기마다 함께 갱신됩니다.
+    await client.post("/resumes/1/feedback", json={})
+    await client.post("/interviews/questions", json={"user_id": 1, "company": "회사", "role": "백엔드 개발자"})
+    await client.post("/interviews/answers", json={"question_id": 1, "answer_text": "답변"})
+    await client.post("/interviews/answers", json={"question_id": 2, "answer_text": "답변"})
+    await client.post("/interviews/evaluate/1", json={})
+
+    expected = {"user_id": 1, "user_name": "User1", "total_resumes": 2, "reviewed_resumes": 1,
+                "total_questions": 5, "total_answers": 2, "total_evaluated_answers": 1}
+    response = await client.get("/1")
+    assert response.json() == expected
+    stats = db.get(UserStats, 1)
+    assert {f: getattr(stats, f) for f in STAT_FIELDS} == \
+        {f: v for f, v in expected.items() if f in STAT_FIELDS}
+
+
+async def test_etag_revalidation(client):
+    await client.post("/resumes", json={"user_id": 1, "text": "첫 번째"})
+
+    first = await client.get("/1")
+    etag = first.headers["ETag"]
+    response = await client.get("/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.post("/resumes", json={"user_id": 1, "text": "두 번째"})
+    response = await client.get("/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total_resumes"] == 2
+
+
+async def test_concurrent_reviews_count_once(client, monkeypatch):
+    await client.post("/resumes", json={"user_id": 1, "text": "첫 번째"})
+    await client.post("/interviews/questions", json={"user_id": 1, "company": "회사", "role": "백엔드 개발자"})
+    await client.post("/interviews/answers", json={"question_id": 1, "answer_text": "답변"})
+    await client.get("/1")
+
+    # LLM 응답을 기다리는 동안 같은 답변·자기소개서에 대한 요청이 겹치게 합니다.
+    monkeypatch.setattr(gpt_client.transport.provider, "latency_ms", 100)
+    responses = await asyncio.gather(
+        client.post("/interviews/evaluate/1", json={}),
+        client.post("/interviews/evaluate/1", json={}),
+        client.post("/interviews/evaluate/batch", json={"user_id": 1}),
+        client.post("/resumes/1/feedback", json={}),
+        client.post("/resumes/1/feedback", json={}),
+    )
+    assert [r.status_code for r in responses] == [200] * 5
+
+    response = await client.get("/1")
+    assert response.json()["reviewed_resumes"] == 1
+    assert response.json()["total_evaluated_answers"] == 1
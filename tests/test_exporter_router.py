@@ -0,0 +1,84 @@
+# tests/test_exporter_router.py
+
+import os
+import re
+
+import pytest
+
+from backend.routers.exporter import DOCX_DIR, DOCX_MEDIA_TYPE, PDF_DIR
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed(client):
+    await client.post("/resumes", json={"user_id": 1, "text": "원본 자기소개서"})
+    await client.post("/resumes/1/feedback", json={})
+    await client.post("/interviews/questions", json={"user_id": 1, "company": "회사", "role": "백엔드 개발자"})
+    await client.post("/interviews/answers", json={"question_id": 1, "answer_text": "답변"})
+    await client.post("/interviews/evaluate/1", json={})
+
+
+@pytest.mark.parametrize("ext, directory, media_type, magic", [
+    ("docx", DOCX_DIR, DOCX_MEDIA_TYPE, b"PK"),
+    ("pdf", PDF_DIR, "application/pdf", b"%PDF"),
+])
+async def test_export_and_download(client, ext, directory, media_type, magic):
+    await seed(client)
+
+    response = await client.get(f"/exporter/1/{ext}")
+    assert response.status_code == 200
+    body = response.json()
+    assert re.fullmatch(rf"report_user_1_[0-9a-f]{{16}}\.{ext}", body["filename"])
+    assert body["download_url"] == f"/exporter/download/{ext}/{body['filename']}"
+    assert os.path.isfile(os.path.join(directory, body["filename"]))
+
+    # 데이터가 그대로면 같은 파일을 재사용합니다.
+    again = await client.get(f"/exporter/1/{ext}")
+    assert again.json() == body
+
+    download = await client.get(body["download_url"])
+    assert download.status_code == 200
+    assert download.headers["content-type"] == media_type
+    assert download.content.startswith(magic)
+
+
+@pytest.mark.parametrize("ext, directory, media_type, magic", [
+    ("docx", DOCX_DIR, DOCX_MEDIA_TYPE, b"PK"),
+    ("pdf", PDF_DIR, "application/pdf", b"%PDF"),
+])
+async def test_file_response_and_revalidation(client, ext, directory, media_type, magic):
+    await seed(client)
+
+    response = await client.get(f"/exporter/1/{ext}/file")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+    assert response.headers["content-disposition"] == f'attachment; filename="report_user_1.{ext}"'
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.content.startswith(magic)
+
+    # /file 응답도 지문 파일을 만들어 두고, /exporter/1/{ext}와 같은 파일을 씁니다.
+    export = await client.get(f"/exporter/1/{ext}")
+    with open(os.path.join(directory, export.json()["filename"]), "rb") as f:
+        assert f.read() == response.content
+
+    etag = response.headers["ETag"]
+    response = await client.get(f"/exporter/1/{ext}/file", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.post("/resumes", json={"user_id": 1, "text": "새 자기소개서"})
+    response = await client.get(f"/exporter/1/{ext}/file", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_export_unknown_user(client):
+    for path in ("/exporter/1/docx", "/exporter/1/pdf", "/exporter/1/pdf/file"):
+        response = await client.get(path)
+        assert response.status_code == 404
+        assert response.json() == {"detail": "User not found"}
+
+
+async def test_download_rejects_missing_file(client):
+    response = await client.get("/exporter/download/pdf/report_user_1.pdf")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "File not found"}
@@ -0,0 +1,47 @@
+# tests/test_idempotency.py
+
+import asyncio
+
+import pytest
+
+from backend.models import Resume
+from backend.services import gpt_client
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_replay_returns_stored_response(client, db):
+    headers = {"Idempotency-Key": "upload-1"}
+    first = await client.post("/resumes", json={"user_id": 1, "text": "자기소개서"}, headers=headers)
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+
+    again = await client.post("/resumes", json={"user_id": 1, "text": "자기소개서"}, headers=headers)
+    assert again.status_code == 200
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.json()
+    assert db.query(Resume).count() == 1
+
+
+async def test_key_reused_with_different_body(client, db):
+    headers = {"Idempotency-Key": "upload-2"}
+    await client.post("/resumes", json={"user_id": 1, "text": "첫 번째"}, headers=headers)
+
+    response = await client.post("/resumes", json={"user_id": 1, "text": "두 번째"}, headers=headers)
+    assert response.status_code == 422
+    assert db.query(Resume).count() == 1
+
+
+async def test_concurrent_duplicates_share_one_llm_call(client, db):
+    await client.post("/resumes", json={"user_id": 1, "text": "자기소개서"})
+    calls = gpt_client.transport.provider.calls
+    headers = {"Idempotency-Key": "feedback-1"}
+
+    responses = await asyncio.gather(*(
+        client.post("/resumes/1/feedback", json={"mode": "structured"}, headers=headers) for _ in range(3)
+    ))
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert len({r.text for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 2
+    assert gpt_client.transport.provider.calls == calls + 1
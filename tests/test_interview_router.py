@@ -0,0 +1,126 @@
+# tests/test_interview_router.py
+
+import pytest
+
+from backend.jobs import JOB_HANDLERS
+from backend.models import InterviewAnswer, InterviewQuestion
+
+pytestmark = pytest.mark.anyio
+
+QUESTIONS = [
+    "지원한 직무에 관심을 갖게 된 계기는 무엇인가요?",
+    "가장 어려웠던 프로젝트와 해결 과정을 설명해 주세요.",
+    "팀원과 의견이 갈렸을 때 어떻게 조율했나요?",
+    "입사 후 3년 안에 이루고 싶은 목표는 무엇인가요?",
+    "마지막으로 하고 싶은 말이 있나요?",
+]
+EVALUATION_FEEDBACK = "피드백: 질문의 요지를 잘 짚었고 사례가 구체적입니다. 수치 근거를 덧붙이면 더 좋습니다."
+
+
+async def create_questions(client, user_id=1):
+    response = await client.post("/interviews/questions",
+                                 json={"user_id": user_id, "company": "회사", "role": "백엔드 개발자"})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def create_answer(client, question_id=1, text="답변입니다"):
+    response = await client.post("/interviews/answers", json={"question_id": question_id, "answer_text": text})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_questions_are_generated_and_saved(client, db):
+    body = await create_questions(client)
+
+    assert body == {
+        "questions": QUESTIONS,
+        "items": [{"id": i, "question_text": q} for i, q in enumerate(QUESTIONS, start=1)],
+        "source": "generated",
+    }
+    rows = db.query(InterviewQuestion).order_by(InterviewQuestion.id).all()
+    assert [(q.user_id, q.company, q.role, q.question_text) for q in rows] == \
+        [(1, "회사", "백엔드 개발자", q) for q in QUESTIONS]
+
+
+async def test_create_answer(client, db):
+    await create_questions(client)
+
+    assert await create_answer(client) == {"id": 1, "question_id": 1, "answer_text": "답변입니다"}
+    answer = db.get(InterviewAnswer, 1)
+    assert (answer.question_id, answer.answer_text, answer.score) == (1, "답변입니다", None)
+
+
+async def test_evaluate_answer_saves_score(client, db):
+    await create_questions(client)
+    await create_answer(client)
+
+    response = await client.post("/interviews/evaluate/1", json={})
+    assert response.status_code == 200
+    assert response.json() == {"score": 4.0, "feedback": EVALUATION_FEEDBACK}
+
+    answer = db.get(InterviewAnswer, 1)
+    assert (answer.score, answer.feedback) == (4.0, EVALUATION_FEEDBACK)
+
+
+async def test_evaluation_does_not_hold_connection_during_llm_call(client, pool_during_llm):
+    await create_questions(client)
+    await create_answer(client, text="첫 번째")
+    await create_answer(client, question_id=2, text="두 번째")
+    pool_during_llm.clear()
+
+    await client.post("/interviews/evaluate/1", json={})
+    await client.post("/interviews/evaluate/batch", json={"user_id": 1})
+
+    assert pool_during_llm == [0, 0]
+
+
+async def test_evaluation_job_handler_saves_result(client, db, pool_during_llm):
+    await create_questions(client)
+    await create_answer(client)
+    pool_during_llm.clear()
+
+    result = await JOB_HANDLERS["answer_evaluation"]({"answer_id": 1})
+    assert result == {"answer_id": 1, "score": 4.0, "feedback": EVALUATION_FEEDBACK}
+    assert pool_during_llm == [0]
+    assert db.get(InterviewAnswer, 1).score == 4.0
+
+
+async def test_evaluate_missing_answer(client):
+    response = await client.post("/interviews/evaluate/99", json={})
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Answer not found"}
+
+
+async def test_batch_evaluates_only_unscored_answers(client, db):
+    await create_questions(client)
+    await create_answer(client, text="첫 번째")
+    await create_answer(client, question_id=2, text="두 번째")
+    await client.post("/interviews/evaluate/1", json={})
+
+    response = await client.post("/interviews/evaluate/batch", json={"user_id": 1})
+    assert response.status_code == 200
+    assert response.json() == {
+        "evaluated": 1,
+        "failed": 0,
+        "results": [{"answer_id": 2, "score": 4.0, "feedback": EVALUATION_FEEDBACK, "error": None}],
+    }
+    scores = [a.score for a in db.query(InterviewAnswer).order_by(InterviewAnswer.id)]
+    assert scores == [4.0, 4.0]
+
+
+async def test_batch_requires_target(client):
+    response = await client.post("/interviews/evaluate/batch", json={})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "user_id 또는 answer_ids가 필요합니다."}
+
+
+async def test_evaluation_job_is_queued(client, db):
+    await create_questions(client)
+    await create_answer(client)
+
+    response = await client.post("/interviews/evaluate/1/jobs", json={})
+    assert response.status_code == 202
+    assert response.json() == {"id": 1, "kind": "answer_evaluation", "status": "queued",
+                               "attempts": 0, "result": None, "error": None}
+    assert db.get(InterviewAnswer, 1).score is None
@@ -0,0 +1,84 @@
+# tests/test_llm_scheduler.py
+
+import asyncio
+
+import pytest
+
+from backend.llm_scheduler import BULK, INTERACTIVE, LLMScheduler, llm_work
+from backend.services import gpt_client
+
+pytestmark = pytest.mark.anyio
+
+
+def scheduler(**kwargs):
+    options = dict(slots=2, bulk_slots=1, user_limit=10, interactive_burst=4,
+                   queue_limits={INTERACTIVE: 100, BULK: 100},
+                   queue_timeouts={INTERACTIVE: 5, BULK: 5}, enabled=True)
+    options.update(kwargs)
+    return LLMScheduler(**options)
+
+
+async def hold(sched, release, user_id=None, priority=INTERACTIVE, entered=None, name=None):
+    with llm_work(user_id, priority):
+        async with sched.slot():
+            if entered is not None:
+                entered.append(name)
+            await release.wait()
+
+
+async def test_bulk_cannot_starve_interactive():
+    sched = scheduler()
+    release = asyncio.Event()
+    bulk = [asyncio.ensure_future(hold(sched, release, user_id=1, priority=BULK)) for _ in range(10)]
+    await asyncio.sleep(0)
+    assert sched.stats()["inflight"] == {INTERACTIVE: 0, BULK: 1}
+
+    # bulk가 10건 밀려 있어도 interactive는 남겨 둔 슬롯을 바로 받습니다.
+    with llm_work(2, INTERACTIVE):
+        async with sched.slot():
+            assert sched.stats()["queued"] == {INTERACTIVE: 0, BULK: 9}
+
+    release.set()
+    await asyncio.gather(*bulk)
+    assert sched.stats()["inflight"] == {INTERACTIVE: 0, BULK: 0}
+
+
+async def test_waiting_bulk_gets_a_turn_after_interactive_burst():
+    sched = scheduler(slots=1, interactive_burst=2)
+    release = asyncio.Event()
+    first = asyncio.ensure_future(hold(sched, release))
+    await asyncio.sleep(0)
+
+    # 슬롯이 하나뿐인 상태에서 bulk 1건 뒤로 interactive 4건이 줄을 섭니다. (받자마자 바로 반환)
+    order = []
+    done = asyncio.Event()
+    done.set()
+    waiters = []
+    for name, priority in [("bulk", BULK), ("i1", INTERACTIVE), ("i2", INTERACTIVE),
+                           ("i3", INTERACTIVE), ("i4", INTERACTIVE)]:
+        waiters.append(asyncio.ensure_future(hold(sched, done, priority=priority, entered=order, name=name)))
+        await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(first, *waiters)
+    assert order == ["i1", "i2", "bulk", "i3", "i4"]
+
+
+async def test_full_queue_returns_429_with_retry_after(client, monkeypatch):
+    sched = scheduler(slots=1, queue_limits={INTERACTIVE: 0, BULK: 0})
+    monkeypatch.setattr(gpt_client, "scheduler", sched)
+    calls = gpt_client.transport.provider.calls
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(sched, release))
+    await asyncio.sleep(0)
+
+    response = await client.post("/resumes/generate", json={
+        "name": "홍길동", "role": "백엔드 개발자", "experience_years": 3, "experience_list": "API 서버 개발",
+    })
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert gpt_client.transport.provider.calls == calls
+
+    release.set()
+    await holder
@@ -0,0 +1,132 @@
+# tests/test_llm_transport.py
+
+import asyncio
+
+import pytest
+
+from backend.llm_providers import FakeProvider
+from backend.llm_transport import (
+    CircuitBreaker, LLMCircuitOpenError, LLMTransport, LLMUnavailableError,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def request(content="안녕하세요"):
+    return {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": content}], "max_tokens": 10}
+
+
+class FlakyProvider(FakeProvider):
+    """failures번 실패한 뒤부터 정상 응답하는 프로바이더"""
+    def __init__(self, failures: int, latency_ms: float = 0):
+        super().__init__(latency_ms=latency_ms, tokens_per_second=0)
+        self.failures = failures
+
+    async def complete(self, request):
+        if self.failures:
+            self.failures -= 1
+            self.calls += 1
+            raise LLMUnavailableError("upstream down")
+        return await super().complete(request)
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_breaker_opens_then_half_opens(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("backend.llm_transport.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    open_breaker(breaker)
+    with pytest.raises(LLMCircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after == 30
+
+    now[0] += 30
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+    breaker.record_success()
+    assert (breaker.state, breaker.failures) == ("closed", 0)
+    breaker.before_call()
+
+
+def test_half_open_admits_single_probe(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("backend.llm_transport.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    now[0] += 30
+
+    breaker.before_call()  # 시험 호출
+    with pytest.raises(LLMCircuitOpenError):
+        breaker.before_call()
+
+    # 시험 호출이 실패하면 다시 열립니다.
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(LLMCircuitOpenError):
+        breaker.before_call()
+
+    # 시험 호출이 결과 없이 사라져도 reset_timeout 뒤에는 다음 호출이 시험합니다.
+    now[0] += 30
+    breaker.before_call()
+    now[0] += 30
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+async def test_half_open_fails_other_callers_fast():
+    provider = FlakyProvider(failures=1, latency_ms=50)
+    transport = LLMTransport(provider, max_concurrency=8, max_retries=0)
+    transport.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+
+    with pytest.raises(LLMUnavailableError):
+        await transport.create(request("실패"))
+    assert transport.breaker.state == "open"
+    await asyncio.sleep(0.02)
+
+    results = await asyncio.gather(*(transport.create(request(f"요청 {i}")) for i in range(3)),
+                                   return_exceptions=True)
+
+    assert sum(not isinstance(r, Exception) for r in results) == 1
+    assert all(isinstance(r, LLMCircuitOpenError) for r in results if isinstance(r, Exception))
+    assert provider.calls == 2
+    assert transport.breaker.state == "closed"
+
+
+async def test_identical_concurrent_calls_share_one_provider_call():
+    provider = FakeProvider(latency_ms=20, tokens_per_second=0)
+    transport = LLMTransport(provider, max_concurrency=8)
+
+    results = await asyncio.gather(*(transport.create(request()) for _ in range(5)))
+
+    assert provider.calls == 1
+    assert transport.coalesced == 4
+    assert len({r.text for r in results}) == 1
+    assert transport.stats()["inflight"] == 0
+
+    await transport.create(request())
+    assert provider.calls == 2
+
+
+async def test_coalesced_calls_take_one_admission_slot():
+    provider = FakeProvider(latency_ms=20, tokens_per_second=0)
+    transport = LLMTransport(provider, max_concurrency=8)
+    admitted = []
+
+    class Admission:
+        async def __aenter__(self):
+            admitted.append(1)
+
+        async def __aexit__(self, *exc):
+            return False
+
+    await asyncio.gather(*(transport.create(request(), admission=Admission) for _ in range(3)))
+
+    assert admitted == [1]
+    assert provider.calls == 1
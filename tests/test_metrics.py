@@ -0,0 +1,29 @@
+# tests/test_metrics.py
+
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from backend import metrics
+
+
+def test_failed_query_does_not_skew_next_timing(monkeypatch):
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    observed = []
+    monkeypatch.setattr(metrics.SQL_QUERY_DURATION, "observe",
+                        lambda value, *labels: observed.append((labels[0], value)))
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        time.sleep(0.05)
+        conn.execute(text("SELECT 1"))
+
+        assert "query_started" not in conn.info
+
+    # 실패한 쿼리의 시작 시각이 남아 있으면 다음 쿼리에 sleep 시간이 더해집니다.
+    assert [op for op, _ in observed] == ["SELECT"]
+    assert observed[0][1] < 0.05
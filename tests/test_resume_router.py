@@ -0,0 +1,134 @@
+# tests/test_resume_router.py
+
+import pytest
+
+from backend.llm_providers import FAKE_DEFAULT_RESPONSE, FAKE_RESPONSES
+from backend.models import Resume, User
+
+pytestmark = pytest.mark.anyio
+
+TWO_STEP_FEEDBACK = FAKE_RESPONSES["비교하여"]
+STRUCTURED_FEEDBACK = "1) 첫 문장에서 강점을 분명히 드러냈습니다.\n2) 성과를 수치로 보여 주면 설득력이 커집니다."
+
+
+async def upload(client, user_id=1, text="원본 자기소개서"):
+    response = await client.post("/resumes", json={"user_id": user_id, "text": text})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_upload_creates_user_and_resume(client, db):
+    body = await upload(client)
+
+    assert body == {"id": 1, "user_id": 1, "original_text": "원본 자기소개서"}
+    assert db.get(User, 1).name == "User1"
+    resume = db.get(Resume, 1)
+    assert (resume.user_id, resume.original_text, resume.edited_text, resume.feedback) == \
+        (1, "원본 자기소개서", None, None)
+
+
+async def test_list_resumes_full_and_summary(client):
+    await upload(client, text="첫 번째")
+    await upload(client, user_id=2, text="다른 사용자")
+
+    response = await client.get("/resumes", params={"user_id": 1})
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "user_id": 1, "original_text": "첫 번째"}]
+
+    response = await client.get("/resumes", params={"user_id": 1, "view": "summary"})
+    assert response.json() == [{"id": 1, "user_id": 1, "preview": "첫 번째", "reviewed": False}]
+
+    response = await client.get("/resumes")
+    assert [r["id"] for r in response.json()] == [1, 2]
+
+
+async def test_list_resumes_pages_with_cursor(client):
+    for i in range(3):
+        await upload(client, text=f"자기소개서 {i}")
+
+    first = await client.get("/resumes", params={"user_id": 1, "limit": 2})
+    assert [r["id"] for r in first.json()] == [1, 2]
+    assert first.headers["X-Next-Cursor"] == "2"
+
+    second = await client.get("/resumes", params={"user_id": 1, "limit": 2, "cursor": 2})
+    assert [r["id"] for r in second.json()] == [3]
+    assert "X-Next-Cursor" not in second.headers
+
+
+async def test_get_resume_and_not_found(client):
+    await upload(client)
+
+    response = await client.get("/resumes/1")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "user_id": 1, "original_text": "원본 자기소개서",
+                               "edited_text": None, "feedback": None}
+
+    response = await client.get("/resumes/99")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Resume not found"}
+
+
+async def test_two_step_feedback_is_saved(client, db):
+    await upload(client)
+
+    response = await client.post("/resumes/1/feedback", json={"mode": "two_step"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["edited_text"] == FAKE_DEFAULT_RESPONSE
+    assert body["feedback"] == TWO_STEP_FEEDBACK
+    assert (body["mode"], body["segments"]) == ("two_step", 1)
+    assert [c["step"] for c in body["calls"]] == ["edit", "feedback"]
+
+    resume = db.get(Resume, 1)
+    assert (resume.edited_text, resume.feedback) == (FAKE_DEFAULT_RESPONSE, TWO_STEP_FEEDBACK)
+
+
+async def test_structured_feedback_is_saved(client, db):
+    await upload(client)
+
+    response = await client.post("/resumes/1/feedback", json={"mode": "structured"})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["edited_text"], body["feedback"], body["mode"]) == \
+        (FAKE_DEFAULT_RESPONSE, STRUCTURED_FEEDBACK, "structured")
+    assert [c["step"] for c in body["calls"]] == ["structured"]
+
+    resume = db.get(Resume, 1)
+    assert (resume.edited_text, resume.feedback) == (FAKE_DEFAULT_RESPONSE, STRUCTURED_FEEDBACK)
+
+    response = await client.get("/resumes", params={"user_id": 1, "view": "summary"})
+    assert response.json()[0]["reviewed"] is True
+
+
+async def test_feedback_does_not_hold_connection_during_llm_call(client, pool_during_llm):
+    await upload(client)
+
+    response = await client.post("/resumes/1/feedback", json={"mode": "two_step"})
+    assert response.status_code == 200
+    assert pool_during_llm == [0, 0]
+
+
+async def test_feedback_for_missing_resume(client, db):
+    response = await client.post("/resumes/99/feedback", json={})
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Resume not found"}
+    assert db.query(Resume).count() == 0
+
+
+async def test_feedback_job_is_queued(client):
+    await upload(client)
+
+    response = await client.post("/resumes/1/feedback/jobs", json={})
+    assert response.status_code == 202
+    assert response.json() == {"id": 1, "kind": "resume_feedback", "status": "queued",
+                               "attempts": 0, "result": None, "error": None}
+
+
+async def test_generate_resume(client, db):
+    response = await client.post("/resumes/generate", json={
+        "name": "홍길동", "role": "백엔드 개발자", "experience_years": 3, "experience_list": "API 서버 개발",
+    })
+    assert response.status_code == 200
+    assert response.json() == {"generated_text": FAKE_DEFAULT_RESPONSE}
+    # 생성 결과는 저장하지 않습니다.
+    assert db.query(Resume).count() == 0